@@ -0,0 +1,104 @@
+"""add link id arrays to szkola
+
+Revision ID: 268175d6ed17
+Revises: 6cf7f41a2bf7
+Create Date: 2026-10-20 09:21:36.740512
+
+"""
+
+from pathlib import Path
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "268175d6ed17"
+down_revision: Union[str, Sequence[str], None] = "6cf7f41a2bf7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQL_DIR = Path(__file__).parent / "sql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "szkola",
+        sa.Column(
+            "ksztalcenie_zawodowe_ids",
+            postgresql.ARRAY(sa.Integer()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "szkola",
+        sa.Column(
+            "etap_edukacji_ids",
+            postgresql.ARRAY(sa.Integer()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+
+    op.execute(
+        """
+        UPDATE public.szkola AS s
+        SET ksztalcenie_zawodowe_ids = links.ids
+        FROM (
+            SELECT szkola_id, array_agg(ksztalcenie_zawodowe_id ORDER BY ksztalcenie_zawodowe_id) AS ids
+            FROM public.szkolaksztalceniezawodowelink
+            GROUP BY szkola_id
+        ) AS links
+        WHERE links.szkola_id = s.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE public.szkola AS s
+        SET etap_edukacji_ids = links.ids
+        FROM (
+            SELECT szkola_id, array_agg(etap_id ORDER BY etap_id) AS ids
+            FROM public.szkolaetaplink
+            GROUP BY szkola_id
+        ) AS links
+        WHERE links.szkola_id = s.id
+        """
+    )
+
+    op.create_index(
+        "idx_szkola_ksztalcenie_zawodowe_ids",
+        "szkola",
+        ["ksztalcenie_zawodowe_ids"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "idx_szkola_etap_edukacji_ids",
+        "szkola",
+        ["etap_edukacji_ids"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    op.execute((SQL_DIR / "szkola_clustered_v4.sql").read_text())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute((SQL_DIR / "szkola_clustered_v3.sql").read_text())
+    op.drop_index(
+        "idx_szkola_etap_edukacji_ids",
+        table_name="szkola",
+        postgresql_using="gin",
+    )
+    op.drop_index(
+        "idx_szkola_ksztalcenie_zawodowe_ids",
+        table_name="szkola",
+        postgresql_using="gin",
+    )
+    op.drop_column("szkola", "etap_edukacji_ids")
+    op.drop_column("szkola", "ksztalcenie_zawodowe_ids")
@@ -0,0 +1,56 @@
+"""add szkola_klaster table
+
+Revision ID: 2e70f5042a61
+Revises: 106083f87bdd
+Create Date: 2026-10-19 10:12:41.208133
+
+"""
+
+from pathlib import Path
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2e70f5042a61"
+down_revision: Union[str, Sequence[str], None] = "106083f87bdd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQL_DIR = Path(__file__).parent / "sql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "szkola_klaster",
+        sa.Column("zoom", sa.SmallInteger(), nullable=False),
+        sa.Column("cell_x", sa.BigInteger(), nullable=False),
+        sa.Column("cell_y", sa.BigInteger(), nullable=False),
+        sa.Column("point_count", sa.Integer(), nullable=False),
+        sa.Column("sum_wynik", sa.Float(), nullable=False),
+        sa.Column("non_null_count", sa.Integer(), nullable=False),
+        sa.Column("centroid_x", sa.Float(), nullable=False),
+        sa.Column("centroid_y", sa.Float(), nullable=False),
+        sa.Column("cluster_key", sa.Integer(), nullable=False),
+        sa.Column("first_id", sa.Integer(), nullable=False),
+        sa.Column("first_nazwa", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("first_typ", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("first_status", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("first_wynik", sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint("zoom", "cell_x", "cell_y"),
+    )
+    op.execute((SQL_DIR / "szkola_klaster_refresh.sql").read_text())
+    op.execute((SQL_DIR / "szkola_clustered_v2.sql").read_text())
+    op.execute("SELECT public.refresh_szkola_klaster()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute((SQL_DIR / "szkola_clustered.sql").read_text())
+    op.execute("DROP FUNCTION IF EXISTS public.refresh_szkola_klaster()")
+    op.execute("DROP FUNCTION IF EXISTS public.szkola_cluster_cell_size(integer)")
+    op.drop_table("szkola_klaster")
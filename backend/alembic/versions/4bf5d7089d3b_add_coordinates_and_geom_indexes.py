@@ -0,0 +1,94 @@
+"""add coordinates and geom indexes
+
+Revision ID: 4bf5d7089d3b
+Revises: 268175d6ed17
+Create Date: 2026-10-20 13:05:52.118407
+
+"""
+
+from pathlib import Path
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4bf5d7089d3b"
+down_revision: Union[str, Sequence[str], None] = "268175d6ed17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQL_DIR = Path(__file__).parent / "sql"
+
+# everything the live schools query reads from szkola, so that the default
+# bbox query (closed schools hidden) is answered by an index-only scan
+COVERING_COLUMNS = [
+    "id",
+    "nazwa",
+    "wynik",
+    "typ_id",
+    "status_publicznoprawny_id",
+    "kategoria_uczniow_id",
+    "miejscowosc_id",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("szkola", sa.Column("latitude", sa.Float(), nullable=True))
+    op.add_column("szkola", sa.Column("longitude", sa.Float(), nullable=True))
+
+    # trigger function now maintains latitude/longitude together with geom_3857
+    op.execute((SQL_DIR / "szkola_geom_derived_trigger.sql").read_text())
+    op.execute(
+        """
+        UPDATE public.szkola
+        SET latitude = ST_Y(geom), longitude = ST_X(geom)
+        WHERE geom IS NOT NULL
+        """
+    )
+
+    op.create_index(
+        "idx_szkola_geom_not_zlikwidowana",
+        "szkola",
+        ["geom"],
+        unique=False,
+        postgresql_using="gist",
+        postgresql_where=sa.text("geom IS NOT NULL AND zlikwidowana = false"),
+    )
+    op.create_index(
+        "idx_szkola_geom_any_zlikwidowana",
+        "szkola",
+        ["geom"],
+        unique=False,
+        postgresql_using="gist",
+        postgresql_where=sa.text("geom IS NOT NULL"),
+    )
+    op.create_index(
+        "idx_szkola_coordinates_not_zlikwidowana",
+        "szkola",
+        ["longitude", "latitude"],
+        unique=False,
+        postgresql_include=COVERING_COLUMNS,
+        postgresql_where=sa.text("latitude IS NOT NULL AND zlikwidowana = false"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_szkola_coordinates_not_zlikwidowana", table_name="szkola")
+    op.drop_index(
+        "idx_szkola_geom_any_zlikwidowana",
+        table_name="szkola",
+        postgresql_using="gist",
+    )
+    op.drop_index(
+        "idx_szkola_geom_not_zlikwidowana",
+        table_name="szkola",
+        postgresql_using="gist",
+    )
+
+    op.execute((SQL_DIR / "szkola_geom_3857_trigger.sql").read_text())
+    op.drop_column("szkola", "longitude")
+    op.drop_column("szkola", "latitude")
@@ -0,0 +1,98 @@
+"""denormalize region ids on szkola and ranking
+
+Revision ID: 4fedffde9f36
+Revises: 4bf5d7089d3b
+Create Date: 2026-10-21 10:14:27.305918
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4fedffde9f36"
+down_revision: Union[str, Sequence[str], None] = "4bf5d7089d3b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REGION_COLUMNS = {
+    "gmina_id": "gmina",
+    "powiat_id": "powiat",
+    "wojewodztwo_id": "wojewodztwo",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("szkola", "ranking"):
+        for column, referenced_table in REGION_COLUMNS.items():
+            op.add_column(table, sa.Column(column, sa.Integer(), nullable=True))
+            op.create_foreign_key(
+                f"{table}_{column}_fkey", table, referenced_table, [column], ["id"]
+            )
+
+    # same statement as sync_school_regions, for all schools
+    op.execute(
+        """
+        UPDATE public.szkola AS s
+        SET
+            gmina_id = g.id,
+            powiat_id = p.id,
+            wojewodztwo_id = p.wojewodztwo_id
+        FROM public.miejscowosc AS m
+        JOIN public.gmina AS g ON g.id = m.gmina_id
+        JOIN public.powiat AS p ON p.id = g.powiat_id
+        WHERE m.id = s.miejscowosc_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE public.ranking AS r
+        SET
+            gmina_id = s.gmina_id,
+            powiat_id = s.powiat_id,
+            wojewodztwo_id = s.wojewodztwo_id
+        FROM public.szkola AS s
+        WHERE s.id = r.szkola_id
+        """
+    )
+    for column in REGION_COLUMNS:
+        op.alter_column("ranking", column, nullable=False)
+        op.create_index(op.f(f"ix_szkola_{column}"), "szkola", [column], unique=False)
+
+    op.create_index(
+        "idx_ranking_rok_rodzaj_miejsce_kraj",
+        "ranking",
+        ["rok", "rodzaj_rankingu", "miejsce_kraj"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_ranking_rok_rodzaj_wojewodztwo_miejsce",
+        "ranking",
+        ["rok", "rodzaj_rankingu", "wojewodztwo_id", "miejsce_wojewodztwo"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_ranking_rok_rodzaj_powiat_miejsce",
+        "ranking",
+        ["rok", "rodzaj_rankingu", "powiat_id", "miejsce_powiat"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_ranking_rok_rodzaj_powiat_miejsce", table_name="ranking")
+    op.drop_index("idx_ranking_rok_rodzaj_wojewodztwo_miejsce", table_name="ranking")
+    op.drop_index("idx_ranking_rok_rodzaj_miejsce_kraj", table_name="ranking")
+
+    for column in REGION_COLUMNS:
+        op.drop_index(op.f(f"ix_szkola_{column}"), table_name="szkola")
+
+    for table in ("ranking", "szkola"):
+        for column in REGION_COLUMNS:
+            op.drop_constraint(f"{table}_{column}_fkey", table, type_="foreignkey")
+            op.drop_column(table, column)
@@ -0,0 +1,30 @@
+"""use integer cell keys in szkola_clustered
+
+Revision ID: 6cf7f41a2bf7
+Revises: 2e70f5042a61
+Create Date: 2026-10-19 15:47:03.519284
+
+"""
+
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6cf7f41a2bf7"
+down_revision: Union[str, Sequence[str], None] = "2e70f5042a61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQL_DIR = Path(__file__).parent / "sql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute((SQL_DIR / "szkola_clustered_v3.sql").read_text())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute((SQL_DIR / "szkola_clustered_v2.sql").read_text())
@@ -0,0 +1,49 @@
+"""add data_version table
+
+Revision ID: 9c1e47b2d8a3
+Revises: 4fedffde9f36
+Create Date: 2026-10-22 09:41:05.128340
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1e47b2d8a3"
+down_revision: Union[str, Sequence[str], None] = "4fedffde9f36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOMAINS = ("schools", "results", "scores", "rankings", "geometry")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    data_version = op.create_table(
+        "data_version",
+        sa.Column(
+            "domain", sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False
+        ),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("domain"),
+    )
+    op.bulk_insert(
+        data_version,
+        [{"domain": domain, "version": 1} for domain in DOMAINS],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("data_version")
@@ -0,0 +1,32 @@
+"""skip geom trigger during bulk load
+
+Revision ID: b5d2e8f41c07
+Revises: 9c1e47b2d8a3
+Create Date: 2026-10-23 10:12:44.513207
+
+"""
+
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d2e8f41c07"
+down_revision: Union[str, Sequence[str], None] = "9c1e47b2d8a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQL_DIR = Path(__file__).parent / "sql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the trigger function returns early while app.geom_bulk_load is set in the
+    # transaction, import jobs no longer need ALTER TABLE ... DISABLE TRIGGER
+    op.execute((SQL_DIR / "szkola_geom_derived_trigger_v2.sql").read_text())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute((SQL_DIR / "szkola_geom_derived_trigger.sql").read_text())
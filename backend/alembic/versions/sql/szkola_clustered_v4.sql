@@ -0,0 +1,279 @@
+CREATE OR REPLACE FUNCTION public.szkola_clustered(
+    z integer,
+    x integer,
+    y integer,
+    query_params json DEFAULT '{}'::json
+)
+RETURNS bytea
+LANGUAGE plpgsql
+STABLE
+STRICT
+PARALLEL SAFE
+-- plan the queries below with the actual filter values, so predicates of
+-- filters that are not set fold away instead of staying in a generic plan
+SET plan_cache_mode = force_custom_plan
+AS $$
+DECLARE
+    mvt bytea;
+    tile_env geometry;
+    tile_env_buffered geometry;
+    tile_cell_size double precision;
+    default_cell_size double precision;
+    type_ids integer[];
+    status_ids integer[];
+    category_ids integer[];
+    career_ids integer[];
+    min_score double precision;
+    max_score double precision;
+    search_query text;
+    include_closed boolean;
+BEGIN
+    tile_env := ST_TileEnvelope(z, x, y);
+    tile_env_buffered := ST_Expand(
+        tile_env,
+        (ST_XMax(tile_env) - ST_XMin(tile_env)) * 0.1
+    );
+
+    -- Default view: no filters and closed schools hidden. Clusters of the
+    -- clustered zoom levels are read from the precomputed szkola_klaster table.
+    IF z <= 12
+       AND COALESCE(
+           NULLIF(query_params->>'type', ''),
+           NULLIF(query_params->>'status', ''),
+           NULLIF(query_params->>'category', ''),
+           NULLIF(query_params->>'career', ''),
+           NULLIF(query_params->>'minScore', ''),
+           NULLIF(query_params->>'maxScore', ''),
+           NULLIF(BTRIM(query_params->>'q'), '')
+       ) IS NULL
+       AND NOT COALESCE(NULLIF(query_params->>'closed', '')::boolean, false)
+    THEN
+        default_cell_size := public.szkola_cluster_cell_size(z);
+
+        WITH prepared AS (
+            SELECT
+                ST_AsMVTGeom(
+                    ST_SetSRID(ST_MakePoint(k.centroid_x, k.centroid_y), 3857),
+                    tile_env,
+                    4096,
+                    64,
+                    true
+                ) AS geom,
+                (k.point_count > 1) AS cluster,
+                k.point_count,
+                k.point_count AS point_count_abbreviated,
+                k.sum_wynik AS sum,
+                k.non_null_count AS "nonNullCount",
+                CASE
+                    WHEN k.point_count = 1 THEN k.first_id
+                    ELSE NULL
+                END AS id,
+                CASE
+                    WHEN k.point_count = 1 THEN k.first_nazwa
+                    ELSE NULL
+                END AS nazwa,
+                CASE
+                    WHEN k.point_count = 1 THEN k.first_typ
+                    ELSE NULL
+                END AS typ,
+                CASE
+                    WHEN k.point_count = 1 THEN k.first_status
+                    ELSE NULL
+                END AS status,
+                CASE
+                    WHEN k.point_count = 1 THEN k.first_wynik
+                    ELSE NULL
+                END AS wynik,
+                CASE
+                    WHEN k.point_count = 1 THEN k.first_id
+                    ELSE -k.cluster_key
+                END AS state_id,
+                CASE
+                    WHEN k.point_count > 1 THEN k.cluster_key
+                    ELSE NULL
+                END AS cluster_id
+            FROM public.szkola_klaster AS k
+            WHERE k.zoom = z
+              AND k.cell_x BETWEEN FLOOR(ST_XMin(tile_env_buffered) / default_cell_size)::bigint
+                               AND FLOOR(ST_XMax(tile_env_buffered) / default_cell_size)::bigint
+              AND k.cell_y BETWEEN FLOOR(ST_YMin(tile_env_buffered) / default_cell_size)::bigint
+                               AND FLOOR(ST_YMax(tile_env_buffered) / default_cell_size)::bigint
+        )
+        SELECT ST_AsMVT(prepared, 'szkola_clustered', 4096, 'geom')
+        INTO mvt
+        FROM prepared
+        WHERE geom IS NOT NULL;
+
+        RETURN mvt;
+    END IF;
+
+    tile_cell_size := CASE
+        WHEN z >= 13 THEN NULL::double precision
+        WHEN z <= 5 THEN (ST_XMax(tile_env) - ST_XMin(tile_env)) / 5.0
+        WHEN z <= 6 THEN (ST_XMax(tile_env) - ST_XMin(tile_env)) / 6.0
+        WHEN z <= 8 THEN (ST_XMax(tile_env) - ST_XMin(tile_env)) / 8.0
+        WHEN z <= 10 THEN (ST_XMax(tile_env) - ST_XMin(tile_env)) / 12.0
+        WHEN z <= 11 THEN (ST_XMax(tile_env) - ST_XMin(tile_env)) / 16.0
+        ELSE (ST_XMax(tile_env) - ST_XMin(tile_env)) / 20.0
+    END;
+
+    type_ids := string_to_array(NULLIF(query_params->>'type', ''), ',')::integer[];
+    status_ids := string_to_array(NULLIF(query_params->>'status', ''), ',')::integer[];
+    category_ids := string_to_array(NULLIF(query_params->>'category', ''), ',')::integer[];
+    career_ids := string_to_array(NULLIF(query_params->>'career', ''), ',')::integer[];
+    min_score := NULLIF(query_params->>'minScore', '')::double precision;
+    max_score := NULLIF(query_params->>'maxScore', '')::double precision;
+    search_query := NULLIF(BTRIM(query_params->>'q'), '');
+    include_closed := COALESCE(NULLIF(query_params->>'closed', '')::boolean, false);
+
+    WITH source_points AS (
+        SELECT
+            s.id,
+            s.nazwa,
+            s.typ_id,
+            s.status_publicznoprawny_id,
+            s.wynik,
+            s.geom_3857,
+            -- coordinates are extracted once and reused for bucketing and centroids
+            ST_X(s.geom_3857) AS point_x,
+            ST_Y(s.geom_3857) AS point_y
+        FROM public.szkola AS s
+        WHERE s.geom_3857 IS NOT NULL
+          AND s.aktualna = true
+          AND (
+              include_closed
+              OR s.zlikwidowana = false
+          )
+          AND s.geom_3857 && tile_env_buffered
+          AND (
+              type_ids IS NULL
+              OR s.typ_id = ANY(type_ids)
+          )
+          AND (
+              status_ids IS NULL
+              OR s.status_publicznoprawny_id = ANY(status_ids)
+          )
+          AND (
+              category_ids IS NULL
+              OR s.kategoria_uczniow_id = ANY(category_ids)
+          )
+          AND (
+              career_ids IS NULL
+              OR s.ksztalcenie_zawodowe_ids && career_ids
+          )
+          AND (
+              min_score IS NULL
+              OR s.wynik >= min_score
+          )
+          AND (
+              max_score IS NULL
+              OR s.wynik <= max_score
+          )
+          AND (
+              search_query IS NULL
+              OR s.nazwa ILIKE '%' || search_query || '%'
+              OR EXISTS (
+                  SELECT 1
+                  FROM public.miejscowosc AS m
+                  WHERE m.id = s.miejscowosc_id
+                    AND m.nazwa ILIKE '%' || search_query || '%'
+              )
+          )
+    ),
+    -- clustered zooms: one bucket per grid cell, keyed by a packed bigint
+    -- (cell x in the high 32 bits, cell y in the low 32 bits)
+    aggregated AS (
+        SELECT
+            COUNT(*)::integer AS point_count,
+            SUM(COALESCE(sp.wynik, 0))::double precision AS sum_wynik,
+            COUNT(sp.wynik)::integer AS non_null_count,
+            AVG(sp.point_x) AS centroid_x,
+            AVG(sp.point_y) AS centroid_y,
+            MIN(sp.id)::integer AS first_id,
+            (FLOOR(sp.point_x / tile_cell_size)::bigint << 32)
+                | (FLOOR(sp.point_y / tile_cell_size)::bigint & 4294967295) AS cell_key
+        FROM source_points AS sp
+        WHERE tile_cell_size IS NOT NULL
+        GROUP BY cell_key
+    ),
+    clusters AS (
+        SELECT
+            a.*,
+            -- cluster ids stay the hash of the 'cl:<x>:<y>' text key, so they do not
+            -- change for the frontend; the text is built once per cluster only
+            CASE
+                WHEN a.point_count > 1 THEN ABS(hashtext(CONCAT(
+                    'cl:',
+                    (a.cell_key >> 32)::text,
+                    ':',
+                    ((a.cell_key << 32) >> 32)::text
+                )))
+                ELSE NULL
+            END AS cluster_hash
+        FROM aggregated AS a
+    ),
+    prepared AS (
+        SELECT
+            ST_AsMVTGeom(
+                ST_SetSRID(ST_MakePoint(c.centroid_x, c.centroid_y), 3857),
+                tile_env,
+                4096,
+                64,
+                true
+            ) AS geom,
+            (c.point_count > 1) AS cluster,
+            c.point_count,
+            c.point_count AS point_count_abbreviated,
+            c.sum_wynik AS sum,
+            c.non_null_count AS "nonNullCount",
+            CASE
+                WHEN c.point_count = 1 THEN c.first_id
+                ELSE NULL
+            END AS id,
+            -- representative attributes are looked up for singleton buckets only
+            s.nazwa,
+            ts.nazwa AS typ,
+            st.nazwa AS status,
+            s.wynik::double precision AS wynik,
+            CASE
+                WHEN c.point_count = 1 THEN c.first_id
+                ELSE -c.cluster_hash
+            END AS state_id,
+            c.cluster_hash AS cluster_id
+        FROM clusters AS c
+        LEFT JOIN public.szkola AS s
+            ON c.point_count = 1
+           AND s.id = c.first_id
+        LEFT JOIN public.typ_szkoly AS ts ON ts.id = s.typ_id
+        LEFT JOIN public.status_publicznoprawny AS st ON st.id = s.status_publicznoprawny_id
+
+        UNION ALL
+
+        -- zoom >= 13: every school is its own feature, nothing to aggregate
+        SELECT
+            ST_AsMVTGeom(sp.geom_3857, tile_env, 4096, 64, true) AS geom,
+            false AS cluster,
+            1 AS point_count,
+            1 AS point_count_abbreviated,
+            COALESCE(sp.wynik, 0)::double precision AS sum,
+            (sp.wynik IS NOT NULL)::integer AS "nonNullCount",
+            sp.id,
+            sp.nazwa,
+            ts.nazwa AS typ,
+            st.nazwa AS status,
+            sp.wynik::double precision AS wynik,
+            sp.id AS state_id,
+            NULL::integer AS cluster_id
+        FROM source_points AS sp
+        LEFT JOIN public.typ_szkoly AS ts ON ts.id = sp.typ_id
+        LEFT JOIN public.status_publicznoprawny AS st ON st.id = sp.status_publicznoprawny_id
+        WHERE tile_cell_size IS NULL
+    )
+    SELECT ST_AsMVT(prepared, 'szkola_clustered', 4096, 'geom')
+    INTO mvt
+    FROM prepared
+    WHERE geom IS NOT NULL;
+
+    RETURN mvt;
+END;
+$$;
@@ -0,0 +1,23 @@
+CREATE OR REPLACE FUNCTION public.szkola_set_geom_3857()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    -- import jobs set app.geom_bulk_load with SET LOCAL and recompute the derived
+    -- columns of every written school in one set-based UPDATE before committing
+    IF current_setting('app.geom_bulk_load', true) = 'on' THEN
+        RETURN NEW;
+    END IF;
+
+    IF NEW.geom IS NULL THEN
+        NEW.geom_3857 := NULL;
+        NEW.latitude := NULL;
+        NEW.longitude := NULL;
+    ELSE
+        NEW.geom_3857 := ST_Transform(NEW.geom, 3857);
+        NEW.latitude := ST_Y(NEW.geom);
+        NEW.longitude := ST_X(NEW.geom);
+    END IF;
+    RETURN NEW;
+END;
+$$;
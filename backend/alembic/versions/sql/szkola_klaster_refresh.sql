@@ -0,0 +1,108 @@
+-- Grid cell size of the clustered zoom levels (0-12), NULL above them.
+-- Breakpoints are the same as in szkola_clustered: tile width divided by
+-- the number of cells per tile side for the given zoom band.
+CREATE OR REPLACE FUNCTION public.szkola_cluster_cell_size(z integer)
+RETURNS double precision
+LANGUAGE sql
+IMMUTABLE
+STRICT
+PARALLEL SAFE
+AS $$
+SELECT
+    CASE
+        WHEN z >= 13 THEN NULL::double precision
+        WHEN z <= 5 THEN tile.width / 5.0
+        WHEN z <= 6 THEN tile.width / 6.0
+        WHEN z <= 8 THEN tile.width / 8.0
+        WHEN z <= 10 THEN tile.width / 12.0
+        WHEN z <= 11 THEN tile.width / 16.0
+        ELSE tile.width / 20.0
+    END
+FROM (
+    SELECT ST_XMax(env) - ST_XMin(env) AS width
+    FROM ST_TileEnvelope(z, 0, 0) AS env
+) AS tile;
+$$;
+
+-- Rebuild the precomputed clusters of the default map view
+-- (current, not closed schools, no filters). Returns the number of cells.
+CREATE OR REPLACE FUNCTION public.refresh_szkola_klaster()
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    cell_count integer;
+BEGIN
+    -- DELETE instead of TRUNCATE: tile requests keep reading the previous
+    -- clusters until the refreshing transaction commits
+    DELETE FROM public.szkola_klaster;
+
+    WITH zoom_levels AS (
+        SELECT
+            zl.zoom,
+            public.szkola_cluster_cell_size(zl.zoom) AS cell_size
+        FROM generate_series(0, 12) AS zl(zoom)
+    ),
+    source_points AS (
+        SELECT
+            s.id,
+            s.nazwa,
+            s.wynik,
+            ts.nazwa AS typ,
+            sp.nazwa AS status,
+            ST_X(s.geom_3857) AS point_x,
+            ST_Y(s.geom_3857) AS point_y
+        FROM public.szkola AS s
+        LEFT JOIN public.typ_szkoly AS ts ON ts.id = s.typ_id
+        LEFT JOIN public.status_publicznoprawny AS sp ON sp.id = s.status_publicznoprawny_id
+        WHERE s.geom_3857 IS NOT NULL
+          AND s.aktualna = true
+          AND s.zlikwidowana = false
+    ),
+    bucketed AS (
+        SELECT
+            zl.zoom,
+            FLOOR(p.point_x / zl.cell_size)::bigint AS cell_x,
+            FLOOR(p.point_y / zl.cell_size)::bigint AS cell_y,
+            p.*
+        FROM source_points AS p
+        CROSS JOIN zoom_levels AS zl
+    )
+    INSERT INTO public.szkola_klaster (
+        zoom,
+        cell_x,
+        cell_y,
+        point_count,
+        sum_wynik,
+        non_null_count,
+        centroid_x,
+        centroid_y,
+        cluster_key,
+        first_id,
+        first_nazwa,
+        first_typ,
+        first_status,
+        first_wynik
+    )
+    SELECT
+        b.zoom,
+        b.cell_x,
+        b.cell_y,
+        COUNT(*)::integer,
+        SUM(COALESCE(b.wynik, 0))::double precision,
+        COUNT(b.wynik)::integer,
+        AVG(b.point_x),
+        AVG(b.point_y),
+        ABS(hashtext(CONCAT('cl:', b.cell_x::text, ':', b.cell_y::text))),
+        MIN(b.id)::integer,
+        MIN(b.nazwa),
+        MIN(b.typ),
+        MIN(b.status),
+        MIN(b.wynik)::double precision
+    FROM bucketed AS b
+    GROUP BY b.zoom, b.cell_x, b.cell_y;
+
+    GET DIAGNOSTICS cell_count = ROW_COUNT;
+    RETURN cell_count;
+END;
+$$;
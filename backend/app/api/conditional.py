@@ -0,0 +1,132 @@
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from app.dependencies import DataVersionsDep
+from app.models.data_version import DataDomain
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    max_age: int
+    immutable: bool = False
+
+    def header(self) -> str:
+        value = f"public, max-age={self.max_age}"
+        if self.immutable:
+            value += ", immutable"
+        return value
+
+
+# reference data and rankings change at most with a nightly import, browsers
+# and the CDN revalidate with If-None-Match after max-age
+REFERENCE_DATA_CACHE = CachePolicy(max_age=3600)
+RANKINGS_CACHE = CachePolicy(max_age=600)
+# only the latest year of each ranking type is ever recalculated
+PAST_RANKINGS_CACHE = CachePolicy(max_age=365 * 24 * 3600, immutable=True)
+SCHOOL_CACHE = CachePolicy(max_age=600)
+
+
+class NotModifiedError(Exception):
+    """The client's cached representation is current, answered with 304."""
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        self.headers: dict[str, str] = headers
+        super().__init__("Not modified")
+
+
+def strong_etag(*parts: object) -> str:
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def normalized_query(request: Request) -> str:
+    """Query string independent of parameter order."""
+    return "&".join(
+        f"{key}={value}" for key, value in sorted(request.query_params.multi_items())
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, W/"x" matches "x"
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match matches `etag`."""
+    if_none_match = request.headers.get("if-none-match")
+    return if_none_match is not None and _etag_matches(if_none_match, etag)
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # HTTP dates have second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def check_conditional_get(
+    request: Request,
+    response: Response,
+    etag: str,
+    policy: CachePolicy,
+    last_modified: datetime | None = None,
+) -> None:
+    """
+    Set the validators and Cache-Control on the response, or raise
+    NotModifiedError when the request's conditional headers match them.
+    If-None-Match takes precedence over If-Modified-Since.
+    """
+    headers = {"ETag": etag, "Cache-Control": policy.header()}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.astimezone(UTC), usegmt=True
+        )
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    elif if_modified_since is not None and last_modified is not None:
+        not_modified = _not_modified_since(if_modified_since, last_modified)
+    else:
+        not_modified = False
+
+    if not_modified:
+        raise NotModifiedError(headers)
+    response.headers.update(headers)
+
+
+def versioned_conditional_get(
+    policy: CachePolicy, *domains: DataDomain
+) -> Callable[[Request, Response, DataVersionsDep], None]:
+    """
+    Dependency answering 304 for a route whose response depends only on the
+    given data domains and the query string, before the endpoint runs.
+    """
+
+    def dependency(
+        request: Request, response: Response, versions: DataVersionsDep
+    ) -> None:
+        check_conditional_get(
+            request,
+            response,
+            etag=strong_etag(
+                request.url.path, normalized_query(request), versions.token(*domains)
+            ),
+            policy=policy,
+            last_modified=versions.last_modified(*domains),
+        )
+
+    return dependency
@@ -1,8 +1,15 @@
 import logging
 
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, Request, Response, status
 from fastapi.responses import JSONResponse
 
+from app.api.conditional import NotModifiedError
+from app.core.bulkheads import RETRY_AFTER_SECONDS, BulkheadFullError
+from app.core.query_cancellation import (
+    CLIENT_CLOSED_REQUEST,
+    ClientDisconnectedError,
+    StatementTimeoutError,
+)
 from app.services.exceptions import (
     EntityNotFoundError,
     SchoolLocationNotFoundError,
@@ -14,6 +21,36 @@ logger = logging.getLogger(__name__)
 
 
 def register_exception_handlers(app: FastAPI) -> None:
+    @app.exception_handler(NotModifiedError)
+    async def not_modified_handler(_: Request, exc: NotModifiedError) -> Response:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=exc.headers)
+
+    @app.exception_handler(BulkheadFullError)
+    async def bulkhead_full_handler(_: Request, exc: BulkheadFullError) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(exc)},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+
+    @app.exception_handler(ClientDisconnectedError)
+    async def client_disconnected_handler(
+        _: Request, _exc: ClientDisconnectedError
+    ) -> Response:
+        # nobody reads it, the status only shows up in logs and metrics
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    @app.exception_handler(StatementTimeoutError)
+    async def statement_timeout_handler(
+        request: Request, exc: StatementTimeoutError
+    ) -> JSONResponse:
+        logger.warning(f"⏳ {request.url.path}: {exc}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "The query took too long."},
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
     @app.exception_handler(EntityNotFoundError)
     async def entity_not_found_handler(
         _: Request, exc: EntityNotFoundError
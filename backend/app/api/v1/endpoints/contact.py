@@ -3,7 +3,8 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, Request, status
 
-from app.dependencies import SessionDep
+from app.core.request_timing import TimedRoute
+from app.dependencies import WRITE_ROUTE, SessionDep
 from app.schemas.contact import ContactSubmitRequest, ContactSubmitResponse
 from app.services.contact_service import ContactService
 from app.services.turnstile_service import TurnstileService
@@ -13,6 +14,8 @@ logger = logging.getLogger(__name__)
 router = APIRouter(
     prefix="/contact",
     tags=["contact"],
+    route_class=TimedRoute,
+    dependencies=[WRITE_ROUTE],
 )
 
 
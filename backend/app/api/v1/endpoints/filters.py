@@ -1,15 +1,25 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.dependencies import SessionDep
+from app.api.conditional import REFERENCE_DATA_CACHE, versioned_conditional_get
+from app.core.request_timing import TimedRoute
+from app.dependencies import LIGHT_ROUTE, SessionDep
+from app.models.data_version import DataDomain
 from app.schemas.school_filters import SchoolFiltersResponse
 from app.services.filter_options import get_filter_options
 
 router = APIRouter(
     prefix="/filters",
     tags=["filters"],
+    route_class=TimedRoute,
+    dependencies=[LIGHT_ROUTE],
 )
 
 
-@router.get("/")
+@router.get(
+    "/",
+    dependencies=[
+        Depends(versioned_conditional_get(REFERENCE_DATA_CACHE, DataDomain.SCHOOLS))
+    ],
+)
 async def read_filters(session: SessionDep) -> SchoolFiltersResponse:
     return get_filter_options(session)
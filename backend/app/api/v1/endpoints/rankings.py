@@ -1,18 +1,31 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
-from app.dependencies import SessionDep
+from app.api.conditional import (
+    PAST_RANKINGS_CACHE,
+    RANKINGS_CACHE,
+    REFERENCE_DATA_CACHE,
+    check_conditional_get,
+    etag_matches,
+    normalized_query,
+    strong_etag,
+    versioned_conditional_get,
+)
+from app.core.compression import PrecompressedResponse
+from app.core.request_timing import TimedRoute
+from app.dependencies import HEAVY_ROUTE, LIGHT_ROUTE, DataVersionsDep, SessionDep
 from app.schemas.ranking import (
     RankingsFiltersResponse,
     RankingsParams,
     RankingsResponse,
 )
-from app.services.ranking_service import RankingService
+from app.services.ranking_service import RANKINGS_DOMAINS, RankingService
 
 router = APIRouter(
     prefix="/rankings",
     tags=["rankings"],
+    route_class=TimedRoute,
 )
 
 
@@ -23,14 +36,60 @@ def get_ranking_service(session: SessionDep) -> RankingService:
 RankingServiceDep = Annotated[RankingService, Depends(get_ranking_service)]
 
 
-@router.get("/filters")
+def get_conditional_rankings_params(
+    request: Request,
+    response: Response,
+    params: Annotated[RankingsParams, Query()],
+    versions: DataVersionsDep,
+    service: RankingServiceDep,
+) -> RankingsParams:
+    versions_token = versions.token(*RANKINGS_DOMAINS)
+
+    def etag(is_past_year: bool) -> str:
+        return strong_etag(
+            request.url.path, normalized_query(request), versions_token, is_past_year
+        )
+
+    # the ETag records the cache policy the page was sent with, which holds for
+    # as long as the ETag matches; the latest ranking year only has to be looked
+    # up when the page is sent again
+    if etag_matches(request, etag(True)):
+        is_past_year = True
+    elif etag_matches(request, etag(False)):
+        is_past_year = False
+    else:
+        latest_year = service.get_latest_years(versions_token).get(params.type)
+        is_past_year = latest_year is not None and params.year < latest_year
+    check_conditional_get(
+        request,
+        response,
+        etag=etag(is_past_year),
+        policy=PAST_RANKINGS_CACHE if is_past_year else RANKINGS_CACHE,
+        last_modified=versions.last_modified(*RANKINGS_DOMAINS),
+    )
+    return params
+
+
+@router.get(
+    "/filters",
+    dependencies=[
+        LIGHT_ROUTE,
+        Depends(versioned_conditional_get(REFERENCE_DATA_CACHE, *RANKINGS_DOMAINS)),
+    ],
+)
 async def read_rankings_filters(service: RankingServiceDep) -> RankingsFiltersResponse:
     return service.get_ranking_filters()
 
 
-@router.get("/")
-async def read_rankings(
+# sync, runs in the threadpool like the other heavy endpoints
+@router.get("/", response_model=RankingsResponse, dependencies=[HEAVY_ROUTE])
+def read_rankings(
+    request: Request,
+    response: Response,
     service: RankingServiceDep,
-    params: Annotated[RankingsParams, Query()],
-) -> RankingsResponse:
-    return service.get_rankings_page(params)
+    params: Annotated[RankingsParams, Depends(get_conditional_rankings_params)],
+) -> Response:
+    # the returned response replaces `response`, keep the validators set on it
+    return PrecompressedResponse(
+        request, service.get_rankings_page_body(params), headers=response.headers
+    )
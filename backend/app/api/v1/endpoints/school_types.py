@@ -2,13 +2,18 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
 
-from app.dependencies import SessionDep
+from app.api.conditional import REFERENCE_DATA_CACHE, versioned_conditional_get
+from app.core.request_timing import TimedRoute
+from app.dependencies import LIGHT_ROUTE, SessionDep
+from app.models.data_version import DataDomain
 from app.schemas.schools import TypSzkolyPublic
 from app.services.school_type_service import SchoolTypeService
 
 router = APIRouter(
     prefix="/school_types",
     tags=["school_types"],
+    route_class=TimedRoute,
+    dependencies=[LIGHT_ROUTE],
 )
 
 
@@ -19,7 +24,13 @@ def get_school_type_service(session: SessionDep) -> SchoolTypeService:
 SchoolServiceDep = Annotated[SchoolTypeService, Depends(get_school_type_service)]
 
 
-@router.get("/", response_model=list[TypSzkolyPublic])
+@router.get(
+    "/",
+    response_model=list[TypSzkolyPublic],
+    dependencies=[
+        Depends(versioned_conditional_get(REFERENCE_DATA_CACHE, DataDomain.SCHOOLS))
+    ],
+)
 async def read_school_types(
     service: SchoolServiceDep,
     names: Annotated[
@@ -1,12 +1,21 @@
+from datetime import UTC
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 
-from app.dependencies import SessionDep
+from app.api.conditional import SCHOOL_CACHE, check_conditional_get, strong_etag
+from app.core.compression import PrecompressedResponse
+from app.core.request_timing import TimedRoute
+from app.dependencies import HEAVY_ROUTE, LIGHT_ROUTE, DataVersionsDep, SessionDep
+from app.models.data_version import DataDomain
 from app.models.schools import (
     Szkola,
 )
-from app.schemas.school_filters import SchoolFilterParams
+from app.schemas.school_filters import (
+    SchoolFilterParams,
+    SchoolTileParams,
+    SchoolTilesResponse,
+)
 from app.schemas.schools import (
     SzkolaPublicShort,
     SzkolaPublicWithRelations,
@@ -19,6 +28,7 @@ _ = SzkolaPublicWithRelations.model_rebuild()
 router = APIRouter(
     prefix="/schools",
     tags=["schools"],
+    route_class=TimedRoute,
 )
 
 
@@ -29,13 +39,58 @@ def get_school_service(session: SessionDep) -> SchoolService:
 SchoolServiceDep = Annotated[SchoolService, Depends(get_school_service)]
 
 
-@router.get("/live")
-async def read_schools_live(
-    service: SchoolServiceDep, filters: Annotated[SchoolFilterParams, Query()]
-) -> list[SzkolaPublicShort]:
-    return service.get_schools_live(filters)
+# heavy endpoints are sync and run in the threadpool, a long query does not
+# block the event loop serving the light ones
+@router.get("/live", response_model=list[SzkolaPublicShort], dependencies=[HEAVY_ROUTE])
+def read_schools_live(
+    request: Request,
+    service: SchoolServiceDep,
+    filters: Annotated[SchoolFilterParams, Query()],
+) -> Response:
+    return PrecompressedResponse(request, service.get_schools_live_body(filters))
+
+
+@router.get(
+    "/live/tiles", response_model=SchoolTilesResponse, dependencies=[HEAVY_ROUTE]
+)
+def read_schools_live_tiles(
+    service: SchoolServiceDep, params: Annotated[SchoolTileParams, Query()]
+) -> Response:
+    return Response(
+        service.get_schools_live_tiles(params), media_type="application/json"
+    )
 
 
-@router.get("/{school_id}", response_model=SzkolaPublicWithRelations)
+def check_school_conditional_get(
+    school_id: int,
+    request: Request,
+    response: Response,
+    versions: DataVersionsDep,
+    service: SchoolServiceDep,
+) -> None:
+    updated_at = service.get_school_updated_at(school_id)
+    if updated_at is None:
+        # the endpoint answers 404
+        return
+    if updated_at.tzinfo is None:
+        # TimestampMixin columns are stored without a time zone, in UTC
+        updated_at = updated_at.replace(tzinfo=UTC)
+    # the detail embeds exam results, rankings and reference data as well
+    domains = list(DataDomain)
+    last_modified = max(updated_at, versions.last_modified(*domains) or updated_at)
+    check_conditional_get(
+        request,
+        response,
+        etag=strong_etag(school_id, updated_at.isoformat(), versions.token(*domains)),
+        policy=SCHOOL_CACHE,
+        last_modified=last_modified,
+    )
+
+
+@router.get(
+    "/{school_id}",
+    response_model=SzkolaPublicWithRelations,
+    dependencies=[LIGHT_ROUTE, Depends(check_school_conditional_get)],
+)
 async def read_school(school_id: int, service: SchoolServiceDep) -> Szkola:
     return service.get_school_with_relations(school_id)
@@ -0,0 +1,161 @@
+import math
+from dataclasses import dataclass
+from typing import Literal, Self
+
+type BboxMode = Literal["within", "outside"]
+type TileKey = tuple[int, int]
+
+
+@dataclass(frozen=True, slots=True)
+class BoundingBox:
+    """Axis-aligned lng/lat rectangle, boundaries included."""
+
+    min_lng: float
+    min_lat: float
+    max_lng: float
+    max_lat: float
+
+    @classmethod
+    def parse(cls, value: str) -> Self:
+        """Parse `min_lng,min_lat,max_lng,max_lat`."""
+        parts = value.split(",")
+        if len(parts) != 4:
+            raise ValueError(
+                f"Bounding box must be min_lng,min_lat,max_lng,max_lat, got '{value}'"
+            )
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in parts)
+        if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+            raise ValueError(f"Invalid bounding box '{value}'")
+        return cls(min_lng, min_lat, max_lng, max_lat)
+
+    def contains(self, lng: float, lat: float) -> bool:
+        return (
+            self.min_lng <= lng <= self.max_lng and self.min_lat <= lat <= self.max_lat
+        )
+
+    def overlaps(self, other: "BoundingBox") -> bool:
+        """Whether the two boxes share a region of positive area."""
+        return (
+            self.min_lng < other.max_lng
+            and other.min_lng < self.max_lng
+            and self.min_lat < other.max_lat
+            and other.min_lat < self.max_lat
+        )
+
+    def subtract(self, other: "BoundingBox") -> list["BoundingBox"]:
+        """
+        Split the part of this box not covered by `other` into at most four boxes:
+        full-height strips left and right of `other`, and the parts below and
+        above it between those strips.
+        """
+        if not self.overlaps(other):
+            return [self]
+
+        inner_min_lng = max(self.min_lng, other.min_lng)
+        inner_max_lng = min(self.max_lng, other.max_lng)
+        pieces = [
+            BoundingBox(self.min_lng, self.min_lat, inner_min_lng, self.max_lat),
+            BoundingBox(inner_max_lng, self.min_lat, self.max_lng, self.max_lat),
+            BoundingBox(inner_min_lng, self.min_lat, inner_max_lng, other.min_lat),
+            BoundingBox(inner_min_lng, other.max_lat, inner_max_lng, self.max_lat),
+        ]
+        return [
+            piece
+            for piece in pieces
+            if piece.min_lng < piece.max_lng and piece.min_lat < piece.max_lat
+        ]
+
+
+WORLD_EXTENT = BoundingBox(-180.0, -90.0, 180.0, 90.0)
+
+
+@dataclass(frozen=True, slots=True)
+class BboxSelection:
+    """
+    Area to load: points inside any of `regions` and inside none of `excluded`.
+
+    `regions` are the index-friendly rectangles to scan; they touch the excluded
+    boxes only along their edges, so the exact exclusion is checked separately.
+    """
+
+    regions: tuple[BoundingBox, ...]
+    excluded: tuple[BoundingBox, ...]
+
+    @classmethod
+    def build(
+        cls,
+        viewport: BoundingBox | None,
+        mode: BboxMode,
+        excluded: list[BoundingBox],
+    ) -> Self:
+        if viewport is None:
+            regions = [WORLD_EXTENT]
+        elif mode == "within":
+            regions = [viewport]
+        else:
+            # the complement of the viewport, instead of NOT (geom && viewport)
+            regions = [WORLD_EXTENT]
+            excluded = [viewport, *excluded]
+
+        for box in excluded:
+            regions = [piece for region in regions for piece in region.subtract(box)]
+        return cls(tuple(regions), tuple(excluded))
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.regions
+
+    def contains(self, lng: float, lat: float) -> bool:
+        return any(region.contains(lng, lat) for region in self.regions) and not any(
+            box.contains(lng, lat) for box in self.excluded
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TileGrid:
+    """Fixed lng/lat grid of square tiles, keyed by their column and row."""
+
+    size: float
+
+    def key_of(self, lng: float, lat: float) -> TileKey:
+        return math.floor(lng / self.size), math.floor(lat / self.size)
+
+    def bounds(self, key: TileKey) -> BoundingBox:
+        x, y = key
+        return BoundingBox(
+            x * self.size, y * self.size, (x + 1) * self.size, (y + 1) * self.size
+        )
+
+    def count(self, box: BoundingBox) -> int:
+        min_x, min_y = self.key_of(box.min_lng, box.min_lat)
+        max_x, max_y = self.key_of(box.max_lng, box.max_lat)
+        return (max_x - min_x + 1) * (max_y - min_y + 1)
+
+    def covers(self, box: BoundingBox, key: TileKey) -> bool:
+        """Whether `key` is one of the tiles `covering(box)` returns."""
+        min_x, min_y = self.key_of(box.min_lng, box.min_lat)
+        max_x, max_y = self.key_of(box.max_lng, box.max_lat)
+        return min_x <= key[0] <= max_x and min_y <= key[1] <= max_y
+
+    def covering(self, box: BoundingBox) -> list[TileKey]:
+        min_x, min_y = self.key_of(box.min_lng, box.min_lat)
+        max_x, max_y = self.key_of(box.max_lng, box.max_lat)
+        return [
+            (x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)
+        ]
+
+    @staticmethod
+    def format_key(key: TileKey) -> str:
+        return f"{key[0]}:{key[1]}"
+
+    @staticmethod
+    def parse_key(value: str) -> TileKey:
+        x, sep, y = value.partition(":")
+        if not sep:
+            raise ValueError(f"Tile key must be x:y, got '{value}'")
+        return int(x), int(y)
+
+
+# a quarter of a degree is roughly 28 x 17 km in Poland, a few hundred schools
+# at most in the biggest cities
+LIVE_TILE_GRID = TileGrid(0.25)
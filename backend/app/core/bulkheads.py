@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Literal
+
+from app.core.database import settings
+from app.core.metrics import BULKHEAD_IN_USE, BULKHEAD_QUEUE_WAIT, BULKHEAD_REJECTED
+
+logger = logging.getLogger(__name__)
+
+type RouteClass = Literal["heavy", "light", "write"]
+
+# a rejected request is cheap to retry, the queue moves on within seconds
+RETRY_AFTER_SECONDS = 1
+
+
+class BulkheadFullError(Exception):
+    """The route class has no free slot and its queue is full or took too long."""
+
+    def __init__(self, route_class: RouteClass, retry_after: int) -> None:
+        self.route_class: RouteClass = route_class
+        self.retry_after: int = retry_after
+        super().__init__(f"Too many concurrent {route_class} requests")
+
+
+class Bulkhead:
+    """
+    Concurrency limit of one route class. At most `limit` requests run at once,
+    up to `max_queue` more wait for a slot for at most `queue_timeout` seconds
+    and any other request is rejected at once instead of piling up in front of
+    the database pool.
+    """
+
+    def __init__(
+        self,
+        route_class: RouteClass,
+        limit: int,
+        max_queue: int,
+        queue_timeout: float,
+    ) -> None:
+        self.route_class: RouteClass = route_class
+        self.limit: int = limit
+        self.max_queue: int = max_queue
+        self.queue_timeout: float = queue_timeout
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(limit)
+        self._waiting: int = 0
+
+    def _reject(self, reason: str) -> BulkheadFullError:
+        BULKHEAD_REJECTED.labels(bulkhead=self.route_class, reason=reason).inc()
+        logger.warning(
+            f"🚧 Rejected a {self.route_class} request ({reason}), {self._waiting} waiting"
+        )
+        return BulkheadFullError(self.route_class, RETRY_AFTER_SECONDS)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            raise self._reject("queue_full")
+
+        start = time.perf_counter()
+        self._waiting += 1
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                _ = await self._semaphore.acquire()
+        except TimeoutError:
+            raise self._reject("queue_timeout") from None
+        finally:
+            self._waiting -= 1
+            BULKHEAD_QUEUE_WAIT.labels(bulkhead=self.route_class).observe(
+                time.perf_counter() - start
+            )
+
+        in_use = BULKHEAD_IN_USE.labels(bulkhead=self.route_class)
+        in_use.inc()
+        try:
+            yield
+        finally:
+            in_use.dec()
+            self._semaphore.release()
+
+    async def hold(self) -> AsyncIterator[None]:
+        """Route dependency keeping a slot until the response has been sent."""
+        async with self.admit():
+            yield
+
+
+def _bulkhead(route_class: RouteClass, limit: int) -> Bulkhead:
+    return Bulkhead(
+        route_class,
+        limit,
+        max_queue=limit * settings.BULKHEAD_QUEUE_PER_SLOT,
+        queue_timeout=settings.BULKHEAD_QUEUE_TIMEOUT_SECONDS,
+    )
+
+
+bulkheads: dict[RouteClass, Bulkhead] = {
+    "heavy": _bulkhead("heavy", settings.BULKHEAD_HEAVY_LIMIT),
+    "light": _bulkhead("light", settings.BULKHEAD_LIGHT_LIMIT),
+    "write": _bulkhead("write", settings.BULKHEAD_WRITE_LIMIT),
+}
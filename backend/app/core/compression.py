@@ -0,0 +1,226 @@
+import gzip
+import importlib
+import threading
+from collections.abc import Callable, Mapping
+from typing import Literal, cast
+
+import anyio.to_thread
+from fastapi import Request, Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+type Encoding = Literal["br", "zstd", "gzip"]
+type Effort = Literal["fast", "best"]
+
+# on-the-fly compression runs on every request and favours speed, cached
+# payloads are compressed once per entry and can afford a better ratio
+_GZIP_LEVELS: dict[Effort, int] = {"fast": 5, "best": 9}
+_BROTLI_QUALITY: dict[Effort, int] = {"fast": 4, "best": 9}
+_ZSTD_LEVELS: dict[Effort, int] = {"fast": 3, "best": 12}
+
+
+def _gzip(body: bytes, effort: Effort) -> bytes:
+    return gzip.compress(body, compresslevel=_GZIP_LEVELS[effort], mtime=0)
+
+
+_COMPRESSORS: dict[Encoding, Callable[[bytes, Effort], bytes]] = {"gzip": _gzip}
+
+# brotli and zstd are used when installed (zstd is in the standard library from 3.14)
+try:
+    import brotli  # pyright: ignore[reportMissingImports]
+
+    def _brotli(body: bytes, effort: Effort) -> bytes:
+        return brotli.compress(body, quality=_BROTLI_QUALITY[effort])  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+
+    _COMPRESSORS["br"] = _brotli
+except ImportError:
+    pass
+
+try:
+    # looked up by name, a static `from compression import zstd` reads as an
+    # import of this module
+    _zstd_compress = cast(
+        Callable[..., bytes],
+        importlib.import_module("compression.zstd").compress,
+    )
+
+    def _zstd(body: bytes, effort: Effort) -> bytes:
+        return _zstd_compress(body, level=_ZSTD_LEVELS[effort])
+
+    _COMPRESSORS["zstd"] = _zstd
+except ImportError:
+    pass
+
+# server preference when the client accepts several encodings with equal weight
+_ENCODINGS_BY_PREFERENCE: tuple[Encoding, ...] = ("br", "zstd", "gzip")
+AVAILABLE_ENCODINGS: tuple[Encoding, ...] = tuple(
+    encoding for encoding in _ENCODINGS_BY_PREFERENCE if encoding in _COMPRESSORS
+)
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/geo+json", "text/")
+# bodies from this size on are compressed in a worker thread
+_THREAD_MIN_SIZE = 64 * 1024
+
+
+def compress(body: bytes, encoding: Encoding, effort: Effort = "fast") -> bytes:
+    return _COMPRESSORS[encoding](body, effort)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> Encoding | None:
+    """Best available encoding accepted by the client, None for identity."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        param_name, _, value = params.strip().partition("=")
+        if param_name.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    best: Encoding | None = None
+    best_weight = 0.0
+    for encoding in AVAILABLE_ENCODINGS:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def _is_compressible(content_type: str | None) -> bool:
+    return content_type is not None and content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class PrecompressedBody:
+    """
+    Serialized response body kept in a cache together with its compressed
+    variants. Each variant is compressed on the first request accepting it,
+    later hits send the stored bytes.
+    """
+
+    def __init__(
+        self, raw: bytes, media_type: str = "application/json", min_size: int = 0
+    ) -> None:
+        self.raw: bytes = raw
+        self.media_type: str = media_type
+        self._min_size: int = min_size
+        self._variants: dict[Encoding, bytes] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def variant(self, encoding: Encoding | None) -> tuple[bytes, Encoding | None]:
+        """Body to send for the negotiated encoding, raw when not worth compressing."""
+        if encoding is None or len(self.raw) < self._min_size:
+            return self.raw, None
+        with self._lock:
+            if encoding not in self._variants:
+                self._variants[encoding] = compress(self.raw, encoding, "best")
+            return self._variants[encoding], encoding
+
+    @property
+    def stored_bytes(self) -> int:
+        return len(self.raw) + sum(len(body) for body in self._variants.values())
+
+
+class PrecompressedResponse(Response):
+    """Response sending the variant of a PrecompressedBody the client accepts."""
+
+    def __init__(
+        self,
+        request: Request,
+        body: PrecompressedBody,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        content, encoding = body.variant(
+            negotiate_encoding(request.headers.get("accept-encoding"))
+        )
+        super().__init__(content, media_type=body.media_type, headers=headers)
+        self.headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            self.headers["Content-Encoding"] = encoding
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON and text responses of at least `min_size` bytes with the
+    best encoding the client accepts. Responses that already carry a
+    Content-Encoding (precompressed cache hits) and streamed bodies pass
+    through unchanged. Every compressible response gets `Vary: Accept-Encoding`,
+    also when it is sent uncompressed.
+
+    The ETag of these responses to a client accepting an encoding is made weak:
+    one validator then stands for the identity and the compressed bytes, which
+    a strong ETag must not. If-None-Match uses the weak comparison, so these
+    ETags still revalidate.
+    """
+
+    def __init__(self, app: ASGIApp, min_size: int) -> None:
+        self.app: ASGIApp = app
+        self.min_size: int = min_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+
+        start_message: Message | None = None
+        passthrough = False
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                compressible = "content-encoding" in headers or _is_compressible(
+                    headers.get("content-type")
+                )
+                # a 304 carries the Vary and validators of the response it stands for
+                if compressible or message["status"] == 304:
+                    headers.add_vary_header("Accept-Encoding")
+                    if encoding is not None:
+                        _weaken_etag(headers)
+                if (
+                    encoding is None
+                    or not compressible
+                    or "content-encoding" in headers
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # held back until the body shows whether it is worth compressing
+                    start_message = message
+                return
+            if passthrough or start_message is None or encoding is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            passthrough = True
+            body: bytes = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.min_size:
+                await send(start)
+                await send(message)
+                return
+
+            if len(body) >= _THREAD_MIN_SIZE:
+                # large bodies would hold up every other request on the event loop
+                compressed = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            headers = MutableHeaders(scope=start)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, compressing_send)
@@ -1,6 +1,7 @@
 from pathlib import Path
+from typing import Literal
 
-from pydantic import PostgresDsn, TypeAdapter, ValidationInfo, field_validator
+from pydantic import Field, PostgresDsn, TypeAdapter, ValidationInfo, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +13,46 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     TURNSTILE_SECRET_KEY: str = ""
 
+    # "json" writes one JSON object per log line (API and import scripts)
+    LOG_FORMAT: Literal["text", "json"] = "text"
+
+    # LISTEN for data_version notifications of the import jobs and invalidate caches at once
+    DATA_CHANGE_LISTENER_ENABLED: bool = True
+    # how long an API worker trusts its copy of the data_version table
+    DATA_VERSION_POLL_SECONDS: float = Field(5.0, gt=0.0)
+
+    # smallest JSON/text response body compressed with gzip (or br/zstd when installed)
+    COMPRESSION_MIN_SIZE: int = Field(1024, ge=0)
+
+    # PREPARE the live map queries once per connection and EXECUTE them afterwards,
+    # must be off behind a transaction-pooling pgbouncer
+    PREPARED_STATEMENTS_ENABLED: bool = True
+
+    # per-request Server-Timing header and timing log line, for a sampled share of requests
+    REQUEST_TIMING_ENABLED: bool = False
+    REQUEST_TIMING_SAMPLE_RATE: float = Field(1.0, ge=0.0, le=1.0)
+
+    # queries slower than the threshold are written with their EXPLAIN to logs/slow_queries.log
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = Field(500.0, gt=0.0)
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    # concurrent requests per route class (heavy: country-wide lists and ranking pages,
+    # light: single records and reference data, write: contact form); each request
+    # holds at most one pooled connection, so the pool is sized from these limits
+    BULKHEAD_HEAVY_LIMIT: int = Field(4, ge=1)
+    BULKHEAD_LIGHT_LIMIT: int = Field(8, ge=1)
+    BULKHEAD_WRITE_LIMIT: int = Field(2, ge=1)
+    # requests allowed to wait per slot and for how long, others get a 503 at once
+    BULKHEAD_QUEUE_PER_SLOT: int = Field(4, ge=0)
+    BULKHEAD_QUEUE_TIMEOUT_SECONDS: float = Field(5.0, gt=0.0)
+    # statement_timeout of the queries of each route class in ms (0 disables it)
+    STATEMENT_TIMEOUT_HEAVY_MS: int = Field(15_000, ge=0)
+    STATEMENT_TIMEOUT_LIGHT_MS: int = Field(3_000, ge=0)
+    STATEMENT_TIMEOUT_WRITE_MS: int = Field(5_000, ge=0)
+    # pool connections beyond the bulkhead slots, for cache refreshes and other background work
+    DB_POOL_MAX_OVERFLOW: int = Field(4, ge=0)
+
     # PostgresDsn represents a standardized PostgreSQL connection string
     DATABASE_URI: PostgresDsn | None = None
 
@@ -47,6 +88,14 @@ class Settings(BaseSettings):
             return str(self.DATABASE_URI)
         raise ValueError("Database URI not configured")
 
+    def get_pool_size(self) -> int:
+        # one connection per bulkhead slot, light requests never wait behind heavy ones
+        return (
+            self.BULKHEAD_HEAVY_LIMIT
+            + self.BULKHEAD_LIGHT_LIMIT
+            + self.BULKHEAD_WRITE_LIMIT
+        )
+
     model_config: SettingsConfigDict = SettingsConfigDict(  # pyright: ignore[reportIncompatibleVariableOverride]
         env_file=Path(__file__).resolve().parents[2] / ".env",
         env_file_encoding="utf-8",
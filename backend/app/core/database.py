@@ -1,10 +1,22 @@
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlmodel import Session, create_engine
 
 from app.core.config import Settings
+from app.core.metrics import InstrumentedQueuePool, instrument_engine_pool
 
 # DATABASE_URI is of type PostgresDsn, that's why we need get_connection_string method
 settings = Settings()  # pyright: ignore[reportCallIssue]
-engine = create_engine(settings.get_connection_string())
+engine = create_engine(
+    settings.get_connection_string(),
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.get_pool_size(),
+    max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+)
+instrument_engine_pool(engine)
+
+# errors meaning the database is unreachable or overloaded, not a bug in the query
+DATABASE_UNAVAILABLE_ERRORS = (DBAPIError, PoolTimeoutError)
 
 
 def get_session():
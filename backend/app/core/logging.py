@@ -1,15 +1,140 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import time
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import Literal, override
 
 LOGS_DIR = Path(__file__).resolve().parents[2] / "logs"
 LOGS_DIR.mkdir(exist_ok=True)
 
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-def configure_logging(file_name: str = "app.log"):
+type LogFormat = Literal["text", "json"]
+
+_listener: QueueListener | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message (and exception)."""
+
+    @override
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, object] = {
+            "timestamp": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    Resolve the message and traceback in the logging thread (arguments and
+    exceptions may not outlive the call) but leave formatting to the listener.
+    """
+
+    @override
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(file_name: str = "app.log", log_format: LogFormat = "text"):
+    """
+    Log to logs/<file_name> and stderr from a background thread.
+
+    The calling code only puts records on a queue, the file and stream writes
+    happen in a QueueListener that is flushed and stopped at interpreter exit.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = (
+        JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    )
     file_handler = logging.FileHandler(LOGS_DIR / file_name)
     stream_handler = logging.StreamHandler()
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[file_handler, stream_handler],
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _listener = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
     )
+    _listener.start()
+    _ = atexit.register(_listener.stop)
+
+    logging.basicConfig(level=logging.INFO, handlers=[_RecordQueueHandler(log_queue)])
+
+
+class ProgressLog:
+    """
+    Aggregated progress of a long loop, logged at most every `interval_seconds`
+    instead of one line per processed item:
+
+        ⏳ API schools: 12000/52000 (23.1%), 410.3/s, ETA 0:01:37 - added=11800 updated=200
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        label: str,
+        total: int | None = None,
+        interval_seconds: float = 10.0,
+    ) -> None:
+        self.logger: logging.Logger = logger
+        self.label: str = label
+        self.total: int | None = total
+        self.interval_seconds: float = interval_seconds
+        self.done: int = 0
+        self.counts: Counter[str] = Counter()
+        self._started: float = time.perf_counter()
+        self._last_logged: float = self._started
+
+    def advance(self, items: int = 1, outcome: str | None = None) -> None:
+        """Count processed items, `outcome` (added, updated, skipped, ...) is tallied separately."""
+        self.done += items
+        if outcome is not None:
+            self.counts[outcome] += items
+        now = time.perf_counter()
+        if now - self._last_logged >= self.interval_seconds:
+            self._last_logged = now
+            self.logger.info(f"⏳ {self._summary(now)}")
+
+    def finish(self) -> None:
+        self.logger.info(f"✅ {self._summary(time.perf_counter())}")
+
+    def _summary(self, now: float) -> str:
+        elapsed = now - self._started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        summary = f"{self.label}: {self.done}"
+        if self.total:
+            summary += f"/{self.total} ({self.done / self.total:.1%})"
+        summary += f", {rate:.1f}/s"
+        if self.total and rate > 0 and self.done < self.total:
+            eta = timedelta(seconds=round((self.total - self.done) / rate))
+            summary += f", ETA {eta}"
+        else:
+            summary += f", elapsed {timedelta(seconds=round(elapsed))}"
+        if self.counts:
+            summary += " - " + " ".join(
+                f"{outcome}={count}" for outcome, count in sorted(self.counts.items())
+            )
+        return summary
@@ -0,0 +1,207 @@
+import os
+import time
+from typing import override
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import PoolProxiedConnection, QueuePool
+from starlette.routing import NoMatchFound, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# With several uvicorn workers every process writes its samples to files in
+# PROMETHEUS_MULTIPROC_DIR and /metrics merges them, whichever worker serves it.
+# Gauges are summed over live processes only.
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving the request to sending the last body chunk.",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size as sent (after compression, if any).",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Connections currently checked out of the pool.",
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured pool size (without overflow).",
+    multiprocess_mode="livesum",
+)
+
+DB_QUERIES_CANCELLED = Counter(
+    "db_queries_cancelled_total",
+    "Queries cancelled by reason (client_disconnect/statement_timeout).",
+    ["reason"],
+)
+DB_WASTED_SECONDS = Counter(
+    "db_wasted_seconds_total",
+    "Database time of requests whose client disconnected and of queries cut off by the statement timeout.",
+    ["reason"],
+)
+
+BULKHEAD_QUEUE_WAIT = Histogram(
+    "bulkhead_queue_wait_seconds",
+    "Time a request waited for a slot of its route class, rejected ones included.",
+    ["bulkhead"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+BULKHEAD_IN_USE = Gauge(
+    "bulkhead_in_use",
+    "Requests currently holding a slot of their route class.",
+    ["bulkhead"],
+    multiprocess_mode="livesum",
+)
+BULKHEAD_REJECTED = Counter(
+    "bulkhead_rejected_total",
+    "Requests answered with 503 by route class and reason (queue_full/queue_timeout).",
+    ["bulkhead", "reason"],
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "In-process cache lookups by cache name and result (hit/miss).",
+    ["cache", "result"],
+)
+
+_UNMATCHED_ROUTE = "unmatched"
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports checkout wait time and the number of connections in use."""
+
+    @override
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        connection = super().connect()
+        DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+        return connection
+
+
+def instrument_engine_pool(engine: Engine) -> None:
+    """Track pool usage of an engine created with `poolclass=InstrumentedQueuePool`."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    DB_POOL_SIZE.set(pool.size())
+
+    def update_checked_out(*_args: object) -> None:
+        DB_POOL_CHECKED_OUT.set(pool.checkedout())
+
+    event.listen(pool, "checkout", update_checked_out)
+    event.listen(pool, "checkin", update_checked_out)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def _route_label(scope: Scope) -> str:
+    """
+    Path template of the matched route (/api/v1/schools/{school_id}), keeping
+    label cardinality bounded.
+    """
+    route = scope.get("route")
+    if not isinstance(route, Route):
+        return _UNMATCHED_ROUTE
+    # routes of included routers hold their path without the include prefix,
+    # recover the prefix from the request path
+    path: str = scope["path"]
+    try:
+        tail = str(route.url_path_for(route.name, **scope.get("path_params", {})))
+    except NoMatchFound:
+        return route.path_format
+    prefix = path.removesuffix(tail) if path.endswith(tail) else ""
+    return prefix + route.path_format
+
+
+class PrometheusMiddleware:
+    """Record count, latency, in-flight requests and response size per route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method: str = scope["method"]
+        status_code = 500
+        response_bytes = 0
+        start = time.perf_counter()
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            in_progress.dec()
+            route = _route_label(scope)
+            HTTP_REQUESTS.labels(method=method, route=route, status=status_code).inc()
+            HTTP_REQUEST_DURATION.labels(method=method, route=route).observe(
+                time.perf_counter() - start
+            )
+            HTTP_RESPONSE_SIZE.labels(method=method, route=route).observe(
+                response_bytes
+            )
+
+
+def mark_worker_exited() -> None:
+    """
+    Drop the livesum gauge samples of this worker process, otherwise its last
+    in-flight and pool values keep being summed after it has exited.
+    """
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def metrics_response() -> Response:
+    registry = REGISTRY
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        _ = multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,151 @@
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import cast
+
+from sqlalchemy import ClauseElement, Connection, CursorResult, Select
+from sqlalchemy.engine import ExecutionContext
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+# key of the names prepared on a DBAPI connection, in its pool record info
+_PREPARED_INFO_KEY = "prepared_statements"
+# execution option of an EXECUTE with the statement it runs, as SQL and
+# parameters psycopg2 would send unprepared
+_SOURCE_OPTION = "prepared_statement_source"
+# sent with every EXECUTE: the rows a live query matches range from one street
+# to the whole country with its bbox, a generic plan cached after five
+# executions would serve all of them alike
+CUSTOM_PLANS_SQL = "SET LOCAL plan_cache_mode = force_custom_plan"
+
+
+@dataclass(frozen=True, slots=True)
+class PreparedSql:
+    name: str
+    # PREPARE text with $1..$n placeholders and the bind parameter of each
+    sql: str
+    # the statement compiled for psycopg2, logged and explained in place of the EXECUTE
+    source_sql: str
+    params: tuple[str, ...]
+    compiled_params: dict[str, object]
+
+    def execute_sql(self, params: dict[str, object]) -> tuple[str, tuple[object, ...]]:
+        """EXECUTE statement for psycopg2 and its arguments in placeholder order."""
+        values = self.compiled_params | params
+        arguments = tuple(values[name] for name in self.params)
+        if not arguments:
+            return f"EXECUTE {self.name}", arguments
+        placeholders = ", ".join(["%s"] * len(arguments))
+        return f"EXECUTE {self.name} ({placeholders})", arguments
+
+
+class PreparedStatements:
+    """
+    Server-side prepared statements for statements reused with new values.
+
+    psycopg2 interpolates parameters on the client, so Postgres parses and
+    plans every execution. Here a statement is compiled once, PREPAREd on each
+    pooled connection the first time it runs there and afterwards sent as
+    EXECUTE, letting Postgres reuse the parse tree. Each execution is still
+    planned for its own values. Statements are recognised by identity, so
+    callers must reuse the statement objects (e.g. one per query shape).
+    """
+
+    def __init__(self, max_statements: int = 256) -> None:
+        self._max_statements: int = max_statements
+        self._compiled: OrderedDict[ClauseElement, PreparedSql] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def execute[*Ts](
+        self,
+        connection: Connection,
+        statement: Select[*Ts],
+        params: dict[str, object],
+    ) -> CursorResult[*Ts]:
+        prepared = self.compile(connection, statement)
+        names: set[str] = connection.connection.info.setdefault(  # pyright: ignore[reportAny]
+            _PREPARED_INFO_KEY, set()
+        )
+        if prepared.name not in names:
+            if len(names) >= self._max_statements:
+                # more shapes than expected, do not grow server memory any further
+                return connection.execute(statement, params)
+            # sent outside of SQLAlchemy's events, the PREPARE is part of the
+            # first execution and not a query of its own
+            cursor = connection.connection.dbapi_connection.cursor()  # pyright: ignore[reportOptionalMemberAccess]
+            try:
+                cursor.execute(f"PREPARE {prepared.name} AS {prepared.sql}")
+            finally:
+                cursor.close()
+            names.add(prepared.name)
+
+        sql, arguments = prepared.execute_sql(params)
+        # the EXECUTE returns the columns of `statement`
+        return cast(
+            CursorResult[*Ts],
+            connection.exec_driver_sql(
+                f"{CUSTOM_PLANS_SQL}; {sql}",
+                arguments,
+                execution_options={
+                    _SOURCE_OPTION: (
+                        prepared.source_sql,
+                        prepared.compiled_params | params,
+                    )
+                },
+            ),
+        )
+
+    def compile[*Ts](
+        self, connection: Connection, statement: Select[*Ts]
+    ) -> PreparedSql:
+        """PREPARE text of `statement`, compiled on its first use."""
+        with self._lock:
+            prepared = self._compiled.get(statement)
+            if prepared is not None:
+                self._compiled.move_to_end(statement)
+                return prepared
+
+        compiled = statement.compile(dialect=connection.dialect)
+        order: list[str] = []
+
+        def positional(match: re.Match[str]) -> str:
+            name = match.group(1)
+            if name not in order:
+                order.append(name)
+            return f"${order.index(name) + 1}"
+
+        sql = _PLACEHOLDER.sub(positional, compiled.string).replace("%%", "%")
+        prepared = PreparedSql(
+            name=f"stmt_{hashlib.sha1(sql.encode()).hexdigest()[:16]}",
+            sql=sql,
+            source_sql=compiled.string,
+            params=tuple(order),
+            compiled_params=dict(compiled.params),
+        )
+        with self._lock:
+            self._compiled[statement] = prepared
+            while len(self._compiled) > self._max_statements:
+                _ = self._compiled.popitem(last=False)
+        logger.debug(f"🧩 Compiled {prepared.name} with {len(order)} parameters")
+        return prepared
+
+
+def source_statement(
+    context: ExecutionContext | None, statement: str, parameters: object
+) -> tuple[str, object]:
+    """
+    SQL and parameters of a cursor execution, with an EXECUTE of a prepared
+    statement resolved to the statement it runs.
+    """
+    if context is not None:
+        source = context.execution_options.get(_SOURCE_OPTION)
+        if source is not None:
+            return source
+    return statement, parameters
+
+
+prepared_statements = PreparedStatements()
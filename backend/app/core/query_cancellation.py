@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import DB_QUERIES_CANCELLED, DB_WASTED_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATE of a statement cancelled by statement_timeout or a cancel request
+QUERY_CANCELED_SQLSTATE = "57014"
+# nginx's status for a request whose client went away before the response
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnectedError(Exception):
+    """The client of the request went away, its queries were cancelled."""
+
+
+class StatementTimeoutError(Exception):
+    """A query of the request ran longer than the route's statement timeout."""
+
+    def __init__(self, timeout_ms: int) -> None:
+        self.timeout_ms: int = timeout_ms
+        super().__init__(f"Query exceeded the statement timeout of {timeout_ms} ms")
+
+
+@dataclass
+class RequestQueries:
+    """
+    Database work of one request: its statement timeout, the query running at
+    the moment (so that it can be cancelled from another thread) and the time
+    its queries took.
+    """
+
+    statement_timeout_ms: int = 0
+    db_seconds: float = 0.0
+    disconnected: bool = False
+    # DBAPI connection and start of the query being executed
+    _running: tuple[object, float] | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def start_query(self, dbapi_connection: object) -> None:
+        with self._lock:
+            if self.disconnected:
+                raise ClientDisconnectedError()
+            self._running = (dbapi_connection, time.perf_counter())
+
+    def finish_query(self) -> float:
+        with self._lock:
+            if self._running is None:
+                return 0.0
+            elapsed = time.perf_counter() - self._running[1]
+            self._running = None
+            self.db_seconds += elapsed
+            return elapsed
+
+    def cancel(self) -> None:
+        """
+        Cancel the running query and refuse further ones. Blocks while the
+        cancel request is sent, the connection is not released meanwhile, so
+        the cancel cannot hit a query of another request.
+        """
+        with self._lock:
+            self.disconnected = True
+            if self._running is None:
+                return
+            connection = self._running[0]
+            connection.cancel()  # pyright: ignore[reportAttributeAccessIssue, reportUnknownMemberType]
+        DB_QUERIES_CANCELLED.labels(reason="client_disconnect").inc()
+
+
+_current_queries: ContextVar[RequestQueries | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def set_statement_timeout(timeout_ms: int) -> None:
+    """Limit every query of the current request, from its next transaction on."""
+    queries = _current_queries.get()
+    if queries is not None:
+        queries.statement_timeout_ms = timeout_ms
+
+
+@contextmanager
+def request_queries() -> Iterator[RequestQueries]:
+    """Track the queries issued in this context, as one request."""
+    queries = RequestQueries()
+    token = _current_queries.set(queries)
+    try:
+        yield queries
+    finally:
+        _current_queries.reset(token)
+        if queries.disconnected:
+            DB_WASTED_SECONDS.labels(reason="client_disconnect").inc(queries.db_seconds)
+
+
+def _begin(conn: Connection) -> None:
+    queries = _current_queries.get()
+    if queries is None or not queries.statement_timeout_ms:
+        return
+    # SET LOCAL lasts until the end of the transaction, sent through the DBAPI
+    # cursor it is not counted or timed as a query of the request
+    cursor = conn.connection.dbapi_connection.cursor()  # pyright: ignore[reportOptionalMemberAccess]
+    try:
+        cursor.execute(
+            f"SET LOCAL statement_timeout = {int(queries.statement_timeout_ms)}"
+        )
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    _cursor: object,
+    _statement: str,
+    _parameters: object,
+    _context: object,
+    _executemany: bool,
+) -> None:
+    queries = _current_queries.get()
+    if queries is not None:
+        queries.start_query(conn.connection.dbapi_connection)
+
+
+def _after_cursor_execute(
+    _conn: Connection,
+    _cursor: object,
+    _statement: str,
+    _parameters: object,
+    _context: object,
+    _executemany: bool,
+) -> None:
+    queries = _current_queries.get()
+    if queries is not None:
+        _ = queries.finish_query()
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    queries = _current_queries.get()
+    if queries is None:
+        return
+    elapsed = queries.finish_query()
+    error = context.original_exception
+    if getattr(error, "pgcode", None) != QUERY_CANCELED_SQLSTATE:
+        return
+    if queries.disconnected:
+        raise ClientDisconnectedError() from error
+    if queries.statement_timeout_ms:
+        DB_QUERIES_CANCELLED.labels(reason="statement_timeout").inc()
+        DB_WASTED_SECONDS.labels(reason="statement_timeout").inc(elapsed)
+        raise StatementTimeoutError(queries.statement_timeout_ms) from error
+
+
+def install_query_cancellation() -> None:
+    """Apply request statement timeouts and track running queries, on every engine."""
+    if not event.contains(Engine, "begin", _begin):
+        event.listen(Engine, "begin", _begin)
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+class QueryCancellationMiddleware:
+    """
+    Watch for the client disconnecting while its request is being handled and
+    cancel the query the request is running, so that an aborted map request
+    (e.g. while panning) stops using the database.
+
+    Only queries running off the event loop can be cancelled: those of sync
+    endpoints (every heavy route) and sync dependencies, which run in the
+    threadpool. An async endpoint (light routes, the contact form) blocks the
+    event loop while it queries, so the disconnect is only noticed at its next
+    `await` and only refuses the queries after it; these routes are bounded
+    by their short statement timeout instead.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # the watcher is the only reader of `receive`, the app reads its copies
+        messages: asyncio.Queue[Message] = asyncio.Queue()
+        response_complete = False
+        disconnected = False
+
+        async def receive_message() -> Message:
+            if disconnected and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def send_message(message: Message) -> None:
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                response_complete = True
+            await send(message)
+
+        with request_queries() as queries:
+
+            async def watch_disconnect() -> None:
+                nonlocal disconnected
+                while not disconnected:
+                    message = await receive()
+                    disconnected = message["type"] == "http.disconnect"
+                    messages.put_nowait(message)
+                if not response_complete:
+                    logger.info(f"🔌 Client disconnected from {scope['path']}")
+                    await asyncio.to_thread(queries.cancel)
+
+            watcher = asyncio.create_task(watch_disconnect())
+            try:
+                await self.app(scope, receive_message, send_message)
+            finally:
+                _ = watcher.cancel()
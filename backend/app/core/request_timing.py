@@ -0,0 +1,258 @@
+import inspect
+import logging
+import random
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import settings
+
+logger = logging.getLogger(__name__)
+
+_QUERY_STARTS_KEY = "request_timing_query_starts"
+
+
+@dataclass
+class RequestTiming:
+    """
+    Time spent by one request, split into DB, dependencies, endpoint code and
+    serialization.
+    """
+
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    # request validation and dependencies (e.g. conditional GET checks, bulkhead
+    # slots), up to the endpoint call; including their queries
+    dependencies_seconds: float = 0.0
+    # the endpoint function, including the service call, its queries and ORM hydration
+    endpoint_seconds: float = 0.0
+    # part of db_seconds spent while the endpoint function ran
+    endpoint_db_seconds: float = 0.0
+    # set while the endpoint function runs; queries issued outside of it come from
+    # dependencies or response serialization (lazy loads of a returned ORM object)
+    in_endpoint: bool = False
+    # set once the endpoint function has returned, queries issued after it come
+    # from response serialization
+    endpoint_done: bool = False
+    # the whole FastAPI route handler: request validation, dependencies,
+    # the endpoint and response serialization
+    handler_seconds: float = 0.0
+    # start of the route handler whose endpoint has not been called yet
+    handler_started: float | None = None
+
+    @property
+    def app_seconds(self) -> float:
+        return max(0.0, self.endpoint_seconds - self.endpoint_db_seconds)
+
+    @property
+    def serialize_seconds(self) -> float:
+        return max(
+            0.0,
+            self.handler_seconds - self.dependencies_seconds - self.endpoint_seconds,
+        )
+
+    def start_endpoint(self) -> float:
+        """Close the dependency phase of the route handler, return the endpoint start."""
+        start = time.perf_counter()
+        if self.handler_started is not None:
+            self.dependencies_seconds += start - self.handler_started
+            self.handler_started = None
+        self.in_endpoint = True
+        return start
+
+    def server_timing(self, total_seconds: float) -> str:
+        return ", ".join(
+            [
+                f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"',
+                f"deps;dur={self.dependencies_seconds * 1000:.1f}",
+                f"app;dur={self.app_seconds * 1000:.1f}",
+                f"serialize;dur={self.serialize_seconds * 1000:.1f}",
+                f"total;dur={total_seconds * 1000:.1f}",
+            ]
+        )
+
+
+_current_timing: ContextVar[RequestTiming | None] = ContextVar(
+    "request_timing", default=None
+)
+
+
+def current_request_timing() -> RequestTiming | None:
+    """Timing of the request being handled, None when it is not sampled."""
+    return _current_timing.get()
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    _cursor: object,
+    _statement: str,
+    _parameters: object,
+    _context: object,
+    _executemany: bool,
+) -> None:
+    if _current_timing.get() is None:
+        return
+    conn.info.setdefault(_QUERY_STARTS_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    _cursor: object,
+    _statement: str,
+    _parameters: object,
+    _context: object,
+    _executemany: bool,
+) -> None:
+    timing = _current_timing.get()
+    starts: list[float] | None = conn.info.get(_QUERY_STARTS_KEY)
+    if timing is None or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    timing.db_queries += 1
+    timing.db_seconds += elapsed
+    if timing.in_endpoint:
+        timing.endpoint_db_seconds += elapsed
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # a failed statement never reaches after_cursor_execute
+    if context.connection is None:
+        return
+    starts: list[float] | None = context.connection.info.get(_QUERY_STARTS_KEY)
+    if starts:
+        _ = starts.pop()
+
+
+def install_query_timing() -> None:
+    """Count queries and DB time of sampled requests, on every engine."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def _timed_endpoint[**P, R](endpoint: Callable[P, R]) -> Callable[P, R]:
+    if inspect.iscoroutinefunction(endpoint):
+
+        @wraps(endpoint)
+        async def timed_async_endpoint(*args: P.args, **kwargs: P.kwargs) -> Any:
+            timing = _current_timing.get()
+            if timing is None:
+                return await endpoint(*args, **kwargs)
+            start = timing.start_endpoint()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timing.in_endpoint = False
+                timing.endpoint_done = True
+                timing.endpoint_seconds += time.perf_counter() - start
+
+        return timed_async_endpoint  # pyright: ignore[reportReturnType]
+
+    @wraps(endpoint)
+    def timed_endpoint(*args: P.args, **kwargs: P.kwargs) -> R:
+        timing = _current_timing.get()
+        if timing is None:
+            return endpoint(*args, **kwargs)
+        start = timing.start_endpoint()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            timing.in_endpoint = False
+            timing.endpoint_done = True
+            timing.endpoint_seconds += time.perf_counter() - start
+
+    return timed_endpoint
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that times the endpoint function and the whole route handler of
+    sampled requests. The handler time before the endpoint call is request
+    validation and dependencies, the time after it is response serialization.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        endpoint: Callable[..., Any],
+        **kwargs: Any,  # pyright: ignore[reportExplicitAny]
+    ) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)  # pyright: ignore[reportAny]
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timing = _current_timing.get()
+            if timing is None:
+                return await handler(request)
+            start = time.perf_counter()
+            timing.handler_started = start
+            try:
+                return await handler(request)
+            finally:
+                end = time.perf_counter()
+                timing.handler_seconds += end - start
+                if timing.handler_started is not None:
+                    # a dependency answered or failed, the endpoint never ran
+                    timing.dependencies_seconds += end - timing.handler_started
+                    timing.handler_started = None
+
+        return timed_handler
+
+
+def _is_sampled() -> bool:
+    if not settings.REQUEST_TIMING_ENABLED:
+        return False
+    return random.random() < settings.REQUEST_TIMING_SAMPLE_RATE
+
+
+class RequestTimingMiddleware:
+    """
+    For sampled requests, add a Server-Timing header (db, deps, app, serialize, total)
+    and log one key=value line. Unsampled requests only pay for the sampling check.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _is_sampled():
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total_seconds = time.perf_counter() - timing.started
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timing.server_timing(total_seconds))
+                _log_request(scope, message, timing, total_seconds)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timing.reset(token)
+
+
+def _log_request(
+    scope: Scope, message: Message, timing: RequestTiming, total_seconds: float
+) -> None:
+    logger.info(
+        f"⏱️ request method={scope['method']} path={scope['path']} status={message['status']} total_ms={total_seconds * 1000:.1f} db_ms={timing.db_seconds * 1000:.1f} db_queries={timing.db_queries} deps_ms={timing.dependencies_seconds * 1000:.1f} app_ms={timing.app_seconds * 1000:.1f} serialize_ms={timing.serialize_seconds * 1000:.1f}"
+    )
@@ -0,0 +1,182 @@
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext, ExecutionContext
+
+from app.core.logging import LOGS_DIR
+from app.core.prepared_statements import source_statement
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_LOG_FILE = LOGS_DIR / "slow_queries.log"
+
+_QUERY_START_KEY = "slow_query_log_start"
+# EXPLAIN without ANALYZE does not run the statement, but only read queries
+# are explained so a captured write is never replayed by mistake
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query_shape(statement: str) -> str:
+    """SQL with bound parameters and literals replaced by `?`, lists collapsed."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("?, ...", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class SlowQuery:
+    timestamp: str
+    duration_ms: float
+    statement: str
+    parameters: object
+    plan: object | None = None
+    explain_error: str | None = None
+
+
+class SlowQueryRecorder:
+    """
+    Write queries slower than the threshold to a rotating JSON-lines log.
+
+    The EXPLAIN (FORMAT JSON) of a captured query runs in a background thread on
+    a single connection of its own engine, so the request that hit the slow
+    query is not delayed further and no connection of the request pool (sized
+    to the bulkhead slots) is taken. When the queue is full new slow queries are
+    dropped.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        threshold_ms: float,
+        explain: bool = True,
+        explain_timeout_ms: int = 5000,
+        max_pending: int = 100,
+    ) -> None:
+        self._engine: Engine = engine
+        # not instrumented by install(), so the EXPLAINs are never recorded
+        self._explain_engine: Engine = create_engine(
+            engine.url, pool_size=1, max_overflow=0, pool_pre_ping=True
+        )
+        self._threshold_seconds: float = threshold_ms / 1000
+        self._explain: bool = explain
+        self._explain_timeout_ms: int = explain_timeout_ms
+        self._pending: queue.Queue[SlowQuery] = queue.Queue(maxsize=max_pending)
+        self._worker: threading.Thread | None = None
+        self._lock: threading.Lock = threading.Lock()
+        self._log: logging.Logger = _slow_query_logger()
+
+    def install(self) -> None:
+        event.listen(self._engine, "before_cursor_execute", self._before_execute)
+        event.listen(self._engine, "after_cursor_execute", self._after_execute)
+        event.listen(self._engine, "handle_error", self._handle_error)
+
+    def _before_execute(
+        self,
+        conn: Connection,
+        _cursor: object,
+        _statement: str,
+        _parameters: object,
+        _context: object,
+        _executemany: bool,
+    ) -> None:
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+    def _after_execute(
+        self,
+        conn: Connection,
+        _cursor: object,
+        statement: str,
+        parameters: object,
+        context: ExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        starts: list[float] | None = conn.info.get(_QUERY_START_KEY)
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if duration < self._threshold_seconds or executemany:
+            return
+
+        # an EXECUTE of a prepared statement is logged and explained as the
+        # statement it runs
+        statement, parameters = source_statement(context, statement, parameters)
+        slow_query = SlowQuery(
+            timestamp=datetime.now(UTC).isoformat(),
+            duration_ms=round(duration * 1000, 1),
+            statement=statement,
+            parameters=parameters,
+        )
+        try:
+            self._pending.put_nowait(slow_query)
+        except queue.Full:
+            logger.warning("⚠️ Slow query log queue is full, dropping a slow query")
+            return
+        self._ensure_worker()
+
+    def _handle_error(self, context: ExceptionContext) -> None:
+        # a failed statement never reaches after_cursor_execute
+        if context.connection is None:
+            return
+        starts: list[float] | None = context.connection.info.get(_QUERY_START_KEY)
+        if starts:
+            _ = starts.pop()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="slow-query-log", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            slow_query = self._pending.get()
+            try:
+                if self._explain and _EXPLAINABLE.match(slow_query.statement):
+                    slow_query.plan = self._explain_plan(slow_query)
+            except Exception as e:
+                slow_query.explain_error = str(e)
+            self._log.info(json.dumps(asdict(slow_query), default=str))
+
+    def _explain_plan(self, slow_query: SlowQuery) -> object:
+        with self._explain_engine.connect() as connection:
+            with connection.begin() as transaction:
+                _ = connection.exec_driver_sql(
+                    f"SET LOCAL statement_timeout = {self._explain_timeout_ms}"
+                )
+                plan = connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {slow_query.statement}",
+                    slow_query.parameters,  # pyright: ignore[reportArgumentType]
+                ).scalar_one()
+                transaction.rollback()
+        return plan
+
+
+def _slow_query_logger() -> logging.Logger:
+    slow_query_logger = logging.getLogger("app.slow_queries")
+    if not slow_query_logger.handlers:
+        handler = RotatingFileHandler(
+            SLOW_QUERY_LOG_FILE, maxBytes=10 * 1024 * 1024, backupCount=5
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.INFO)
+        # one JSON document per line, kept out of the application log
+        slow_query_logger.propagate = False
+    return slow_query_logger
@@ -0,0 +1,147 @@
+"""
+Aggregate the slow query log by normalized query shape.
+
+    uv run slow-query-report
+    uv run slow-query-report --top 5 --log logs/slow_queries.log
+"""
+
+import argparse
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import cast
+
+from app.core.slow_query_log import SLOW_QUERY_LOG_FILE, normalize_query_shape
+
+type PlanNode = dict[str, object]
+
+
+@dataclass
+class QueryShapeStats:
+    shape: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slowest_parameters: object = None
+    # "Seq Scan on szkola", "Index Scan using idx_... on szkola", ...
+    scans: set[str] = field(default_factory=set)
+    explain_errors: int = 0
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+def _plan_nodes(node: PlanNode) -> Iterator[PlanNode]:
+    yield node
+    for child in cast(list[PlanNode], node.get("Plans", [])):
+        yield from _plan_nodes(child)
+
+
+def _scan_descriptions(plan: object) -> set[str]:
+    if not isinstance(plan, list) or not plan:
+        return set()
+    root = cast(list[dict[str, PlanNode]], plan)[0]["Plan"]
+    scans: set[str] = set()
+    for node in _plan_nodes(root):
+        node_type = str(node.get("Node Type", ""))
+        if "Scan" not in node_type:
+            continue
+        description = node_type
+        if "Index Name" in node:
+            description += f" using {node['Index Name']}"
+        if "Relation Name" in node:
+            description += f" on {node['Relation Name']}"
+        scans.add(description)
+    return scans
+
+
+def _log_files(log_path: Path) -> list[Path]:
+    # rotated files first (oldest .5 ... newest .1), then the current one
+    rotated = sorted(
+        log_path.parent.glob(f"{log_path.name}.*"),
+        key=lambda path: int(path.suffix[1:]) if path.suffix[1:].isdigit() else 0,
+        reverse=True,
+    )
+    return [*rotated, log_path] if log_path.exists() else rotated
+
+
+def aggregate(log_path: Path) -> list[QueryShapeStats]:
+    by_shape: dict[str, QueryShapeStats] = {}
+    for path in _log_files(log_path):
+        with path.open(encoding="utf-8") as log_file:
+            for line in log_file:
+                if not line.strip():
+                    continue
+                record = cast(dict[str, object], json.loads(line))
+                shape = normalize_query_shape(str(record["statement"]))
+                stats = by_shape.setdefault(shape, QueryShapeStats(shape))
+                duration_ms = float(cast(float, record["duration_ms"]))
+                stats.count += 1
+                stats.total_ms += duration_ms
+                if duration_ms >= stats.max_ms:
+                    stats.max_ms = duration_ms
+                    stats.slowest_parameters = record.get("parameters")
+                stats.scans |= _scan_descriptions(record.get("plan"))
+                if record.get("explain_error"):
+                    stats.explain_errors += 1
+    return sorted(by_shape.values(), key=lambda stats: stats.total_ms, reverse=True)
+
+
+def print_report(shapes: list[QueryShapeStats], top: int, shape_chars: int) -> None:
+    if not shapes:
+        print("No slow queries recorded.")
+        return
+
+    for rank, stats in enumerate(shapes[:top], start=1):
+        shape = stats.shape
+        if len(shape) > shape_chars:
+            shape = shape[:shape_chars] + " ..."
+        print(
+            f"#{rank} {stats.count} queries, total {stats.total_ms:.0f} ms, avg {stats.avg_ms:.0f} ms, max {stats.max_ms:.0f} ms"
+        )
+        print(f"   {shape}")
+        for scan in sorted(stats.scans):
+            marker = "⚠️ " if scan.startswith("Seq Scan") else ""
+            print(f"   - {marker}{scan}")
+        if stats.explain_errors:
+            print(f"   - EXPLAIN failed {stats.explain_errors} times")
+        print(f"   slowest parameters: {json.dumps(stats.slowest_parameters)}")
+        print()
+
+
+class ReportOptions:
+    log: Path  # pyright: ignore[reportUninitializedInstanceVariable]
+    top: int  # pyright: ignore[reportUninitializedInstanceVariable]
+    shape_chars: int  # pyright: ignore[reportUninitializedInstanceVariable]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Aggregate the slow query log by normalized query shape"
+    )
+    _ = parser.add_argument(
+        "--log",
+        type=Path,
+        default=SLOW_QUERY_LOG_FILE,
+        help="Slow query log file, rotated files next to it are included",
+    )
+    _ = parser.add_argument(
+        "--top", type=int, default=10, help="Number of query shapes to show"
+    )
+    _ = parser.add_argument(
+        "--shape-chars",
+        type=int,
+        default=400,
+        help="Truncate printed query shapes to this many characters",
+    )
+
+    args = ReportOptions()
+    _ = parser.parse_args(namespace=args)
+
+    print_report(aggregate(args.log), args.top, args.shape_chars)
+
+
+if __name__ == "__main__":
+    main()
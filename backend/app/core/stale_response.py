@@ -0,0 +1,51 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# RFC 7234 warn-code for a stored response served because revalidation failed
+REVALIDATION_FAILED_WARNING = '111 - "Revalidation Failed"'
+
+
+@dataclass
+class _ResponseStaleness:
+    stale: bool = False
+
+
+_current_staleness: ContextVar[_ResponseStaleness | None] = ContextVar(
+    "response_staleness", default=None
+)
+
+
+def mark_response_stale() -> None:
+    """Flag the current response as served from a cache entry that could not be refreshed."""
+    staleness = _current_staleness.get()
+    if staleness is not None:
+        staleness.stale = True
+
+
+class StaleResponseMiddleware:
+    """Add a Warning header to responses built from last-good cached data."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        staleness = _ResponseStaleness()
+        token = _current_staleness.set(staleness)
+
+        async def send_with_warning(message: Message) -> None:
+            if message["type"] == "http.response.start" and staleness.stale:
+                headers = MutableHeaders(scope=message)
+                headers.append("Warning", REVALIDATION_FAILED_WARNING)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_warning)
+        finally:
+            _current_staleness.reset(token)
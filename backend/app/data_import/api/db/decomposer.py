@@ -1,10 +1,21 @@
 import logging
 
+import numpy as np
+from geoalchemy2 import WKBElement
+
+from app.core.logging import ProgressLog
 from app.data_import.api.db.exceptions import SchoolProcessingError
 from app.data_import.api.db.excluded_fields import SchoolFieldExclusions
 from app.data_import.api.models import SzkolaAPIResponse
+from app.data_import.utils.db.geom_bulk_load import (
+    Geom3857BulkLoad,
+    GeomBulkLoadStats,
+)
+from app.data_import.utils.db.link_arrays import sync_school_link_arrays
+from app.data_import.utils.db.regions import sync_school_regions
 from app.data_import.utils.db.session import DatabaseManagerBase
-from app.data_import.utils.geo import create_geom_point
+from app.data_import.utils.geo import create_geom_points
+from app.data_import.utils.profiling import stage
 from app.models.locations import Gmina, Miejscowosc, Powiat, Ulica, Wojewodztwo
 from app.models.schools import (
     EtapEdukacji,
@@ -33,18 +44,47 @@ def _is_school_closed(school_data: SzkolaAPIResponse) -> bool:
     return school_data.data_likwidacji is not None
 
 
-def _school_geom(school_data: SzkolaAPIResponse):
-    geolocation = school_data.geolokalizacja
-    return (
-        create_geom_point(geolocation.longitude, geolocation.latitude)
-        if geolocation
-        else None
+def _school_geoms(schools_data: list[SzkolaAPIResponse]) -> list[WKBElement | None]:
+    """Build the geometries of a whole batch at once, aligned with schools_data."""
+    geoms: list[WKBElement | None] = [None] * len(schools_data)
+    located = [
+        (index, school_data.geolokalizacja)
+        for index, school_data in enumerate(schools_data)
+        if school_data.geolokalizacja
+    ]
+    if not located:
+        return geoms
+
+    points = create_geom_points(
+        np.array(
+            [geolocation.longitude for _, geolocation in located], dtype=np.float64
+        ),
+        np.array(
+            [geolocation.latitude for _, geolocation in located], dtype=np.float64
+        ),
     )
+    for (index, _), point in zip(located, points, strict=True):
+        geoms[index] = point
+    return geoms
 
 
 class Decomposer(DatabaseManagerBase):
-    def __init__(self):
+    def __init__(
+        self,
+        geom_bulk_stats: GeomBulkLoadStats | None = None,
+        progress: ProgressLog | None = None,
+    ):
         super().__init__()
+        # per-school outcomes are only counted, the progress log reports them periodically
+        self.progress: ProgressLog = (
+            progress if progress is not None else ProgressLog(logger, "API schools")
+        )
+        self.geom_bulk_stats: GeomBulkLoadStats = (
+            geom_bulk_stats if geom_bulk_stats is not None else GeomBulkLoadStats()
+        )
+        self._geom_bulk_load: Geom3857BulkLoad | None = None
+        # schools written in the current batch, their link id arrays are synced before commit
+        self._batch_schools: list[Szkola] = []
         self.voivodeships_cache: dict[str, Wojewodztwo] = {}
         self.counties_cache: dict[str, Powiat] = {}
         self.boroughs_cache: dict[str, Gmina] = {}
@@ -66,25 +106,44 @@ class Decomposer(DatabaseManagerBase):
         processed_schools = 0
         failed_schools = 0
 
-        for school_data in schools_data:
-            try:
-                self.prune_and_decompose_single_school_data(school_data)
-                processed_schools += 1
-            except SchoolProcessingError as e:
-                failed_schools += 1
-                logger.error(f"📛 Error processing school: {e}")
+        # geom_3857 is recomputed once for the whole batch instead of by the row trigger
+        geom_bulk_load = self._get_geom_bulk_load()
+        geom_bulk_load.begin()
+
+        with stage("resolve entities"):
+            geoms = _school_geoms(schools_data)
+            for school_data, geom in zip(schools_data, geoms, strict=True):
+                try:
+                    self.prune_and_decompose_single_school_data(school_data, geom)
+                    processed_schools += 1
+                except SchoolProcessingError as e:
+                    failed_schools += 1
+                    self.progress.advance(outcome="failed")
+                    logger.error(f"📛 Error processing school: {e}")
 
         # commit all changes to the database after processing the entire batch
         session = self._ensure_session()
-        session.commit()
-
-        logger.info(
+        with stage("flush"):
+            session.flush()
+            school_ids = [
+                school.id for school in self._batch_schools if school.id is not None
+            ]
+            sync_school_link_arrays(session, school_ids)
+            sync_school_regions(session, school_ids)
+            self._batch_schools.clear()
+            geom_bulk_load.complete()
+        with stage("commit"):
+            session.commit()
+
+        logger.debug(
             f"📊 Processing complete. Successfully processed: {processed_schools}/{total_schools} schools"
         )
         if failed_schools > 0:
             logger.warning(f"⚠️ Failed to process {failed_schools} schools")
 
-    def prune_and_decompose_single_school_data(self, school: SzkolaAPIResponse) -> None:
+    def prune_and_decompose_single_school_data(
+        self, school: SzkolaAPIResponse, geom: WKBElement | None
+    ) -> None:
         """Process a single school's data and save to database"""
         session = self._ensure_session()
 
@@ -117,12 +176,13 @@ class Decomposer(DatabaseManagerBase):
             )
 
             if existing_school:
-                logger.info(
+                logger.debug(
                     f"School with RSPO {school.numer_rspo} already exists. Updating..."
                 )
                 school_object = self._update_existing_school(
                     existing_school=existing_school,
                     school_data=school,
+                    geom=geom,
                     school_type=school_type,
                     status=school_status,
                     locality=locality,
@@ -135,6 +195,7 @@ class Decomposer(DatabaseManagerBase):
                 # Create a new school object
                 school_object = self._create_school_object(
                     school_data=school,
+                    geom=geom,
                     school_type=school_type,
                     status=school_status,
                     locality=locality,
@@ -145,17 +206,29 @@ class Decomposer(DatabaseManagerBase):
                 )
 
             session.add(school_object)
+            self._get_geom_bulk_load().track(school_object)
+            self._batch_schools.append(school_object)
 
             action = "Updated" if existing_school else "Added"
-            logger.info(f"💾 {action} school (RSPO: {school_object.numer_rspo})")
+            logger.debug(f"💾 {action} school (RSPO: {school_object.numer_rspo})")
+            self.progress.advance(outcome=action.lower())
 
         except Exception as e:
             session.rollback()
+            self._batch_schools.clear()
             raise SchoolProcessingError(school.numer_rspo, e) from e
 
+    def _get_geom_bulk_load(self) -> Geom3857BulkLoad:
+        if self._geom_bulk_load is None:
+            self._geom_bulk_load = Geom3857BulkLoad(
+                self._ensure_session(), self.geom_bulk_stats
+            )
+        return self._geom_bulk_load
+
     @staticmethod
     def _create_school_object(
         school_data: SzkolaAPIResponse,
+        geom: WKBElement | None,
         school_type: TypSzkoly,
         status: StatusPublicznoprawny,
         locality: Miejscowosc,
@@ -170,7 +243,7 @@ class Decomposer(DatabaseManagerBase):
         # all other fields from SzkolaAPIResponse that are not used in Szkola are removed by pydantic
         new_school = Szkola(
             **api_school_data_dict,  # pyright: ignore[reportAny]
-            geom=_school_geom(school_data),
+            geom=geom,
             zlikwidowana=_is_school_closed(school_data),
             typ=school_type,
             status_publicznoprawny=status,  # we haven't removed status_publicznoprawny from SzkolaAPIResponse because from the API we actually have status_publiczno_prawny which is incorrect form
@@ -187,6 +260,7 @@ class Decomposer(DatabaseManagerBase):
     def _update_existing_school(
         existing_school: Szkola,
         school_data: SzkolaAPIResponse,
+        geom: WKBElement | None,
         school_type: TypSzkoly,
         status: StatusPublicznoprawny,
         locality: Miejscowosc,
@@ -202,7 +276,7 @@ class Decomposer(DatabaseManagerBase):
         existing_school.sqlmodel_update(api_school_data_dict)  # pyright: ignore[reportUnusedCallResult]
 
         # Update geolocation
-        existing_school.geom = _school_geom(school_data)
+        existing_school.geom = geom
 
         # Update closure status
         existing_school.zlikwidowana = _is_school_closed(school_data)
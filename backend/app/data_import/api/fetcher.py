@@ -10,6 +10,7 @@ from app.data_import.api.exceptions import SchoolsDataError
 from app.data_import.api.models import SzkolaAPIResponse
 from app.data_import.config.api import TIMEOUT, APIAuthSettings, APISettings
 from app.data_import.utils.api_request import api_request
+from app.data_import.utils.profiling import stage
 
 logger = logging.getLogger(__name__)
 
@@ -76,13 +77,14 @@ class SchoolsAPIFetcher:
         pages = list(range(start_page, start_page + self.concurrent_requests))
 
         try:
-            async with asyncio.TaskGroup() as task_group:
-                tasks = [
-                    task_group.create_task(
-                        self._fetch_schools_page(page=page, client=client)
-                    )
-                    for page in pages
-                ]
+            with stage("fetch"):
+                async with asyncio.TaskGroup() as task_group:
+                    tasks = [
+                        task_group.create_task(
+                            self._fetch_schools_page(page=page, client=client)
+                        )
+                        for page in pages
+                    ]
         except* SchoolsDataError as exc_group:
             first_error = exc_group.exceptions[0]
             raise first_error from first_error
@@ -105,9 +107,9 @@ class SchoolsAPIFetcher:
                 return schools, None
 
             schools.extend(result)
-            logger.info(f"📋 Fetched {len(result)} schools from page {page}")
+            logger.debug(f"📋 Fetched {len(result)} schools from page {page}")
 
-        logger.info(
+        logger.debug(
             f"🏁 Finished fetching segment. Total schools in segment: {len(schools)}"
         )
         return schools, start_page + self.concurrent_requests
@@ -121,7 +123,8 @@ class SchoolsAPIFetcher:
 
         try:
             data = await api_request(url=self.base_url, params=params, client=client)
-            return school_list_adapter.validate_python(data)
+            with stage("validate"):
+                return school_list_adapter.validate_python(data)
         except ValidationError as err:
             raise SchoolsDataError(
                 f"Invalid API response schema on page {page}: {err}",
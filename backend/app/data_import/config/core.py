@@ -4,3 +4,4 @@ BASE_DIR = Path(__file__).resolve().parents[3]
 DATA_DIR = BASE_DIR / "data"
 ADDRESSES_DIR = DATA_DIR / "addresses"
 EXCEL_DIR = DATA_DIR / "excel"
+PROFILES_DIR = BASE_DIR / "profiles"
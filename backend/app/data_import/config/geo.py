@@ -37,3 +37,11 @@ class GeocodingSettings:
         "Włochy",
     }
     POLAND_BIGGEST_CITIES: ClassVar = {"Łódź", "Poznań", "Kraków", "Wrocław"}
+
+
+@final
+class BulkLoadSettings:
+    # custom setting the szkola_set_geom_3857 trigger function returns early on
+    GEOM_BULK_LOAD_SETTING: str = "app.geom_bulk_load"
+    # rows used to measure the per-row cost of the trigger for the time-saved report
+    TRIGGER_COST_SAMPLE_SIZE: int = 200
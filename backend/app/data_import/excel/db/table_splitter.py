@@ -12,12 +12,16 @@ from pydantic import ValidationError
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import col, select
 
+from app.core.logging import ProgressLog
 from app.data_import.config.excel import ExamType, ExcelFile
 from app.data_import.utils.clean_column_names import (
     clean_column_name,
     clean_subjects_names,
 )
+from app.data_import.utils.db.data_version import bump_data_versions
 from app.data_import.utils.db.session import DatabaseManagerBase
+from app.data_import.utils.profiling import stage
+from app.models.data_version import DataDomain
 from app.models.exam_results import (
     Przedmiot,
     WynikE8,
@@ -111,9 +115,13 @@ class TableSplitter(DatabaseManagerBase):
         )
         session = self._ensure_session()
         self._prefetch_school_ids()
+        progress = ProgressLog(
+            logger, f"{self.exam_type} results", total=len(self.exam_data)
+        )
 
         for index, school_exam_data in self.exam_data.iterrows():
             school_exam_data: pd.Series
+            progress.advance()
             try:
                 # Find School by RSPO
                 rspo = self.get_school_rspo_number(school_exam_data, index)
@@ -128,13 +136,10 @@ class TableSplitter(DatabaseManagerBase):
                     continue
 
                 # Process results for each subject for this school
-                self.create_results(school_exam_data, school_id, rspo)
+                with stage("resolve entities"):
+                    self.create_results(school_exam_data, school_id, rspo)
 
                 self.processed_count += 1
-                if self.processed_count % 100 == 0:  # Log progress periodically
-                    logger.info(
-                        f"⏳ Processed {self.processed_count} schools... Added {self.added_results} results so far."
-                    )
 
             except Exception as e:
                 logger.exception(f"📛 Unexpected error processing row {index}: {e}")
@@ -142,8 +147,12 @@ class TableSplitter(DatabaseManagerBase):
                     1  # Count as skipped if major error occurs for the row
                 )
 
-        self._flush_pending_results()
-        session.commit()
+        with stage("flush"):
+            self._flush_pending_results()
+            bump_data_versions(session, DataDomain.RESULTS)
+        with stage("commit"):
+            session.commit()
+        progress.finish()
         logger.info(f"✅ Successfully processed {self.processed_count} schools.")
         logger.info(f"Added {self.added_results} new exam results to the database.")
         logger.info(
@@ -198,7 +207,8 @@ class TableSplitter(DatabaseManagerBase):
             len(self._pending_e8_rows) + len(self._pending_em_rows)
             >= self._bulk_flush_size
         ):
-            self._flush_pending_results()
+            with stage("flush"):
+                self._flush_pending_results()
 
     def create_result_record(
         self,
@@ -9,6 +9,7 @@ import pandas as pd
 
 from app.data_import.config.core import EXCEL_DIR
 from app.data_import.config.excel import EM_FORMULA_PRIORITY, ExamType, ExcelFile
+from app.data_import.utils.profiling import stage
 
 logger = logging.getLogger(__name__)
 
@@ -76,12 +77,13 @@ class ExcelReader:
             file_name = metadata.path.name
             logger.info(f"📄 Processing file: {file_name}")
             try:
-                df = pd.read_excel(  # pyright: ignore[reportUnknownMemberType]
-                    metadata.path,
-                    sheet_name=ExcelFile.SHEET_NAME,
-                    header=exam_type.header,
-                    skiprows=exam_type.skiprows,
-                )
+                with stage("read"):
+                    df = pd.read_excel(  # pyright: ignore[reportUnknownMemberType]
+                        metadata.path,
+                        sheet_name=ExcelFile.SHEET_NAME,
+                        header=exam_type.header,
+                        skiprows=exam_type.skiprows,
+                    )
                 yield metadata.year, df
             except Exception as e:
                 logger.error(f"Error reading file {file_name}: {e}")
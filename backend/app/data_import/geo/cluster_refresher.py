@@ -0,0 +1,36 @@
+import logging
+import time
+
+from sqlmodel import func, select
+
+from app.data_import.utils.db.session import DatabaseManagerBase
+
+logger = logging.getLogger(__name__)
+
+
+class SchoolClusterRefresher(DatabaseManagerBase):
+    """
+    Rebuild the precomputed clusters (szkola_klaster) of the default map view.
+
+    Has to run after every job that changes school locations, visibility or scores,
+    otherwise unfiltered map tiles keep showing the previous state.
+    """
+
+    def refresh(self) -> int:
+        """
+        Returns:
+            int: Number of precomputed grid cells across all clustered zoom levels
+        """
+        session = self._ensure_session()
+        start = time.perf_counter()
+        try:
+            cell_count: int = session.exec(select(func.refresh_szkola_klaster())).one()  # pyright: ignore[reportAny]
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+        logger.info(
+            f"🗺️ Refreshed {cell_count} precomputed map clusters in {time.perf_counter() - start:.2f}s"
+        )
+        return cell_count
@@ -8,22 +8,30 @@ from pathlib import Path
 from typing import cast
 
 import httpx
+import numpy as np
 from geoalchemy2 import WKBElement
-from shapely.geometry import Point
 from sqlmodel import Session
 
+from app.core.logging import ProgressLog
 from app.data_import.api.exceptions import APIRequestError
 from app.data_import.config.core import ADDRESSES_DIR
 from app.data_import.config.geo import GeocodingSettings
 from app.data_import.geo.exceptions import GeocodingError
 from app.data_import.utils.api_request import api_request
+from app.data_import.utils.db.data_version import bump_data_versions
+from app.data_import.utils.db.geom_bulk_load import (
+    Geom3857BulkLoad,
+    GeomBulkLoadStats,
+)
 from app.data_import.utils.db.session import DatabaseManagerBase
 from app.data_import.utils.geo import (
     build_full_address,
-    create_geom_point,
-    get_coordinates_from_geom,
+    create_geom_points,
+    get_coordinates_from_geoms,
     normalize_city_name,
 )
+from app.data_import.utils.profiling import stage
+from app.models.data_version import DataDomain
 from app.models.schools import Szkola
 
 logger = logging.getLogger(__name__)
@@ -69,7 +77,7 @@ def _extract_lat_lon_from_uug(data: dict[str, object]) -> tuple[float, float] |
         logger.error("❌ Invalid coordinate values in UUG response")
         return None
 
-    logger.info(f"🔄 Transformed coordinates: {lat}, {lon}")
+    logger.debug(f"🔄 Transformed coordinates: {lat}, {lon}")
     return lon, lat
 
 
@@ -101,6 +109,10 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
             starting_id if starting_id is not None else self._load_checkpoint()
         )
         self.stats: dict[str, int] = defaultdict(int)
+        self.geom_bulk_stats: GeomBulkLoadStats = GeomBulkLoadStats()
+        self._geom_bulk_load: Geom3857BulkLoad | None = None
+        # coordinates are turned into geometries in one batch right before each commit
+        self._pending_coordinates: list[tuple[Szkola, float, float]] = []
 
     def update_school_coordinates(self) -> None:
         """
@@ -108,6 +120,7 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
         Resumes from starting_id if set.
         """
         session = self._ensure_session()
+        self._geom_bulk_load = Geom3857BulkLoad(session, self.geom_bulk_stats)
 
         if self.starting_id:
             logger.info(f"🔄 Resuming import from ID: {self.starting_id}")
@@ -116,8 +129,8 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
         col_id = "id"
         col_lon = "g_dlug"
         col_lat = "g_szer"
-        pending_candidates: list[MissingCoordinateCandidate] = []
         pending_schools: dict[int, Szkola] = {}
+        progress = ProgressLog(logger, "School coordinates")
 
         try:
             with open(self.converted_file, encoding="utf-8") as csvfile:
@@ -155,6 +168,7 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
                     # Skip records until we reach starting_id
                     if self.starting_id and school_id < self.starting_id:
                         continue
+                    progress.advance()
 
                     school = session.get(Szkola, school_id)
 
@@ -163,27 +177,13 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
                         continue
 
                     if not raw_lon or not raw_lat:
-                        candidate = self._build_missing_coordinate_candidate(
-                            school_id=school_id,
-                            school=school,
-                        )
-                        if candidate is None:
-                            self.stats[ProcessingStats.FAILED_GEOCODING.value] += 1
-                            continue
-
-                        pending_candidates.append(candidate)
                         pending_schools[school_id] = school
 
-                        if (
-                            len(pending_candidates)
-                            >= GeocodingSettings.REQUEST_BATCH_SIZE
-                        ):
+                        if len(pending_schools) >= GeocodingSettings.REQUEST_BATCH_SIZE:
                             self._process_pending_geocoding(
                                 session=session,
-                                candidates=pending_candidates,
                                 schools_by_id=pending_schools,
                             )
-                            pending_candidates.clear()
                             pending_schools.clear()
                         continue
 
@@ -203,16 +203,16 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
                         school_id=school_id,
                     )
 
-                if pending_candidates:
+                if pending_schools:
                     self._process_pending_geocoding(
                         session=session,
-                        candidates=pending_candidates,
                         schools_by_id=pending_schools,
                     )
 
                 # Final commit for remaining records
-                session.commit()
+                self._commit(session, final=True)
                 self._clear_checkpoint()
+                progress.finish()
                 for stats in ProcessingStats:
                     logger.info(f"Stat - {stats.value}: {self.stats[stats.value]}")
 
@@ -223,35 +223,50 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
             logger.critical(f"Unexpected error during import: {e}")
             raise
 
-    def _build_missing_coordinate_candidate(
+    def _build_missing_coordinate_candidates(
         self,
-        school_id: int,
-        school: Szkola,
-    ) -> MissingCoordinateCandidate | None:
-        try:
-            city = normalize_city_name(school.miejscowosc.nazwa)
-            street = school.ulica.nazwa if school.ulica else None
-            point = (
-                get_coordinates_from_geom(cast(WKBElement, school.geom))
-                if school.geom
-                else Point(0, 0)
-            )
-        except Exception as err:
-            logger.error(
-                f"💥 Failed preparing geocoding payload for school {school.nazwa} (ID: {school_id}): {err}"
-            )
-            return None
-
-        return MissingCoordinateCandidate(
-            school_id=school_id,
-            school_name=school.nazwa,
-            city=city,
-            street=street,
-            building_number=school.numer_budynku,
-            lon=point.x,
-            lat=point.y,
+        schools_by_id: dict[int, Szkola],
+    ) -> list[MissingCoordinateCandidate]:
+        """
+        Prepare geocoding payloads for a batch of schools.
+        Current geometries of the whole batch are decoded in one call.
+        """
+        lons, lats = get_coordinates_from_geoms(
+            [cast(WKBElement | None, school.geom) for school in schools_by_id.values()]
         )
 
+        candidates: list[MissingCoordinateCandidate] = []
+        for (school_id, school), lon, lat in zip(
+            schools_by_id.items(), lons.tolist(), lats.tolist(), strict=True
+        ):
+            try:
+                city = normalize_city_name(school.miejscowosc.nazwa)
+                street = school.ulica.nazwa if school.ulica else None
+                if school.geom is None:
+                    lon, lat = 0.0, 0.0
+                elif np.isnan(lon) or np.isnan(lat):
+                    raise ValueError("stored geometry could not be decoded")
+            except Exception as err:
+                logger.error(
+                    f"💥 Failed preparing geocoding payload for school {school.nazwa} (ID: {school_id}): {err}"
+                )
+                self.stats[ProcessingStats.FAILED_GEOCODING.value] += 1
+                continue
+
+            candidates.append(
+                MissingCoordinateCandidate(
+                    school_id=school_id,
+                    school_name=school.nazwa,
+                    city=city,
+                    street=street,
+                    building_number=school.numer_budynku,
+                    lon=lon,
+                    lat=lat,
+                )
+            )
+
+        return candidates
+
     def _persist_coordinates_update(
         self,
         session: Session,
@@ -260,22 +275,56 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
         lat: float,
         school_id: int,
     ) -> None:
-        school.geom = create_geom_point(lon, lat)
-        session.add(school)
+        self._pending_coordinates.append((school, lon, lat))
         self.stats[ProcessingStats.PROCESSED.value] += 1
 
         # Commit every 1000 records to avoid large transactions
         if self.stats[ProcessingStats.PROCESSED.value] % 1000 == 0:
-            session.commit()
+            self._commit(session)
             self._save_checkpoint(school_id)
 
+    def _apply_pending_coordinates(self, session: Session) -> None:
+        if not self._pending_coordinates:
+            return
+
+        geoms = create_geom_points(
+            np.array(
+                [lon for _, lon, _ in self._pending_coordinates], dtype=np.float64
+            ),
+            np.array(
+                [lat for _, _, lat in self._pending_coordinates], dtype=np.float64
+            ),
+        )
+        for (school, _, _), geom in zip(self._pending_coordinates, geoms, strict=True):
+            school.geom = geom
+            session.add(school)
+            if self._geom_bulk_load is not None:
+                self._geom_bulk_load.track(school)
+        self._pending_coordinates.clear()
+
+    def _commit(self, session: Session, final: bool = False) -> None:
+        with stage("flush"):
+            self._apply_pending_coordinates(session)
+            # recompute geom_3857 of the pending batch in one statement before committing
+            if self._geom_bulk_load is not None:
+                self._geom_bulk_load.complete()
+            # the API workers drop their caches once, with the last commit of the import
+            if final:
+                bump_data_versions(session, DataDomain.GEOMETRY)
+        with stage("commit"):
+            session.commit()
+
     def _process_pending_geocoding(
         self,
         session: Session,
-        candidates: list[MissingCoordinateCandidate],
         schools_by_id: dict[int, Szkola],
     ) -> None:
-        results = asyncio.run(self._resolve_missing_data_batch(candidates))
+        candidates = self._build_missing_coordinate_candidates(schools_by_id)
+        if not candidates:
+            return
+
+        with stage("geocode"):
+            results = asyncio.run(self._resolve_missing_data_batch(candidates))
 
         for result in results:
             if result.status is ProcessingStats.COORDINATES_IN_BUILDING:
@@ -295,7 +344,7 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
                 continue
 
             lon, lat = result.coordinates
-            logger.info(
+            logger.debug(
                 f"Updated missing data for school ID {result.school_id}: Lat={lat}, Lon={lon}"
             )
             self.stats[ProcessingStats.SUCCESSFUL_GEOCODING.value] += 1
@@ -336,7 +385,7 @@ class SchoolCoordinatesImporter(DatabaseManagerBase):
         client: httpx.AsyncClient,
     ) -> MissingCoordinateResult:
         try:
-            logger.info(
+            logger.debug(
                 f"🔍 Invalid coordinates for school {candidate.school_name} (ID: {candidate.school_id}). Geocoding..."
             )
 
@@ -1,13 +1,20 @@
 import logging
 import math
 
+import numpy as np
 from geoalchemy2 import WKBElement
 from sqlalchemy import bindparam, update
 from sqlmodel import Numeric, cast, col, func, select, tuple_
 
 from app.data_import.config.geo import ShifterSettings
+from app.data_import.utils.db.data_version import bump_data_versions
+from app.data_import.utils.db.geom_bulk_load import (
+    Geom3857BulkLoad,
+    GeomBulkLoadStats,
+)
 from app.data_import.utils.db.session import DatabaseManagerBase
-from app.data_import.utils.geo import create_geom_point
+from app.data_import.utils.geo import create_geom_points
+from app.models.data_version import DataDomain
 from app.models.schools import Szkola
 
 logger = logging.getLogger(__name__)
@@ -100,6 +107,7 @@ class SchoolLocationShifter(DatabaseManagerBase):
         """
         super().__init__()
         self.shift_value: float = shift_value
+        self.geom_bulk_stats: GeomBulkLoadStats = GeomBulkLoadStats()
 
     def shift_school_locations(
         self,
@@ -174,18 +182,22 @@ class SchoolLocationShifter(DatabaseManagerBase):
             return 0
 
         session = self._ensure_session()
-        update_payload: list[dict[str, int | WKBElement]] = []
+        school_ids: list[int] = []
 
-        for school, new_lat, new_lon in schools_to_shift:
+        for school, _, _ in schools_to_shift:
             if school.id is None:
                 raise ValueError("School ID is missing. Cannot update coordinates.")
 
-            update_payload.append(
-                {
-                    "school_id_param": school.id,
-                    "geom_param": create_geom_point(new_lon, new_lat),
-                }
-            )
+            school_ids.append(school.id)
+
+        geoms = create_geom_points(
+            np.array([new_lon for _, _, new_lon in schools_to_shift], dtype=np.float64),
+            np.array([new_lat for _, new_lat, _ in schools_to_shift], dtype=np.float64),
+        )
+        update_payload: list[dict[str, int | WKBElement]] = [
+            {"school_id_param": school_id, "geom_param": geom}
+            for school_id, geom in zip(school_ids, geoms, strict=True)
+        ]
 
         statement = (
             update(Szkola)
@@ -193,7 +205,11 @@ class SchoolLocationShifter(DatabaseManagerBase):
             .values(geom=bindparam("geom_param"))
         )
 
+        geom_bulk_load = Geom3857BulkLoad(session, self.geom_bulk_stats)
+        geom_bulk_load.track_ids(school_ids)
         _ = session.connection().execute(statement, update_payload)
+        geom_bulk_load.complete()
+        bump_data_versions(session, DataDomain.GEOMETRY)
         session.commit()
 
         return len(update_payload)
@@ -1,8 +1,10 @@
 import argparse
 import asyncio
 import logging
+from pathlib import Path
 
-from app.core.logging import configure_logging
+from app.core.database import settings
+from app.core.logging import ProgressLog, configure_logging
 from app.data_import.api.db.decomposer import Decomposer
 from app.data_import.api.exceptions import SchoolsDataError
 from app.data_import.api.fetcher import SchoolsAPIFetcher
@@ -10,12 +12,18 @@ from app.data_import.config.api import SchoolStatus
 from app.data_import.config.excel import ExamType
 from app.data_import.excel.db.table_splitter import TableSplitter
 from app.data_import.excel.reader import ExcelReader
+from app.data_import.geo.cluster_refresher import SchoolClusterRefresher
+from app.data_import.utils.db.data_version import publish_data_versions
+from app.data_import.utils.db.geom_bulk_load import GeomBulkLoadStats
+from app.data_import.utils.profiling import add_profile_argument, run_command
+from app.models.data_version import DataDomain
 
 logger = logging.getLogger(__name__)
 
 
 async def api_importer() -> None:
     total_processed = 0
+    geom_bulk_stats = GeomBulkLoadStats()
 
     for status in SchoolStatus:
         if not status.fetch_enabled:
@@ -29,26 +37,22 @@ async def api_importer() -> None:
 
         status_label = f"zlikwidowana={zlikwidowana}"
         logger.info(f"🔄 Starting import for {status_label} from page {start_page}...")
+        progress = ProgressLog(logger, f"API schools ({status_label})")
 
         try:
             batch_iterator = api_fetcher.fetch_schools_batches(
                 start_page=start_page,
             )
             async for schools_data in batch_iterator:
-                logger.info(
-                    f"🔄 Processing segment {segment_number} ({status_label})..."
-                )
-                logger.info(
-                    f"⚡ Processing {len(schools_data)} schools from segment {segment_number}..."
+                logger.debug(
+                    f"⚡ Processing {len(schools_data)} schools from segment {segment_number} ({status_label})..."
                 )
-                with Decomposer() as decomposer:
+                with Decomposer(
+                    geom_bulk_stats=geom_bulk_stats, progress=progress
+                ) as decomposer:
                     decomposer.prune_and_decompose_schools(schools_data)
 
                 total_processed += len(schools_data)
-                logger.info(
-                    f"✅ Successfully processed segment {segment_number} ({len(schools_data)} schools)"
-                )
-                logger.info(f"📊 Total schools processed so far: {total_processed}")
                 segment_number += 1
 
         except SchoolsDataError as e:
@@ -63,10 +67,19 @@ async def api_importer() -> None:
                 f"❌ Error processing segment {segment_number} ({status_label})"
             )
             break
+        finally:
+            progress.finish()
 
     logger.info(
         f"🎉 Import from API completed. Total schools processed: {total_processed}"
     )
+    geom_bulk_stats.log_summary()
+    # every batch commits on its own, the data versions are bumped once per import
+    if total_processed:
+        publish_data_versions(DataDomain.SCHOOLS, DataDomain.GEOMETRY)
+
+    with SchoolClusterRefresher() as cluster_refresher:
+        _ = cluster_refresher.refresh()
 
 
 def excel_importer():
@@ -91,6 +104,7 @@ def excel_importer():
 
 class ImportOptions:
     option: str  # pyright: ignore[reportUninitializedInstanceVariable]
+    profile: Path | None  # pyright: ignore[reportUninitializedInstanceVariable]
 
 
 COMMANDS = {
@@ -100,7 +114,7 @@ COMMANDS = {
 
 
 def main():
-    configure_logging("data_import.log")
+    configure_logging("data_import.log", settings.LOG_FORMAT)
 
     parser = argparse.ArgumentParser(
         description="Main import script for school data processing"
@@ -114,12 +128,14 @@ def main():
         help="Operation to perform: api (schools API import) or excel (exam data import)",
     )
 
+    add_profile_argument(parser)
+
     args = ImportOptions()
     _ = parser.parse_args(namespace=args)
 
     try:
         logger.info(f"🚀 Starting {args.option} operation...")
-        COMMANDS[args.option]()
+        run_command(COMMANDS[args.option], f"data-import-{args.option}", args.profile)
         logger.info(f"✅ {args.option.capitalize()} operation completed successfully")
     except Exception as e:
         logger.error(f"❌ Error executing {args.option} operation: {e}")
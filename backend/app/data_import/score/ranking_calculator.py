@@ -5,11 +5,14 @@ from typing import cast
 from unicodedata import normalize
 
 from sqlalchemy import delete
+from sqlalchemy import select as sa_select
 from sqlmodel import col, func, select
 
+from app.data_import.utils.db.data_version import bump_data_versions
 from app.data_import.utils.db.session import DatabaseManagerBase
+from app.data_import.utils.profiling import stage
+from app.models.data_version import DataDomain
 from app.models.exam_results import WynikE8, WynikEM
-from app.models.locations import Gmina, Miejscowosc, Powiat
 from app.models.ranking import Ranking, RodzajRankingu
 from app.models.schools import Szkola, TypSzkoly
 
@@ -28,6 +31,7 @@ class _SchoolData:
     score: float
     wojewodztwo_id: int
     powiat_id: int
+    gmina_id: int
 
 
 @dataclass(frozen=True)
@@ -105,31 +109,35 @@ class RankingCalculator(DatabaseManagerBase):
     def calculate_rankings(self) -> None:
         session = self._ensure_session()
 
-        latest_e8_year = self._get_most_recent_exam_year(WynikE8)
-        latest_em_year = self._get_most_recent_exam_year(WynikEM)
-
-        e8_schools = self._load_e8_schools(latest_e8_year)
-        self._replace_rankings(
-            schools=e8_schools,
-            year=latest_e8_year,
-            ranking_type=RodzajRankingu.E8,
-        )
+        with stage("load schools"):
+            latest_e8_year = self._get_most_recent_exam_year(WynikE8)
+            latest_em_year = self._get_most_recent_exam_year(WynikEM)
+            e8_schools = self._load_e8_schools(latest_e8_year)
+            em_schools = self._load_em_schools(latest_em_year)
+
+        with stage("rank"):
+            self._replace_rankings(
+                schools=e8_schools,
+                year=latest_e8_year,
+                ranking_type=RodzajRankingu.E8,
+            )
 
-        em_schools = self._load_em_schools(latest_em_year)
-        tech_schools, lo_schools = self._split_em_schools_by_type(em_schools)
+            tech_schools, lo_schools = self._split_em_schools_by_type(em_schools)
 
-        self._replace_rankings(
-            schools=tech_schools,
-            year=latest_em_year,
-            ranking_type=RodzajRankingu.EM_TECH,
-        )
-        self._replace_rankings(
-            schools=lo_schools,
-            year=latest_em_year,
-            ranking_type=RodzajRankingu.EM_LO,
-        )
+            self._replace_rankings(
+                schools=tech_schools,
+                year=latest_em_year,
+                ranking_type=RodzajRankingu.EM_TECH,
+            )
+            self._replace_rankings(
+                schools=lo_schools,
+                year=latest_em_year,
+                ranking_type=RodzajRankingu.EM_LO,
+            )
 
-        session.commit()
+        bump_data_versions(session, DataDomain.RANKINGS)
+        with stage("commit"):
+            session.commit()
         logger.info("🎉 Ranking calculation completed")
 
     def _replace_rankings(
@@ -169,6 +177,9 @@ class RankingCalculator(DatabaseManagerBase):
                     rodzaj_rankingu=ranking_type,
                     wynik=school.score,
                     szkola_id=school.school_id,
+                    gmina_id=school.gmina_id,
+                    powiat_id=school.powiat_id,
+                    wojewodztwo_id=school.wojewodztwo_id,
                     percentyl_kraj=_calculate_percentile(
                         kraj_data.position, kraj_data.population_size
                     ),
@@ -237,33 +248,38 @@ class RankingCalculator(DatabaseManagerBase):
     def _load_e8_schools(self, year: int) -> list[_SchoolData]:
         session = self._ensure_session()
 
+        # region ids are denormalized on szkola, no joins through miejscowosc;
+        # sqlmodel's select() is typed for at most four columns
         statement = (
-            select(
-                Szkola.id,
-                Szkola.wynik,
-                Powiat.id,
-                Powiat.wojewodztwo_id,
+            sa_select(
+                col(Szkola.id),
+                col(Szkola.wynik),
+                col(Szkola.gmina_id),
+                col(Szkola.powiat_id),
+                col(Szkola.wojewodztwo_id),
             )
             .join(WynikE8)
-            .join(Miejscowosc)
-            .join(Gmina)
-            .join(Powiat)
             .where(
-                WynikE8.rok == year,
-                Szkola.wynik != None,  # noqa: E711
+                col(WynikE8.rok) == year,
+                col(Szkola.wynik).is_not(None),
+                col(Szkola.wojewodztwo_id).is_not(None),
             )
             .distinct()
         )
 
-        rows = cast(list[tuple[int, float, int, int]], session.exec(statement).all())
+        rows = cast(
+            list[tuple[int, float, int, int, int]],
+            session.connection().execute(statement).all(),
+        )
         schools: list[_SchoolData] = [
             _SchoolData(
                 school_id=school_id,
                 score=score,
+                gmina_id=gmina_id,
                 powiat_id=powiat_id,
                 wojewodztwo_id=wojewodztwo_id,
             )
-            for school_id, score, powiat_id, wojewodztwo_id in rows
+            for school_id, score, gmina_id, powiat_id, wojewodztwo_id in rows
         ]
 
         logger.info(f"📌 Loaded {len(schools)} E8 schools for year {year}.")
@@ -276,24 +292,23 @@ class RankingCalculator(DatabaseManagerBase):
             select(  # pyright: ignore[reportCallIssue, reportUnknownMemberType]
                 Szkola.id,
                 Szkola.wynik,
-                Powiat.id,
-                Powiat.wojewodztwo_id,
+                Szkola.gmina_id,
+                Szkola.powiat_id,
+                Szkola.wojewodztwo_id,
                 TypSzkoly.nazwa,
             )
             .join(WynikEM)
-            .join(Miejscowosc)
-            .join(Gmina)
-            .join(Powiat)
             .join(TypSzkoly)
             .where(
                 WynikEM.rok == year,
                 col(Szkola.wynik).is_not(None),
+                col(Szkola.wojewodztwo_id).is_not(None),
             )
             .distinct()
         )
 
         rows = cast(
-            list[tuple[int, float, int, int, str]],
+            list[tuple[int, float, int, int, int, str]],
             session.exec(statement).all(),  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType]
         )
         schools: list[tuple[_SchoolData, str]] = [
@@ -301,12 +316,13 @@ class RankingCalculator(DatabaseManagerBase):
                 _SchoolData(
                     school_id=school_id,
                     score=score,
+                    gmina_id=gmina_id,
                     powiat_id=powiat_id,
                     wojewodztwo_id=wojewodztwo_id,
                 ),
                 type_name,
             )
-            for school_id, score, powiat_id, wojewodztwo_id, type_name in rows
+            for school_id, score, gmina_id, powiat_id, wojewodztwo_id, type_name in rows
         ]
 
         logger.info(f"📌 Loaded {len(schools)} EM schools for year {year}.")
@@ -8,6 +8,7 @@ from sqlmodel import Session, col, func, select
 from app.data_import.config.score import CalculationSettings, ScoreType
 from app.data_import.score.types import WynikTable
 from app.data_import.utils.db.session import DatabaseManagerBase
+from app.data_import.utils.profiling import stage
 from app.models.exam_results import Przedmiot, WynikE8
 from app.models.schools import Szkola
 
@@ -97,12 +98,16 @@ class Scorer(DatabaseManagerBase):
         session = self._ensure_session()
 
         try:
-            self._initialize_required_data()
-            indexed_results = self._load_indexed_results()
-            score_payload = self._build_score_payload(indexed_results)
-            self._bulk_update_scores(score_payload)
+            with stage("load results"):
+                self._initialize_required_data()
+                indexed_results = self._load_indexed_results()
+            with stage("score"):
+                score_payload = self._build_score_payload(indexed_results)
+            with stage("flush"):
+                self._bulk_update_scores(score_payload)
             if commit:
-                session.commit()
+                with stage("commit"):
+                    session.commit()
         except Exception:
             session.rollback()
             logger.exception("❌ Score calculation failed. Rolling back changes.")
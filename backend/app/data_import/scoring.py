@@ -1,14 +1,19 @@
 import argparse
 import logging
+from pathlib import Path
 
 from sqlalchemy import update
 from sqlmodel import Session
 
-from app.core.database import engine
+from app.core.database import engine, settings
 from app.core.logging import configure_logging
 from app.data_import.config.score import ScoreType
+from app.data_import.geo.cluster_refresher import SchoolClusterRefresher
 from app.data_import.score.ranking_calculator import RankingCalculator
 from app.data_import.score.scorer import Scorer
+from app.data_import.utils.db.data_version import bump_data_versions
+from app.data_import.utils.profiling import add_profile_argument, run_command
+from app.models.data_version import DataDomain
 from app.models.schools import Szkola
 
 logger = logging.getLogger(__name__)
@@ -25,12 +30,17 @@ def update_scoring() -> None:
                 scorer = Scorer(score_type, session=session)
                 scorer.calculate_scores(commit=False)
 
+            bump_data_versions(session, DataDomain.SCORES)
             session.commit()
         except Exception:
             session.rollback()
             logger.exception("❌ Score calculation transaction failed.")
             raise
 
+    # cluster score sums of the default map view depend on wynik
+    with SchoolClusterRefresher() as cluster_refresher:
+        _ = cluster_refresher.refresh()
+
     logger.info("🎉 Score calculation completed")
 
 
@@ -43,6 +53,7 @@ def update_ranking() -> None:
 
 class ScoringOptions:
     option: str  # pyright: ignore[reportUninitializedInstanceVariable]
+    profile: Path | None  # pyright: ignore[reportUninitializedInstanceVariable]
 
 
 COMMANDS = {
@@ -52,7 +63,7 @@ COMMANDS = {
 
 
 def main() -> None:
-    configure_logging("scoring.log")
+    configure_logging("scoring.log", settings.LOG_FORMAT)
 
     parser = argparse.ArgumentParser(
         description="Scoring script for score and ranking calculations"
@@ -66,12 +77,14 @@ def main() -> None:
         help="Operation to perform: score (calculate school score) or rank (calculate rankings)",
     )
 
+    add_profile_argument(parser)
+
     args = ScoringOptions()
     _ = parser.parse_args(namespace=args)
 
     try:
         logger.info(f"🚀 Starting {args.option} operation...")
-        COMMANDS[args.option]()
+        run_command(COMMANDS[args.option], f"data-scoring-{args.option}", args.profile)
         logger.info(f"✅ {args.option.capitalize()} operation completed successfully")
     except Exception as e:
         logger.error(f"❌ Error executing {args.option} operation: {e}")
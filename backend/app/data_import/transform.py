@@ -1,10 +1,14 @@
 import argparse
 import logging
+from pathlib import Path
 
+from app.core.database import settings
 from app.core.logging import configure_logging
+from app.data_import.geo.cluster_refresher import SchoolClusterRefresher
 from app.data_import.geo.exporter import SchoolAddressExporter
 from app.data_import.geo.importer import SchoolCoordinatesImporter
 from app.data_import.geo.location_shifter import SchoolLocationShifter
+from app.data_import.utils.profiling import add_profile_argument, run_command
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +26,9 @@ def import_coordinates():
     logger.info("🌍 Starting importing converted coordinates...")
     with SchoolCoordinatesImporter() as geoupdater:
         geoupdater.update_school_coordinates()
+        geoupdater.geom_bulk_stats.log_summary()
     logger.info("✅ School coordinates updated successfully")
+    refresh_clusters()
 
 
 def shift_school_locations():
@@ -30,23 +36,35 @@ def shift_school_locations():
     logger.info("Starting to shift school locations...")
     with SchoolLocationShifter() as location_shifter:
         schools_shifted = location_shifter.shift_school_locations()
+        location_shifter.geom_bulk_stats.log_summary()
     logger.info(f"✅ Shifted locations for {schools_shifted} schools successfully")
+    refresh_clusters()
+
+
+def refresh_clusters():
+    """Rebuild precomputed clusters of the default map view."""
+    logger.info("🗺️ Refreshing precomputed map clusters...")
+    with SchoolClusterRefresher() as cluster_refresher:
+        _ = cluster_refresher.refresh()
+    logger.info("✅ Map clusters refreshed successfully")
 
 
 class TransformOptions:
     option: str  # pyright: ignore[reportUninitializedInstanceVariable]
+    profile: Path | None  # pyright: ignore[reportUninitializedInstanceVariable]
 
 
 COMMANDS = {
     "export": export_addresses,
     "import": import_coordinates,
     "move": shift_school_locations,
+    "clusters": refresh_clusters,
 }
 
 
 def main():
     """Main function to handle command-line arguments and execute appropriate function."""
-    configure_logging("transform.log")
+    configure_logging("transform.log", settings.LOG_FORMAT)
 
     parser = argparse.ArgumentParser(
         description="Transform script for school data processing"
@@ -56,15 +74,19 @@ def main():
         "--option",
         type=str,
         required=True,
-        choices=["export", "import", "move"],
-        help="Operation to perform: export (addresses), import (coordinates), or move (shift schools to the sidef when the same coordinates)",
+        choices=["export", "import", "move", "clusters"],
+        help="Operation to perform: export (addresses), import (coordinates), move (shift schools to the sidef when the same coordinates) or clusters (refresh precomputed map clusters)",
     )
 
+    add_profile_argument(parser)
+
     args = TransformOptions()
     _ = parser.parse_args(namespace=args)
 
     try:
-        COMMANDS[args.option]()
+        run_command(
+            COMMANDS[args.option], f"data-transform-{args.option}", args.profile
+        )
     except Exception as e:
         logger.error(f"❌ Error executing {args.option} operation: {e}")
 
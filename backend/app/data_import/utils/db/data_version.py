@@ -0,0 +1,45 @@
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.models.data_version import DATA_VERSION_CHANNEL, DataDomain
+
+_BUMP_DATA_VERSIONS = text(
+    """
+    INSERT INTO public.data_version (domain, version, updated_at)
+    SELECT domain, 1, now()
+    FROM unnest(CAST(:domains AS varchar[])) AS domain
+    ON CONFLICT (domain) DO UPDATE
+    SET
+        version = public.data_version.version + 1,
+        updated_at = now()
+    """
+)
+# delivered to the API workers only when the transaction commits
+_NOTIFY_DATA_CHANGE = text("SELECT pg_notify(:channel, :domains)")
+
+
+def bump_data_versions(session: Session, *domains: DataDomain) -> None:
+    """
+    Increment the version of the changed data domains and notify the API
+    workers. Call it right before the commit that changes them, so the new
+    version becomes visible (and is announced) together with the data.
+    """
+    _ = session.execute(
+        _BUMP_DATA_VERSIONS, {"domains": [str(domain) for domain in domains]}
+    )
+    _ = session.execute(
+        _NOTIFY_DATA_CHANGE,
+        {"channel": DATA_VERSION_CHANNEL, "domains": ",".join(domains)},
+    )
+
+
+def publish_data_versions(*domains: DataDomain) -> None:
+    """
+    Bump the data domains in a transaction of their own, at the end of a job
+    whose batches were committed separately; the API workers then drop what
+    they cached while the job ran, once instead of after every batch.
+    """
+    with Session(engine) as session:
+        bump_data_versions(session, *domains)
+        session.commit()
@@ -0,0 +1,183 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import TextClause, event, text
+from sqlalchemy.orm import SessionTransaction
+from sqlmodel import Session
+
+from app.data_import.config.geo import BulkLoadSettings
+from app.models.schools import Szkola
+
+logger = logging.getLogger(__name__)
+
+# transaction-local switch checked by the szkola_set_geom_3857 trigger function;
+# unlike ALTER TABLE ... DISABLE TRIGGER it takes no lock on szkola, so API and
+# tile reads are not blocked while an import transaction is open
+_SKIP_TRIGGER = text(
+    f"SELECT set_config('{BulkLoadSettings.GEOM_BULK_LOAD_SETTING}', 'on', true)"
+)
+_RUN_TRIGGER = text(
+    f"SELECT set_config('{BulkLoadSettings.GEOM_BULK_LOAD_SETTING}', 'off', true)"
+)
+# same columns as the szkola_set_geom_3857 trigger function
+_REFRESH_GEOM_3857 = text(
+    """
+    UPDATE public.szkola
+    SET
+        geom_3857 = ST_Transform(geom, 3857),
+        latitude = ST_Y(geom),
+        longitude = ST_X(geom)
+    WHERE id = ANY(:school_ids)
+    """
+)
+# rewrites geom in place, so it runs the trigger body only when it is not skipped
+_TOUCH_GEOM = text(
+    """
+    UPDATE public.szkola
+    SET geom = geom
+    WHERE id = ANY(:school_ids)
+    """
+)
+
+
+def _timed_execute(session: Session, statement: TextClause, school_ids: list[int]):
+    start = time.perf_counter()
+    _ = session.execute(statement, {"school_ids": school_ids})
+    return time.perf_counter() - start
+
+
+@dataclass
+class GeomBulkLoadStats:
+    """Accumulated cost of the set-based geom_3857 refreshes of one import job."""
+
+    rows: int = 0
+    refresh_seconds: float = 0.0
+    # measured once per job on a sample, None until measured
+    trigger_seconds_per_row: float | None = None
+
+    @property
+    def estimated_trigger_seconds(self) -> float | None:
+        if self.trigger_seconds_per_row is None:
+            return None
+        return self.trigger_seconds_per_row * self.rows
+
+    @property
+    def estimated_saved_seconds(self) -> float | None:
+        trigger_seconds = self.estimated_trigger_seconds
+        if trigger_seconds is None:
+            return None
+        return trigger_seconds - self.refresh_seconds
+
+    def log_summary(self) -> None:
+        if not self.rows:
+            logger.info("🗺️ geom_3857 bulk load: no geometries were touched")
+            return
+
+        logger.info(
+            f"🗺️ geom_3857 bulk load: recomputed {self.rows} geometries in {self.refresh_seconds:.3f}s with set-based updates"
+        )
+        trigger_seconds = self.estimated_trigger_seconds
+        saved_seconds = self.estimated_saved_seconds
+        if trigger_seconds is None or saved_seconds is None:
+            return
+        logger.info(
+            f"⏱️ geom_3857 bulk load: row-level trigger would have cost ≈{trigger_seconds:.3f}s, estimated time saved ≈{saved_seconds:.3f}s"
+        )
+
+
+class Geom3857BulkLoad:
+    """
+    Defer geom_3857 (and latitude/longitude) maintenance of one transaction
+    to a single set-based UPDATE.
+
+    While active, the row-level `trg_szkola_set_geom_3857` trigger returns early
+    in the current transaction (the setting is SET LOCAL, so commit and rollback
+    both reset it). Every school whose geom was written must be tracked;
+    `complete()` must run before each commit to recompute geom_3857 for them and
+    let the trigger run again.
+    """
+
+    def __init__(self, session: Session, stats: GeomBulkLoadStats | None = None):
+        self._session: Session = session
+        self.stats: GeomBulkLoadStats = (
+            stats if stats is not None else GeomBulkLoadStats()
+        )
+        self._active: bool = False
+        self._school_ids: set[int] = set()
+        self._pending_schools: list[Szkola] = []
+        event.listen(session, "after_transaction_end", self._on_transaction_end)
+
+    def begin(self) -> None:
+        """Skip the trigger for the rest of the current transaction."""
+        if self._active:
+            return
+        _ = self._session.execute(_SKIP_TRIGGER)
+        self._active = True
+
+    def track(self, school: Szkola) -> None:
+        """Track a school whose id may not be assigned until the next flush."""
+        self.begin()
+        if school.id is not None:
+            self._school_ids.add(school.id)
+        else:
+            self._pending_schools.append(school)
+
+    def track_ids(self, school_ids: list[int]) -> None:
+        self.begin()
+        self._school_ids.update(school_ids)
+
+    def complete(self) -> None:
+        """Recompute geom_3857 for tracked schools and let the trigger run again."""
+        if not self._active:
+            return
+
+        self._session.flush()
+        for school in self._pending_schools:
+            if school.id is not None:
+                self._school_ids.add(school.id)
+
+        school_ids = sorted(self._school_ids)
+        if school_ids:
+            if self.stats.trigger_seconds_per_row is None:
+                self._measure_trigger_cost(school_ids)
+
+            self.stats.refresh_seconds += _timed_execute(
+                self._session, _REFRESH_GEOM_3857, school_ids
+            )
+            self.stats.rows += len(school_ids)
+            logger.debug(f"geom_3857 recomputed for {len(school_ids)} schools")
+
+        _ = self._session.execute(_RUN_TRIGGER)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._active = False
+        self._school_ids.clear()
+        self._pending_schools.clear()
+
+    def _on_transaction_end(
+        self, _session: Session, transaction: SessionTransaction
+    ) -> None:
+        # the setting lives only as long as the outer transaction;
+        # a rollback also resets it and discards the tracked writes
+        if transaction.parent is None:
+            self._reset()
+
+    def _measure_trigger_cost(self, school_ids: list[int]) -> None:
+        """
+        Estimate what the row-level trigger costs per row by rewriting a sample of
+        geometries with and without it, inside a savepoint that is rolled back.
+        """
+        sample_ids = school_ids[: BulkLoadSettings.TRIGGER_COST_SAMPLE_SIZE]
+        savepoint = self._session.begin_nested()
+        try:
+            without_trigger = _timed_execute(self._session, _TOUCH_GEOM, sample_ids)
+            _ = self._session.execute(_RUN_TRIGGER)
+            with_trigger = _timed_execute(self._session, _TOUCH_GEOM, sample_ids)
+        finally:
+            savepoint.rollback()
+
+        self.stats.trigger_seconds_per_row = max(
+            0.0, (with_trigger - without_trigger) / len(sample_ids)
+        )
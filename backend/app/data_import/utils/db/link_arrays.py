@@ -0,0 +1,34 @@
+from sqlalchemy import text
+from sqlmodel import Session
+
+# ARRAY(subquery) yields '{}' for schools without links
+_SYNC_LINK_ARRAYS = text(
+    """
+    UPDATE public.szkola AS s
+    SET
+        ksztalcenie_zawodowe_ids = ARRAY(
+            SELECT skl.ksztalcenie_zawodowe_id
+            FROM public.szkolaksztalceniezawodowelink AS skl
+            WHERE skl.szkola_id = s.id
+            ORDER BY skl.ksztalcenie_zawodowe_id
+        ),
+        etap_edukacji_ids = ARRAY(
+            SELECT sel.etap_id
+            FROM public.szkolaetaplink AS sel
+            WHERE sel.szkola_id = s.id
+            ORDER BY sel.etap_id
+        )
+    WHERE s.id = ANY(:school_ids)
+    """
+)
+
+
+def sync_school_link_arrays(session: Session, school_ids: list[int]) -> None:
+    """
+    Copy the current many-to-many links of the given schools into their denormalized
+    `ksztalcenie_zawodowe_ids` / `etap_edukacji_ids` columns with one set-based UPDATE.
+    Link rows must already be flushed.
+    """
+    if not school_ids:
+        return
+    _ = session.execute(_SYNC_LINK_ARRAYS, {"school_ids": school_ids})
@@ -0,0 +1,28 @@
+from sqlalchemy import text
+from sqlmodel import Session
+
+_SYNC_REGIONS = text(
+    """
+    UPDATE public.szkola AS s
+    SET
+        gmina_id = g.id,
+        powiat_id = p.id,
+        wojewodztwo_id = p.wojewodztwo_id
+    FROM public.miejscowosc AS m
+    JOIN public.gmina AS g ON g.id = m.gmina_id
+    JOIN public.powiat AS p ON p.id = g.powiat_id
+    WHERE m.id = s.miejscowosc_id
+      AND s.id = ANY(:school_ids)
+    """
+)
+
+
+def sync_school_regions(session: Session, school_ids: list[int]) -> None:
+    """
+    Copy the gmina / powiat / wojewodztwo of each school's miejscowosc into its
+    denormalized region columns with one set-based UPDATE.
+    Schools and their localities must already be flushed.
+    """
+    if not school_ids:
+        return
+    _ = session.execute(_SYNC_REGIONS, {"school_ids": school_ids})
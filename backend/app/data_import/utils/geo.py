@@ -1,5 +1,9 @@
+from collections.abc import Sequence
 from typing import cast
 
+import numpy as np
+import numpy.typing as npt
+import shapely
 from geoalchemy2 import WKBElement
 from geoalchemy2.shape import (
     from_shape,  # pyright: ignore[reportUnknownVariableType]
@@ -9,6 +13,8 @@ from shapely.geometry import Point
 
 from app.data_import.config.geo import GeocodingSettings
 
+type FloatArray = npt.NDArray[np.float64]
+
 
 def create_geom_point(lon: float, lat: float) -> WKBElement:
     return from_shape(Point(lon, lat), srid=GeocodingSettings.SRID_WGS84)
@@ -18,6 +24,46 @@ def get_coordinates_from_geom(geom: WKBElement) -> Point:
     return cast(Point, to_shape(geom))
 
 
+def create_geom_points(lons: FloatArray, lats: FloatArray) -> list[WKBElement]:
+    """
+    Vectorized version of create_geom_point.
+
+    Points and their WKB are built by shapely in one call for the whole array,
+    only the WKBElement wrappers are created per point.
+    """
+    wkbs = cast(
+        npt.NDArray[np.object_],
+        shapely.to_wkb(shapely.points(lons, lats)),  # pyright: ignore[reportUnknownMemberType]
+    )
+    return [
+        WKBElement(memoryview(cast(bytes, wkb)), srid=GeocodingSettings.SRID_WGS84)
+        for wkb in wkbs
+    ]
+
+
+def get_coordinates_from_geoms(
+    geoms: Sequence[WKBElement | None],
+) -> tuple[FloatArray, FloatArray]:
+    """
+    Vectorized version of get_coordinates_from_geom.
+
+    Returns (lons, lats) arrays aligned with geoms. Missing or invalid
+    geometries are decoded as NaN.
+    """
+    wkbs = [
+        None
+        if geom is None
+        else bytes.fromhex(geom.data)
+        if isinstance(geom.data, str)
+        else bytes(geom.data)
+        for geom in geoms
+    ]
+    points = shapely.from_wkb(wkbs, on_invalid="ignore")  # pyright: ignore[reportUnknownMemberType]
+    lons = cast(FloatArray, shapely.get_x(points))  # pyright: ignore[reportUnknownMemberType]
+    lats = cast(FloatArray, shapely.get_y(points))  # pyright: ignore[reportUnknownMemberType]
+    return lons, lats
+
+
 def normalize_city_name(city: str) -> str:
     if city in GeocodingSettings.WARSAW_DISTRICTS:
         return "Warszawa"
@@ -0,0 +1,152 @@
+import argparse
+import cProfile
+import logging
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+
+from app.data_import.config.core import PROFILES_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """
+    Wall-clock time and number of calls per import stage (fetch, validate,
+    resolve, flush, commit, ...). Stages may nest, e.g. validate runs inside fetch.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: defaultdict[str, float] = defaultdict(float)
+        self.calls: Counter[str] = Counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def reset(self) -> None:
+        self.seconds.clear()
+        self.calls.clear()
+
+    def log_summary(self, total_seconds: float) -> None:
+        if not self.seconds:
+            return
+        logger.info(f"⏱️ Stage breakdown ({total_seconds:.1f} s total):")
+        for name, seconds in sorted(
+            self.seconds.items(), key=lambda item: item[1], reverse=True
+        ):
+            share = seconds / total_seconds if total_seconds > 0 else 0.0
+            logger.info(
+                f"   {name}: {seconds:.2f} s ({share:.1%}) in {self.calls[name]} calls"
+            )
+
+
+stage_timer = StageTimer()
+
+
+def stage(name: str):
+    """Time a block as part of `name` in the breakdown logged after each CLI command."""
+    return stage_timer.stage(name)
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread at a fixed interval and counts identical
+    stacks, written in the collapsed format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval_seconds: float = 0.005) -> None:
+        self.thread_id: int = thread_id
+        self.interval_seconds: float = interval_seconds
+        self.stacks: Counter[str] = Counter()
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)  # pyright: ignore[reportPrivateUsage]
+            if frame is not None:
+                self.stacks[_collapsed_stack(frame)] += 1
+
+    def write_collapsed(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as collapsed_file:
+            for stack, count in self.stacks.most_common():
+                _ = collapsed_file.write(f"{stack} {count}\n")
+
+
+def _collapsed_stack(frame: FrameType) -> str:
+    names: list[str] = []
+    current: FrameType | None = frame
+    while current is not None:
+        code = current.f_code
+        names.append(f"{Path(code.co_filename).name}:{code.co_qualname}")
+        current = current.f_back
+    # root first; ';' separates frames and spaces separate the count
+    return ";".join(reversed(names)).replace(" ", "_")
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    _ = parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=PROFILES_DIR,
+        default=None,
+        metavar="DIR",
+        help=f"Profile the command, writing .pstats and collapsed stacks to DIR (default: {PROFILES_DIR})",
+    )
+
+
+def run_command(
+    command: Callable[[], object], name: str, profile_dir: Path | None = None
+) -> None:
+    """
+    Run a CLI command, then log its per-stage breakdown. With `profile_dir`
+    the command also runs under cProfile and a stack sampler.
+    """
+    stage_timer.reset()
+    start = time.perf_counter()
+    try:
+        if profile_dir is None:
+            _ = command()
+        else:
+            _profile(command, name, profile_dir)
+    finally:
+        stage_timer.log_summary(time.perf_counter() - start)
+
+
+def _profile(command: Callable[[], object], name: str, profile_dir: Path) -> None:
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    output = profile_dir / f"{name}-{datetime.now():%Y%m%d-%H%M%S}"
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    try:
+        _ = profiler.runcall(command)
+    finally:
+        sampler.stop()
+        profiler.dump_stats(output.with_suffix(".pstats"))
+        sampler.write_collapsed(output.with_suffix(".collapsed"))
+        logger.info(
+            f"🔬 Profile written to {output}.pstats and {output}.collapsed ({sum(sampler.stacks.values())} samples)"
+        )
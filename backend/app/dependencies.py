@@ -1,8 +1,35 @@
 from typing import Annotated
 
 from fastapi import Depends
+from fastapi.params import Depends as DependsParam
 from sqlmodel import Session
 
-from app.core.database import get_session
+from app.core.bulkheads import RouteClass, bulkheads
+from app.core.database import get_session, settings
+from app.core.query_cancellation import set_statement_timeout
+from app.services.data_versions import DataVersions, data_versions
 
 SessionDep = Annotated[Session, Depends(get_session)]
+
+
+def get_data_versions(session: SessionDep) -> DataVersions:
+    return data_versions.get(session)
+
+
+DataVersionsDep = Annotated[DataVersions, Depends(get_data_versions)]
+
+
+def _route(route_class: RouteClass, statement_timeout_ms: int) -> DependsParam:
+    async def admit(
+        _slot: Annotated[None, Depends(bulkheads[route_class].hold)],
+    ) -> None:
+        set_statement_timeout(statement_timeout_ms)
+
+    return Depends(admit)
+
+
+# route dependencies admitting a request into the bulkhead of its route class
+# and limiting the run time of its queries
+HEAVY_ROUTE = _route("heavy", settings.STATEMENT_TIMEOUT_HEAVY_MS)
+LIGHT_ROUTE = _route("light", settings.STATEMENT_TIMEOUT_LIGHT_MS)
+WRITE_ROUTE = _route("write", settings.STATEMENT_TIMEOUT_WRITE_MS)
@@ -1,12 +1,69 @@
-from fastapi import FastAPI
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 
 from app.api.exception_handlers import register_exception_handlers
 from app.api.v1.router import api_v1_router
+from app.core.compression import CompressionMiddleware
+from app.core.database import engine, settings
 from app.core.logging import configure_logging
+from app.core.metrics import (
+    PrometheusMiddleware,
+    mark_worker_exited,
+    metrics_response,
+)
+from app.core.query_cancellation import (
+    QueryCancellationMiddleware,
+    install_query_cancellation,
+)
+from app.core.request_timing import RequestTimingMiddleware, install_query_timing
+from app.core.slow_query_log import SlowQueryRecorder
+from app.core.stale_response import StaleResponseMiddleware
+from app.services.data_change_listener import DataChangeListener
+from app.services.live_tile_cache import LIVE_TILE_DOMAINS, live_tile_cache
+from app.services.ranking_service import (
+    RANKINGS_DOMAINS,
+    ranking_filters_cache,
+    rankings_page_cache,
+)
+from app.services.school_service import schools_live_cache
+
+configure_logging(log_format=settings.LOG_FORMAT)
+install_query_timing()
+install_query_cancellation()
+if settings.SLOW_QUERY_LOG_ENABLED:
+    SlowQueryRecorder(
+        engine,
+        threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+        explain=settings.SLOW_QUERY_EXPLAIN,
+    ).install()
+
 
-configure_logging()
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    listener = DataChangeListener(engine)
+    listener.subscribe(LIVE_TILE_DOMAINS, live_tile_cache.clear)
+    listener.subscribe(LIVE_TILE_DOMAINS, schools_live_cache.clear)
+    listener.subscribe(RANKINGS_DOMAINS, ranking_filters_cache.clear)
+    listener.subscribe(RANKINGS_DOMAINS, rankings_page_cache.clear)
+    if settings.DATA_CHANGE_LISTENER_ENABLED:
+        listener.start(asyncio.get_running_loop())
+    try:
+        yield
+    finally:
+        listener.stop()
+        mark_worker_exited()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(QueryCancellationMiddleware)
+app.add_middleware(StaleResponseMiddleware)
+app.add_middleware(RequestTimingMiddleware)
+# inside the metrics middleware, which reports response sizes as sent
+app.add_middleware(CompressionMiddleware, min_size=settings.COMPRESSION_MIN_SIZE)
+app.add_middleware(PrometheusMiddleware)
 register_exception_handlers(app)
 app.include_router(api_v1_router, prefix="/api/v1")
 
@@ -16,6 +73,11 @@ async def root():
     return {"message": "Backend FastAPI"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return metrics_response()
+
+
 if __name__ == "__main__":
     import uvicorn
 
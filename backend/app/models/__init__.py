@@ -1,7 +1,17 @@
-from . import contact, exam_results, locations, ranking, schools
+from . import (
+    clusters,
+    contact,
+    data_version,
+    exam_results,
+    locations,
+    ranking,
+    schools,
+)
 
 __all__ = [
+    "clusters",
     "contact",
+    "data_version",
     "exam_results",
     "locations",
     "ranking",
@@ -0,0 +1,35 @@
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+
+class SzkolaKlaster(SQLModel, table=True):
+    """
+    Precomputed grid clusters of the default (unfiltered) map view.
+
+    One row per non-empty grid cell of every clustered zoom level. The table is
+    rebuilt by `public.refresh_szkola_klaster()` after imports and read by the
+    `szkola_clustered` tile function when no filters are requested.
+    """
+
+    __tablename__: str = "szkola_klaster"  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    zoom: int = Field(primary_key=True, sa_type=sa.SmallInteger)
+    cell_x: int = Field(primary_key=True, sa_type=sa.BigInteger)
+    cell_y: int = Field(primary_key=True, sa_type=sa.BigInteger)
+
+    point_count: int
+    sum_wynik: float
+    non_null_count: int
+    # cluster centroid in Web Mercator, kept as plain numbers so that Martin
+    # does not auto-publish this table as a separate tile source
+    centroid_x: float
+    centroid_y: float
+    # ABS(hashtext('cl:<cell_x>:<cell_y>')), the same id the live path computes
+    cluster_key: int
+
+    # attributes of the only school in the cell, used when point_count = 1
+    first_id: int
+    first_nazwa: str
+    first_typ: str | None = None
+    first_status: str | None = None
+    first_wynik: float | None = None
@@ -0,0 +1,34 @@
+from datetime import datetime
+from enum import StrEnum
+
+import sqlalchemy as sa
+from sqlmodel import Field, SQLModel
+
+# import jobs NOTIFY this channel with the comma-separated bumped domains
+DATA_VERSION_CHANNEL = "data_version"
+
+
+class DataDomain(StrEnum):
+    SCHOOLS = "schools"
+    RESULTS = "results"
+    SCORES = "scores"
+    RANKINGS = "rankings"
+    GEOMETRY = "geometry"
+
+
+class DataVersion(SQLModel, table=True):
+    """
+    Version counter of one data domain.
+
+    The import jobs bump it in the same transaction that changes the domain, so
+    API caches and ETags keyed on the version change exactly when the data does.
+    """
+
+    __tablename__: str = "data_version"  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    domain: str = Field(primary_key=True, max_length=32)
+    version: int = Field(default=1, sa_type=sa.BigInteger)
+    updated_at: datetime = Field(
+        sa_type=sa.DateTime(timezone=True),  # pyright: ignore[reportArgumentType]
+        sa_column_kwargs={"server_default": sa.func.now()},
+    )
@@ -53,15 +53,41 @@ class RankingBase(SQLModel):
 
 
 class Ranking(RankingBase, table=True):
-    __table_args__: tuple[UniqueConstraint] = (
+    __table_args__: tuple[UniqueConstraint | sa.Index, ...] = (
         UniqueConstraint(
             "szkola_id",
             "rok",
             "rodzaj_rankingu",
             name="uq_ranking_szkola_rok_rodzaj",
         ),
+        # one index range scan per ranking page and scope
+        sa.Index(
+            "idx_ranking_rok_rodzaj_miejsce_kraj",
+            "rok",
+            "rodzaj_rankingu",
+            "miejsce_kraj",
+        ),
+        sa.Index(
+            "idx_ranking_rok_rodzaj_wojewodztwo_miejsce",
+            "rok",
+            "rodzaj_rankingu",
+            "wojewodztwo_id",
+            "miejsce_wojewodztwo",
+        ),
+        sa.Index(
+            "idx_ranking_rok_rodzaj_powiat_miejsce",
+            "rok",
+            "rodzaj_rankingu",
+            "powiat_id",
+            "miejsce_powiat",
+        ),
     )
 
     id: int | None = Field(default=None, primary_key=True)
 
+    # region of the school when the ranking was calculated (copied from szkola)
+    gmina_id: int = Field(foreign_key="gmina.id")
+    powiat_id: int = Field(foreign_key="powiat.id")
+    wojewodztwo_id: int = Field(foreign_key="wojewodztwo.id")
+
     szkola: "Szkola" = Relationship(back_populates="rankingi")  # pyright: ignore[reportAny]
@@ -3,6 +3,8 @@ from datetime import date
 from typing import TYPE_CHECKING, Optional  # pyright: ignore[reportDeprecated]
 
 from geoalchemy2 import Geometry
+from sqlalchemy import Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlmodel import (
     Column,
     Field,
@@ -150,6 +152,31 @@ class Szkola(SzkolaAllData, TimestampMixin, table=True):
     geom_3857: object | None = Field(
         sa_column=Column(Geometry(geometry_type="POINT", srid=3857), nullable=True)
     )
+    # plain copies of the geom coordinates for the live query (bbox filter and
+    # covering index), set together with geom_3857 by the szkola_set_geom_3857 trigger
+    latitude: float | None = Field(default=None)
+    longitude: float | None = Field(default=None)
+
+    # denormalized region hierarchy of miejscowosc, so regional filters and rankings
+    # do not join miejscowosc -> gmina -> powiat; kept in sync by the importer
+    # (see sync_school_regions)
+    gmina_id: int | None = Field(default=None, index=True, foreign_key="gmina.id")
+    powiat_id: int | None = Field(default=None, index=True, foreign_key="powiat.id")
+    wojewodztwo_id: int | None = Field(
+        default=None, index=True, foreign_key="wojewodztwo.id"
+    )
+
+    # denormalized ids of the ksztalcenie_zawodowe / etapy_edukacji links,
+    # filtered with array overlap (&&) on GIN indexes instead of EXISTS on the link tables;
+    # kept in sync by the importer (see sync_school_link_arrays)
+    ksztalcenie_zawodowe_ids: list[int] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(Integer), nullable=False, server_default="{}"),
+    )
+    etap_edukacji_ids: list[int] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(Integer), nullable=False, server_default="{}"),
+    )
 
     # this column is a control flag for editing school visiblity
     # aktualna = "should this record be shown by default"
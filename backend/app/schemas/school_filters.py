@@ -1,15 +1,25 @@
-from typing import ClassVar, Literal, Self, cast
+from typing import ClassVar, Self, cast
 
-from pydantic import ConfigDict, Field, model_validator
+from pydantic import ConfigDict, Field, field_validator, model_validator
 
+from app.core.bbox import (
+    LIVE_TILE_GRID,
+    BboxMode,
+    BboxSelection,
+    BoundingBox,
+    TileKey,
+)
 from app.schemas.base import CustomBaseModel
 from app.schemas.schools import (
     KategoriaUczniowPublic,
     KsztalcenieZawodowePublic,
     StatusPublicznoprawnyPublic,
+    SzkolaPublicShort,
     TypSzkolyPublic,
 )
 
+MAX_LIVE_TILES_PER_REQUEST = 400
+
 
 class SchoolFiltersResponse(CustomBaseModel):
     school_types: list[TypSzkolyPublic]
@@ -26,7 +36,12 @@ class SchoolFilterParams(CustomBaseModel):
     min_lat: float | None = Field(None, ge=-90, le=90)
     max_lng: float | None = Field(None, ge=-180, le=180)
     max_lat: float | None = Field(None, ge=-90, le=90)
-    bbox_mode: Literal["within", "outside"] = "within"
+    bbox_mode: BboxMode = "within"
+    exclude: list[str] | None = Field(
+        None,
+        max_length=16,
+        description="Rectangles the client has already loaded, each as min_lng,min_lat,max_lng,max_lat",
+    )
     q: str | None = Field(
         None, min_length=2, description="Search query for school name"
     )
@@ -42,6 +57,12 @@ class SchoolFilterParams(CustomBaseModel):
     vocational_training_id: list[int] | None = Field(
         None, description="Filter by vocational training IDs", alias="career"
     )
+    voivodeship_id: list[int] | None = Field(
+        None, description="Filter by voivodeship IDs", alias="voivodeship"
+    )
+    county_id: list[int] | None = Field(
+        None, description="Filter by county IDs", alias="county"
+    )
     min_score: int | None = Field(None, ge=0, le=100)
     max_score: int | None = Field(None, ge=0, le=100)
     closed: bool = Field(
@@ -49,6 +70,13 @@ class SchoolFilterParams(CustomBaseModel):
     )
     limit: int | None = Field(None, ge=1, le=1000)
 
+    @field_validator("exclude")
+    @classmethod
+    def validate_exclude(cls, value: list[str] | None) -> list[str] | None:
+        for box in value or []:
+            _ = BoundingBox.parse(box)
+        return value
+
     @model_validator(mode="after")
     def validate_bbox(self) -> Self:
         present = [
@@ -65,3 +93,101 @@ class SchoolFilterParams(CustomBaseModel):
             if cast(float, self.min_lng) >= cast(float, self.max_lng):
                 raise ValueError("max_lng must be greater than min_lng")
         return self
+
+    def bbox_selection(self) -> BboxSelection | None:
+        """Rectangles to load, None when no bbox filter applies."""
+        excluded = [BoundingBox.parse(box) for box in self.exclude or []]
+        if self.min_lng is None and not excluded:
+            return None
+
+        viewport = None
+        if self.min_lng is not None:
+            viewport = BoundingBox(
+                self.min_lng,
+                cast(float, self.min_lat),
+                cast(float, self.max_lng),
+                cast(float, self.max_lat),
+            )
+        return BboxSelection.build(viewport, self.bbox_mode, excluded)
+
+
+class SchoolTileParams(SchoolFilterParams):
+    """
+    Viewport of the differential live endpoint; the bbox is required and only
+    grid tiles not covered by `previous` nor listed in `loaded` are returned.
+    Whole tiles are returned, so `bbox_mode`, `exclude` and `limit` do not apply.
+    """
+
+    _UNSUPPORTED_FIELDS: ClassVar[tuple[str, ...]] = ("bbox_mode", "exclude", "limit")
+
+    previous: str | None = Field(
+        None,
+        description="Previously loaded viewport as min_lng,min_lat,max_lng,max_lat",
+    )
+    loaded: list[str] | None = Field(
+        None,
+        max_length=MAX_LIVE_TILES_PER_REQUEST,
+        description="Keys of tiles the client already has, each as x:y",
+    )
+
+    @field_validator("previous")
+    @classmethod
+    def validate_previous(cls, value: str | None) -> str | None:
+        if value is not None:
+            _ = BoundingBox.parse(value)
+        return value
+
+    @field_validator("loaded")
+    @classmethod
+    def validate_loaded(cls, value: list[str] | None) -> list[str] | None:
+        for key in value or []:
+            _ = LIVE_TILE_GRID.parse_key(key)
+        return value
+
+    @model_validator(mode="after")
+    def validate_tiles(self) -> Self:
+        unsupported = [
+            field
+            for field in self._UNSUPPORTED_FIELDS
+            if field in self.model_fields_set
+        ]
+        if unsupported:
+            raise ValueError(
+                f"Not supported by the tile endpoint: {', '.join(unsupported)}"
+            )
+        if self.min_lng is None:
+            raise ValueError("Bbox parameters are required")
+        if LIVE_TILE_GRID.count(self._viewport()) > MAX_LIVE_TILES_PER_REQUEST:
+            raise ValueError(
+                f"Viewport covers more than {MAX_LIVE_TILES_PER_REQUEST} tiles"
+            )
+        return self
+
+    def _viewport(self) -> BoundingBox:
+        return BoundingBox(
+            cast(float, self.min_lng),
+            cast(float, self.min_lat),
+            cast(float, self.max_lng),
+            cast(float, self.max_lat),
+        )
+
+    def missing_tiles(self) -> list[TileKey]:
+        loaded = {LIVE_TILE_GRID.parse_key(key) for key in self.loaded or []}
+        previous = BoundingBox.parse(self.previous) if self.previous else None
+        return [
+            key
+            for key in LIVE_TILE_GRID.covering(self._viewport())
+            if key not in loaded
+            # the previous response already returned every tile covering it
+            and not (previous and LIVE_TILE_GRID.covers(previous, key))
+        ]
+
+
+class SchoolTile(CustomBaseModel):
+    key: str
+    schools: list[SzkolaPublicShort]
+
+
+class SchoolTilesResponse(CustomBaseModel):
+    tile_size: float
+    tiles: list[SchoolTile]
@@ -1,3 +1,5 @@
+from typing import TypedDict
+
 from app.models.schools import (
     EtapEdukacjiBase,
     KategoriaUczniowBase,
@@ -36,6 +38,22 @@ class SzkolaPublicShort(CustomBaseModel, SzkolaBase):
     miejscowosc: str
 
 
+class SzkolaShortRow(TypedDict):
+    """
+    Trusted row of the short school query, serialized without validation by the
+    hot map endpoints. Keys are the JSON names of SzkolaPublicShort.
+    """
+
+    id: int
+    nazwa: str
+    wynik: float | None
+    typ: str
+    status: str
+    latitude: float
+    longitude: float
+    miejscowosc: str
+
+
 class SzkolaPublicWithRelations(SzkolaPublic):
     etapy_edukacji: list["EtapEdukacjiPublic"]
     typ: "TypSzkolyPublic"
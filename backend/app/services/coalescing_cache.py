@@ -0,0 +1,230 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import wraps
+from typing import Concatenate, Protocol
+
+from pydantic import BaseModel
+from sqlmodel import Session
+
+from app.core.database import DATABASE_UNAVAILABLE_ERRORS
+from app.core.metrics import record_cache_lookup
+from app.core.query_cancellation import ClientDisconnectedError
+from app.core.stale_response import mark_response_stale
+from app.models.data_version import DataDomain
+from app.services.data_versions import data_versions
+
+logger = logging.getLogger(__name__)
+
+type ParamsKey = tuple[tuple[str, object], ...]
+type CacheKey = tuple[Hashable, ...]
+
+# refreshes of expired entries run here, off the request path
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="cache-refresh"
+)
+
+
+def params_cache_key(params: BaseModel, exclude: Collection[str] = ()) -> ParamsKey:
+    """Hashable key of query params, insensitive to id order and duplicates."""
+    values = params.model_dump(exclude=set(exclude))
+    return tuple(
+        (name, tuple(sorted(set(value))) if isinstance(value, list) else value)
+        for name, value in sorted(values.items())
+    )
+
+
+def _argument_key(value: object) -> Hashable:
+    if isinstance(value, BaseModel):
+        return params_cache_key(value)
+    if not isinstance(value, Hashable):
+        raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+    return value
+
+
+@dataclass(slots=True)
+class _Entry[T]:
+    value: T
+    stored_at: float
+    size: int = 0
+    refreshing: bool = False
+
+
+class CoalescingCache[T]:
+    """
+    In-process LRU with single-flight loading and stale-while-revalidate.
+
+    Concurrent misses of one key share a single computation. An entry older
+    than `ttl_seconds` is still served for `stale_seconds` while one background
+    refresh replaces it. When loading fails because the database is unavailable,
+    the last good value is served however old it is and the response is marked
+    with a Warning header.
+
+    With `max_bytes`, least recently used entries are also evicted once the
+    `size` of all entries exceeds it. Values that grow after they are stored
+    (compressed variants added on demand) are measured again on every hit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        stale_seconds: float,
+        max_entries: int,
+        max_bytes: int | None = None,
+        size: Callable[[T], int] | None = None,
+    ) -> None:
+        if (max_bytes is None) != (size is None):
+            raise ValueError("max_bytes and size must be given together")
+        self.name: str = name
+        self._ttl_seconds: float = ttl_seconds
+        self._stale_seconds: float = stale_seconds
+        self._max_entries: int = max_entries
+        self._max_bytes: int | None = max_bytes
+        self._size: Callable[[T], int] | None = size
+        self._entries: OrderedDict[CacheKey, _Entry[T]] = OrderedDict()
+        self._bytes: int = 0
+        # the loaded value and whether it is a last good entry served as stale
+        self._in_flight: dict[CacheKey, Future[tuple[T, bool]]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: CacheKey, load: Callable[[], T], refresh: Callable[[], T]) -> T:
+        """
+        Cached value of `key`. `load` runs on a miss in the calling thread,
+        `refresh` rebuilds an expired entry in the background and must not
+        depend on the caller's request state.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry.stored_at
+                if age <= self._ttl_seconds + self._stale_seconds:
+                    self._entries.move_to_end(key)
+                    self._measure(entry)
+                    if age > self._ttl_seconds and not entry.refreshing:
+                        entry.refreshing = True
+                        _ = _refresh_executor.submit(self._refresh, key, refresh)
+                    record_cache_lookup(self.name, hit=True)
+                    return entry.value
+
+            record_cache_lookup(self.name, hit=False)
+            future = self._in_flight.get(key)
+            loading = future is None
+            if future is None:
+                future = Future[tuple[T, bool]]()
+                self._in_flight[key] = future
+
+        if not loading:
+            # another request is loading the same key, share its result
+            try:
+                value, stale = future.result()
+            except ClientDisconnectedError:
+                # its client went away and the load was cancelled, load it for this one
+                return self.get(key, load, refresh)
+            if stale:
+                mark_response_stale()
+            return value
+
+        try:
+            value = load()
+        except DATABASE_UNAVAILABLE_ERRORS as e:
+            if entry is None:
+                future.set_exception(e)
+                raise
+            logger.warning(
+                f"⚠️ Database unavailable, serving last good {self.name} entry: {e}"
+            )
+            mark_response_stale()
+            future.set_result((entry.value, True))
+            return entry.value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._store(key, value)
+            future.set_result((value, False))
+            return value
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _refresh(self, key: CacheKey, refresh: Callable[[], T]) -> None:
+        try:
+            self._store(key, refresh())
+        except Exception as e:
+            logger.warning(f"⚠️ Background refresh of {self.name} failed: {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    # the next request past the TTL tries again
+                    entry.refreshing = False
+
+    def _store(self, key: CacheKey, value: T) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            entry = _Entry(value, time.monotonic())
+            self._entries[key] = entry
+            self._measure(entry)
+            while len(self._entries) > self._max_entries:
+                self._bytes -= self._entries.popitem(last=False)[1].size
+
+    def _measure(self, entry: _Entry[T]) -> None:
+        """Update the size of `entry` and evict down to `max_bytes`, under the lock."""
+        if self._size is None or self._max_bytes is None:
+            return
+        size = self._size(entry.value)
+        self._bytes += size - entry.size
+        entry.size = size
+        while self._bytes > self._max_bytes and self._entries:
+            self._bytes -= self._entries.popitem(last=False)[1].size
+
+
+class _SessionService(Protocol):
+    session: Session
+
+    def __init__(self, session: Session) -> None: ...
+
+
+def coalesced[S: _SessionService, **P, R](
+    cache: CoalescingCache[R], *domains: DataDomain
+) -> Callable[[Callable[Concatenate[S, P], R]], Callable[Concatenate[S, P], R]]:
+    """
+    Cache a service method in `cache`, keyed on its arguments (pydantic params
+    normalized with `params_cache_key`) and the versions of the data domains
+    its result is built from. Background refreshes call the method on a new
+    service with its own session, bound like the caller's.
+    """
+
+    def decorator(
+        method: Callable[Concatenate[S, P], R],
+    ) -> Callable[Concatenate[S, P], R]:
+        @wraps(method)
+        def wrapper(self: S, *args: P.args, **kwargs: P.kwargs) -> R:
+            key: CacheKey = (
+                method.__qualname__,
+                data_versions.get(self.session).token(*domains),
+                *(_argument_key(arg) for arg in args),
+                *((name, _argument_key(kwargs[name])) for name in sorted(kwargs)),
+            )
+            bind = self.session.get_bind()
+
+            def refresh() -> R:
+                with Session(bind) as session:
+                    return method(type(self)(session), *args, **kwargs)
+
+            return cache.get(key, lambda: method(self, *args, **kwargs), refresh)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import select
+import threading
+from collections.abc import Callable, Iterable
+
+import psycopg2
+from sqlalchemy.engine import Engine
+
+from app.models.data_version import DATA_VERSION_CHANNEL, DataDomain
+from app.services.data_versions import data_versions
+
+logger = logging.getLogger(__name__)
+
+type InvalidationCallback = Callable[[], None]
+
+
+def parse_domains(payload: str) -> set[DataDomain]:
+    domains: set[DataDomain] = set()
+    for name in payload.split(","):
+        try:
+            domains.add(DataDomain(name.strip()))
+        except ValueError:
+            logger.warning(f"⚠️ Unknown data domain in notification: {name!r}")
+    return domains
+
+
+class DataChangeListener:
+    """
+    LISTEN for data_version notifications sent by the import jobs on commit.
+
+    A daemon thread holds one dedicated connection (outside the pool) and waits
+    on it; each notification is handed to the event loop, which forgets the
+    cached data versions and runs the callbacks subscribed to the changed
+    domains. After a reconnect every domain is treated as changed, since
+    notifications sent while disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        channel: str = DATA_VERSION_CHANNEL,
+        reconnect_seconds: float = 5.0,
+    ) -> None:
+        self._engine: Engine = engine
+        self._channel: str = channel
+        self._reconnect_seconds: float = reconnect_seconds
+        self._subscriptions: list[
+            tuple[frozenset[DataDomain], InvalidationCallback]
+        ] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._disconnected: bool = False
+
+    def subscribe(
+        self, domains: Iterable[DataDomain], callback: InvalidationCallback
+    ) -> None:
+        self._subscriptions.append((frozenset(domains), callback))
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="data-change-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        # the thread notices within one wait interval; as a daemon it never blocks exit
+        self._thread = None
+
+    def dispatch(self, domains: set[DataDomain]) -> None:
+        """Invalidate everything that depends on the changed domains."""
+        data_versions.invalidate()
+        for subscribed, callback in self._subscriptions:
+            if subscribed & domains:
+                callback()
+        logger.info(
+            f"🔔 Data changed ({', '.join(sorted(domains))}), caches invalidated"
+        )
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                self._disconnected = True
+                logger.warning(
+                    f"⚠️ Data change listener disconnected: {e}, reconnecting in {self._reconnect_seconds:.0f} s"
+                )
+                _ = self._stopping.wait(self._reconnect_seconds)
+
+    def _listen(self) -> None:
+        dialect = self._engine.dialect
+        cargs, cparams = dialect.create_connect_args(self._engine.url)
+        # a psycopg2 connection of its own: LISTEN needs its socket and notifies
+        connection = psycopg2.connect(*cargs, **{"connect_timeout": 5, **cparams})
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self._channel}")
+            if self._disconnected:
+                self._disconnected = False
+                self._hand_over(set(DataDomain))
+
+            while not self._stopping.is_set():
+                readable, _, _ = select.select([connection], [], [], 1.0)
+                if not readable:
+                    continue
+                connection.poll()
+                domains: set[DataDomain] = set()
+                while connection.notifies:
+                    domains |= parse_domains(connection.notifies.pop(0).payload)
+                if domains:
+                    self._hand_over(domains)
+        finally:
+            connection.close()
+
+    def _hand_over(self, domains: set[DataDomain]) -> None:
+        # invalidated from the event loop, the caches lock against the threadpool
+        if self._loop is not None and not self._loop.is_closed():
+            _ = self._loop.call_soon_threadsafe(self.dispatch, domains)
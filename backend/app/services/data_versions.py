@@ -0,0 +1,72 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from app.core.database import DATABASE_UNAVAILABLE_ERRORS, settings
+from app.models.data_version import DataDomain, DataVersion
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class DataVersions:
+    """Versions of all data domains as read at one point in time."""
+
+    versions: dict[str, int] = field(default_factory=dict)
+    updated_at: dict[str, datetime] = field(default_factory=dict)
+
+    def version(self, domain: DataDomain) -> int:
+        return self.versions.get(domain, 0)
+
+    def token(self, *domains: DataDomain) -> str:
+        """Stable string of the given domain versions, for ETags and cache keys."""
+        return "-".join(f"{domain}.{self.version(domain)}" for domain in domains)
+
+    def last_modified(self, *domains: DataDomain) -> datetime | None:
+        timestamps = [
+            self.updated_at[domain] for domain in domains if domain in self.updated_at
+        ]
+        return max(timestamps, default=None)
+
+
+class DataVersionRegistry:
+    """
+    Per-process copy of the data_version table, re-read at most every
+    `poll_seconds` through the session of the request that needs it.
+    """
+
+    def __init__(self, poll_seconds: float) -> None:
+        self._poll_seconds: float = poll_seconds
+        self._current: DataVersions | None = None
+        self._read_at: float = 0.0
+
+    def get(self, session: Session) -> DataVersions:
+        now = time.monotonic()
+        if self._current is None or now - self._read_at >= self._poll_seconds:
+            try:
+                rows = session.exec(select(DataVersion)).all()
+            except DATABASE_UNAVAILABLE_ERRORS as e:
+                if self._current is None:
+                    raise
+                # keep the cache keys of the last good versions while the database is down
+                logger.warning(
+                    f"⚠️ Could not read data versions, keeping the last ones: {e}"
+                )
+                session.rollback()
+                return self._current
+            self._current = DataVersions(
+                versions={row.domain: row.version for row in rows},
+                updated_at={row.domain: row.updated_at for row in rows},
+            )
+            self._read_at = now
+        return self._current
+
+    def invalidate(self) -> None:
+        """Force the next `get` to read the table again."""
+        self._current = None
+
+
+data_versions = DataVersionRegistry(poll_seconds=settings.DATA_VERSION_POLL_SECONDS)
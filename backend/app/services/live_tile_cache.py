@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.bbox import TileKey
+from app.core.metrics import record_cache_lookup
+from app.models.data_version import DataDomain
+from app.schemas.school_filters import SchoolFilterParams
+from app.schemas.schools import SzkolaShortRow
+from app.services.coalescing_cache import ParamsKey, params_cache_key
+
+type FiltersKey = ParamsKey
+
+# typical JSON size of one SzkolaShortRow, entries are sized from their row count
+# instead of serializing every missed tile a second time
+_SCHOOL_JSON_BYTES = 220
+
+# data the cached school lists are built from, their versions are part of the key
+LIVE_TILE_DOMAINS = (DataDomain.SCHOOLS, DataDomain.SCORES, DataDomain.GEOMETRY)
+
+# parameters that select the area, not the schools inside a tile
+_AREA_FIELDS = {
+    "min_lng",
+    "min_lat",
+    "max_lng",
+    "max_lat",
+    "bbox_mode",
+    "exclude",
+    "limit",
+    "previous",
+    "loaded",
+}
+
+
+def filters_cache_key(filters: SchoolFilterParams) -> FiltersKey:
+    """Hashable key of the non-area filters, insensitive to id order and duplicates."""
+    return params_cache_key(filters, exclude=_AREA_FIELDS)
+
+
+@dataclass(slots=True)
+class _TileEntry:
+    stored_at: float
+    schools: list[SzkolaShortRow]
+    size: int
+
+
+class LiveTileCache:
+    """
+    In-process LRU of per-tile school lists of the differential live endpoint.
+
+    Callers put the data version into the filters key, so re-imported data is
+    never served; `ttl_seconds` only drops entries of old versions and filters.
+    Besides the tile count, the cache is bounded by the estimated serialized
+    size of the lists, a tile in a big city holds far more schools than a rural
+    one. Shared by the threadpool workers of the sync endpoints and the data
+    change listener, every access holds the lock.
+    """
+
+    def __init__(
+        self, name: str, max_tiles: int, max_bytes: int, ttl_seconds: float
+    ) -> None:
+        self.name: str = name
+        self._max_tiles: int = max_tiles
+        self._max_bytes: int = max_bytes
+        self._ttl_seconds: float = ttl_seconds
+        self._entries: OrderedDict[tuple[FiltersKey, TileKey], _TileEntry] = (
+            OrderedDict()
+        )
+        self._bytes: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(
+        self, filters_key: FiltersKey, tile: TileKey
+    ) -> list[SzkolaShortRow] | None:
+        with self._lock:
+            entry = self._entries.get((filters_key, tile))
+            if (
+                entry is not None
+                and time.monotonic() - entry.stored_at > self._ttl_seconds
+            ):
+                self._remove((filters_key, tile))
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((filters_key, tile))
+        record_cache_lookup(self.name, hit=entry is not None)
+        return None if entry is None else entry.schools
+
+    def put(
+        self, filters_key: FiltersKey, tile: TileKey, schools: list[SzkolaShortRow]
+    ) -> None:
+        size = len(schools) * _SCHOOL_JSON_BYTES
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._remove((filters_key, tile))
+            self._entries[(filters_key, tile)] = _TileEntry(
+                time.monotonic(), schools, size
+            )
+            self._bytes += size
+            while len(self._entries) > self._max_tiles or self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: tuple[FiltersKey, TileKey]) -> None:
+        # called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+live_tile_cache = LiveTileCache(
+    "live_tiles", max_tiles=20_000, max_bytes=64 * 1024 * 1024, ttl_seconds=3600
+)
@@ -4,8 +4,11 @@ from pydantic import TypeAdapter
 from sqlalchemy.orm import joinedload
 from sqlmodel import Session, col, func, select
 
+from app.core.compression import PrecompressedBody
+from app.core.database import settings
 from app.core.sqlalchemy_typing import orm_rel_attr
-from app.models.locations import Gmina, Miejscowosc, Powiat, Wojewodztwo
+from app.models.data_version import DataDomain
+from app.models.locations import Powiat, Wojewodztwo
 from app.models.ranking import Ranking, RodzajRankingu
 from app.models.schools import StatusPublicznoprawny, Szkola
 from app.schemas.locations import PowiatPublic, WojewodztwoPublic
@@ -20,17 +23,38 @@ from app.schemas.ranking import (
 )
 from app.schemas.schools import StatusPublicznoprawnyPublic
 from app.services.base_service import BaseService
+from app.services.coalescing_cache import CoalescingCache, coalesced
 
 voivodeships_adapter = TypeAdapter(list[WojewodztwoPublic])
 counties_adapter = TypeAdapter(list[PowiatPublic])
 ranking_with_school_adapter = TypeAdapter(list[RankingWithSchool])
 statuses_adapter = TypeAdapter(list[StatusPublicznoprawnyPublic])
 
+# ranking rows embed school names, statuses and localities
+RANKINGS_DOMAINS = (DataDomain.RANKINGS, DataDomain.SCHOOLS)
+
+ranking_filters_cache = CoalescingCache[RankingsFiltersResponse](
+    "ranking_filters", ttl_seconds=600, stale_seconds=3600, max_entries=4
+)
+# entries hold the serialized page and its compressed variants
+rankings_page_cache = CoalescingCache[PrecompressedBody](
+    "rankings_pages",
+    ttl_seconds=600,
+    stale_seconds=3600,
+    max_entries=2_000,
+    max_bytes=64 * 1024 * 1024,
+    size=lambda body: body.stored_bytes,
+)
+
+# latest ranking year per type, valid for one rankings data version
+_latest_years: dict[str, dict[RodzajRankingu, int]] = {}
+
 
 class RankingService(BaseService[Ranking]):
     def __init__(self, session: Session) -> None:
         super().__init__(session, Ranking)
 
+    @coalesced(ranking_filters_cache, *RANKINGS_DOMAINS)
     def get_ranking_filters(self) -> RankingsFiltersResponse:
         years = list(
             self.session.exec(
@@ -66,6 +90,29 @@ class RankingService(BaseService[Ranking]):
             statuses=statuses,
         )
 
+    def get_latest_years(self, rankings_version: str) -> dict[RodzajRankingu, int]:
+        """Latest ranking year of each type, queried once per rankings version."""
+        # read once, another request may replace the entry meanwhile
+        latest_years = _latest_years.get(rankings_version)
+        if latest_years is None:
+            rows = self.session.exec(
+                select(
+                    col(Ranking.rodzaj_rankingu), func.max(col(Ranking.rok))
+                ).group_by(col(Ranking.rodzaj_rankingu))
+            ).all()
+            latest_years = {ranking_type: year for ranking_type, year in rows}
+            _latest_years.clear()
+            _latest_years[rankings_version] = latest_years
+        return latest_years
+
+    @coalesced(rankings_page_cache, *RANKINGS_DOMAINS)
+    def get_rankings_page_body(self, params: RankingsParams) -> PrecompressedBody:
+        """JSON of `get_rankings_page`, compressed once per cache entry."""
+        return PrecompressedBody(
+            self.get_rankings_page(params).model_dump_json(by_alias=True).encode(),
+            min_size=settings.COMPRESSION_MIN_SIZE,
+        )
+
     def get_rankings_page(self, params: RankingsParams) -> RankingsResponse:
         where_conditions = [
             col(Ranking.rok) == params.year,
@@ -82,16 +129,21 @@ class RankingService(BaseService[Ranking]):
                 col(Szkola.status_publicznoprawny_id) == params.status_id
             )
 
+        # region ids are denormalized on ranking, regional pages are a range scan
+        # on the (rok, rodzaj_rankingu, <region>_id, miejsce_<region>) indexes
         if params.scope == RankingScope.WOJEWODZTWO:
-            where_conditions.append(col(Powiat.wojewodztwo_id) == params.voivodeship_id)
+            where_conditions.append(
+                col(Ranking.wojewodztwo_id) == params.voivodeship_id
+            )
         elif params.scope == RankingScope.POWIAT:
-            where_conditions.append(col(Powiat.id) == params.county_id)
+            where_conditions.append(col(Ranking.powiat_id) == params.county_id)
 
-        count_stmt = (
-            select(func.count(col(Ranking.id))).select_from(Ranking).join(Szkola)
-        )
-        if params.scope != RankingScope.KRAJ:
-            count_stmt = count_stmt.join(Miejscowosc).join(Gmina).join(Powiat)
+        # szkola is joined only when filtering on its columns
+        needs_school_join = bool(params.search or params.status_id)
+
+        count_stmt = select(func.count(col(Ranking.id))).select_from(Ranking)
+        if needs_school_join:
+            count_stmt = count_stmt.join(Szkola)
         count_stmt = count_stmt.where(*where_conditions)
         total = self.session.exec(count_stmt).one()
 
@@ -102,9 +154,9 @@ class RankingService(BaseService[Ranking]):
             order_column = col(Ranking.miejsce_powiat)
 
         offset = (params.page - 1) * params.page_size
-        rows_stmt = select(Ranking).join(Szkola)
-        if params.scope != RankingScope.KRAJ:
-            rows_stmt = rows_stmt.join(Miejscowosc).join(Gmina).join(Powiat)
+        rows_stmt = select(Ranking)
+        if needs_school_join:
+            rows_stmt = rows_stmt.join(Szkola)
         rows_stmt = (
             rows_stmt.where(*where_conditions)
             .options(
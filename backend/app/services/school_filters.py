@@ -1,25 +1,176 @@
 # pyright: reportUnknownVariableType = false
 # pyright: reportUnknownArgumentType = false
 # pyright: reportUnknownMemberType = false
-from sqlalchemy import Select
-from sqlmodel import col, exists, func, select
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
 
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    Select,
+    String,
+    and_,
+    any_,
+    bindparam,
+    false,
+    literal_column,
+    or_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlmodel import col, func, select
+
+from app.core.bbox import BboxSelection, BoundingBox
 from app.models.locations import Miejscowosc
 from app.models.schools import (
     StatusPublicznoprawny,
     Szkola,
-    SzkolaKsztalcenieZawodoweLink,
     TypSzkoly,
 )
 from app.schemas.school_filters import SchoolFilterParams
 
+type LiveStatement = Select[tuple[int, str, float | None, str, str, float, float, str]]
+
+# id list filters as (bind parameter, SchoolFilterParams field, predicate); each
+# list is bound as one array, so its length does not change the statement
+_ID_FILTERS: tuple[
+    tuple[str, str, Callable[[ColumnElement[Sequence[int]]], ColumnElement[bool]]], ...
+] = (
+    ("type_ids", "type_id", lambda ids: col(Szkola.typ_id) == any_(ids)),
+    (
+        "status_ids",
+        "status_id",
+        lambda ids: col(Szkola.status_publicznoprawny_id) == any_(ids),
+    ),
+    (
+        "category_ids",
+        "category_id",
+        lambda ids: col(Szkola.kategoria_uczniow_id) == any_(ids),
+    ),
+    # array overlap on the denormalized ids, served by a GIN index
+    (
+        "career_ids",
+        "vocational_training_id",
+        lambda ids: col(Szkola.ksztalcenie_zawodowe_ids).op("&&")(ids),
+    ),
+    # region ids are denormalized on szkola, no joins through miejscowosc
+    (
+        "voivodeship_ids",
+        "voivodeship_id",
+        lambda ids: col(Szkola.wojewodztwo_id) == any_(ids),
+    ),
+    ("county_ids", "county_id", lambda ids: col(Szkola.powiat_id) == any_(ids)),
+)
+
+
+# fills the unused rectangle slots of a shape, no point lies in it
+_NOWHERE = BoundingBox(min_lng=1000, min_lat=1000, max_lng=1000, max_lat=1000)
+
+
+def _slots(count: int) -> int:
+    """Rectangles of a shape holding `count`, rounded up to a power of two."""
+    return 0 if count == 0 else 1 << (count - 1).bit_length()
 
-def build_schools_short_query(
-    filters: SchoolFilterParams,
-) -> Select[tuple[int, str, float | None, str, str, float, float, str]]:
+
+def _padded(boxes: Sequence[BoundingBox]) -> list[BoundingBox]:
+    return [*boxes, *[_NOWHERE] * (_slots(len(boxes)) - len(boxes))]
+
+
+@dataclass(frozen=True, slots=True)
+class LiveQueryShape:
     """
-    Apply filters to the Szkola query based on the provided SchoolFilterParams.
+    Everything the SQL of the live query depends on: which filters are set and
+    how many rectangle slots the bbox selection takes, but none of their values.
+    Rectangle counts are padded to a power of two, so tile and exclude lists of
+    any length share a few statements instead of one per count.
+    """
+
+    closed: bool
+    # None without a bbox filter, 0 for an empty selection
+    regions: int | None
+    excluded: int
+    id_filters: tuple[str, ...]
+    min_score: bool
+    max_score: bool
+    search: bool
+    limit: bool
+
+
+@dataclass(frozen=True, slots=True)
+class LiveQuery:
+    """Statement shared by every request of the same shape and this request's values."""
+
+    shape: LiveQueryShape
+    statement: LiveStatement
+    params: dict[str, object]
+
+    def bound(self) -> LiveStatement:
+        return self.statement.params(self.params)
+
+
+def _box_params(prefix: str, box: BoundingBox) -> dict[str, object]:
+    return {
+        f"{prefix}_min_lng": box.min_lng,
+        f"{prefix}_min_lat": box.min_lat,
+        f"{prefix}_max_lng": box.max_lng,
+        f"{prefix}_max_lat": box.max_lat,
+    }
+
+
+def _box_bounds(
+    prefix: str,
+) -> tuple[
+    ColumnElement[float],
+    ColumnElement[float],
+    ColumnElement[float],
+    ColumnElement[float],
+]:
+    return (
+        bindparam(f"{prefix}_min_lng", type_=Float),
+        bindparam(f"{prefix}_min_lat", type_=Float),
+        bindparam(f"{prefix}_max_lng", type_=Float),
+        bindparam(f"{prefix}_max_lat", type_=Float),
+    )
+
+
+def _coordinates_in(prefix: str) -> ColumnElement[bool]:
+    # range scan on the covering (longitude, latitude) index
+    min_lng, min_lat, max_lng, max_lat = _box_bounds(prefix)
+    return and_(
+        col(Szkola.longitude).between(min_lng, max_lng),
+        col(Szkola.latitude).between(min_lat, max_lat),
+    )
+
+
+def _geom_in(prefix: str) -> ColumnElement[bool]:
+    envelope = func.ST_MakeEnvelope(*_box_bounds(prefix), literal_column("4326"))
+    return col(Szkola.geom).op("&&")(envelope)
+
+
+def _bbox_selection_clause(shape: LiveQueryShape) -> ColumnElement[bool]:
     """
+    Every region is a plain rectangle, so each OR branch can be served by an
+    index: the covering coordinates index for open schools, and the GiST index
+    on geom when closed schools are included (they are not in the covering index).
+    """
+    if not shape.regions:
+        return false()
+
+    region_in = _geom_in if shape.closed else _coordinates_in
+    clause = or_(*(region_in(f"region{index}") for index in range(shape.regions)))
+    if shape.excluded:
+        # regions share edges with the excluded boxes, drop points lying on them
+        clause = and_(
+            clause,
+            *(~_coordinates_in(f"excluded{index}") for index in range(shape.excluded)),
+        )
+    return clause
+
+
+@lru_cache(maxsize=256)
+def _live_statement(shape: LiveQueryShape) -> LiveStatement:
+    """Built once per shape, SQLAlchemy then compiles it once per shape too."""
     statement = (
         select(  # pyright: ignore[reportCallIssue]
             col(Szkola.id),
@@ -27,8 +178,8 @@ def build_schools_short_query(
             col(Szkola.wynik),
             col(TypSzkoly.nazwa).label("typ"),
             col(StatusPublicznoprawny.nazwa).label("status"),
-            func.ST_Y(Szkola.geom).label("latitude"),
-            func.ST_X(Szkola.geom).label("longitude"),
+            col(Szkola.latitude).label("latitude"),
+            col(Szkola.longitude).label("longitude"),
             col(Miejscowosc.nazwa).label("miejscowosc"),
         )
         .join(TypSzkoly)
@@ -37,69 +188,100 @@ def build_schools_short_query(
     )
 
     # exclude schools for which geom is null since they can't be displayed on the map
-    statement = statement.where(col(Szkola.geom) != None)  # noqa: E711
+    # (latitude is maintained together with geom and, unlike geom, is in the covering index)
+    statement = statement.where(col(Szkola.latitude) != None)  # noqa: E711
 
-    if not filters.closed:
+    if not shape.closed:
         statement = statement.where(~(col(Szkola.zlikwidowana)))
 
-    present = [
-        filters.min_lng is not None,
-        filters.min_lat is not None,
-        filters.max_lng is not None,
-        filters.max_lat is not None,
-    ]
-
-    # bounding box filters allow getting schools within or outside the box
-    if all(present):  # all four bbox parameters are provided
-        envelope = func.ST_MakeEnvelope(
-            filters.min_lng,
-            filters.min_lat,
-            filters.max_lng,
-            filters.max_lat,
-            4326,
-        )
-
-        if filters.bbox_mode == "within":
-            statement = statement.where(col(Szkola.geom).op("&&")(envelope))
+    # bounding box filters allow getting schools within or outside the box,
+    # optionally leaving out rectangles the client has already loaded
+    if shape.regions is not None:
+        statement = statement.where(_bbox_selection_clause(shape))
 
-        elif filters.bbox_mode == "outside":
-            statement = statement.where(~col(Szkola.geom).op("&&")(envelope))
-    # Apply filters based on query parameters
-    if filters.type_id:
-        statement = statement.where(col(Szkola.typ_id).in_(filters.type_id))
+    for param, _field, predicate in _ID_FILTERS:
+        if param in shape.id_filters:
+            statement = statement.where(
+                predicate(bindparam(param, type_=ARRAY(Integer)))
+            )
 
-    if filters.status_id:
+    if shape.min_score:
         statement = statement.where(
-            col(Szkola.status_publicznoprawny_id).in_(filters.status_id)
+            col(Szkola.wynik) >= bindparam("min_score", type_=Float)
         )
-
-    if filters.category_id:
+    if shape.max_score:
         statement = statement.where(
-            col(Szkola.kategoria_uczniow_id).in_(filters.category_id)
+            col(Szkola.wynik) <= bindparam("max_score", type_=Float)
         )
 
-    if filters.vocational_training_id:
+    # query search for school name
+    if shape.search:
         statement = statement.where(
-            exists(
-                select(1).where(
-                    col(SzkolaKsztalcenieZawodoweLink.szkola_id) == col(Szkola.id),
-                    col(SzkolaKsztalcenieZawodoweLink.ksztalcenie_zawodowe_id).in_(
-                        filters.vocational_training_id
-                    ),
-                )
-            )
+            col(Szkola.nazwa).ilike(bindparam("search", type_=String))
         )
 
+    if shape.limit:  # used for example when fetching live suggestions
+        statement = statement.limit(bindparam("limit", type_=Integer))
+
+    return statement
+
+
+def live_query(
+    filters: SchoolFilterParams, boxes: list[BoundingBox] | None = None
+) -> LiveQuery:
+    """
+    Live query for `filters`, or over the union of `boxes` (e.g. grid tiles)
+    instead of the bbox, exclude and limit parameters of `filters`.
+    """
+    if boxes is None:
+        selection = filters.bbox_selection()
+        limit = filters.limit
+    else:
+        selection = BboxSelection(tuple(boxes), ())
+        limit = None
+
+    params: dict[str, object] = {}
+    # an empty selection matches nothing, its excluded boxes are not needed
+    excluded = _padded(
+        selection.excluded if selection is not None and selection.regions else ()
+    )
+    regions = [] if selection is None else _padded(selection.regions)
+    for index, region in enumerate(regions):
+        params |= _box_params(f"region{index}", region)
+    for index, box in enumerate(excluded):
+        params |= _box_params(f"excluded{index}", box)
+
+    id_filters: list[str] = []
+    for param, field, _predicate in _ID_FILTERS:
+        ids: list[int] | None = getattr(filters, field)
+        if ids:
+            id_filters.append(param)
+            params[param] = ids
+
     if filters.min_score is not None:
-        statement = statement.where(col(Szkola.wynik) >= filters.min_score)
+        params["min_score"] = filters.min_score
     if filters.max_score is not None:
-        statement = statement.where(col(Szkola.wynik) <= filters.max_score)
-
-    # query search for school name
+        params["max_score"] = filters.max_score
     if filters.q:
-        statement = statement.where(col(Szkola.nazwa).ilike(f"%{filters.q}%"))
+        params["search"] = f"%{filters.q}%"
+    if limit:
+        params["limit"] = limit
+
+    shape = LiveQueryShape(
+        closed=filters.closed,
+        regions=None if selection is None else len(regions),
+        excluded=len(excluded),
+        id_filters=tuple(id_filters),
+        min_score=filters.min_score is not None,
+        max_score=filters.max_score is not None,
+        search=bool(filters.q),
+        limit=bool(limit),
+    )
+    return LiveQuery(shape, _live_statement(shape), params)
 
-    if filters.limit:  # used for example when fetching live suggestions
-        statement = statement.limit(filters.limit)
 
-    return statement
+def build_schools_short_query(filters: SchoolFilterParams) -> LiveStatement:
+    """
+    Apply filters to the Szkola query based on the provided SchoolFilterParams.
+    """
+    return live_query(filters).bound()
@@ -1,15 +1,58 @@
+from datetime import datetime
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import RowMapping
 from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import Session, select
 
+from app.core.bbox import LIVE_TILE_GRID, TileKey
+from app.core.compression import PrecompressedBody
+from app.core.database import settings
+from app.core.prepared_statements import prepared_statements
 from app.core.sqlalchemy_typing import orm_rel_attr
 from app.models.exam_results import WynikE8, WynikEM
 from app.models.locations import Gmina, Miejscowosc, Powiat
 from app.models.schools import Szkola
-from app.schemas.school_filters import SchoolFilterParams
-from app.schemas.schools import SzkolaPublicShort
+from app.schemas.school_filters import SchoolFilterParams, SchoolTileParams
+from app.schemas.schools import SzkolaPublicShort, SzkolaShortRow
 from app.services.base_service import BaseService
+from app.services.coalescing_cache import CoalescingCache, coalesced
+from app.services.data_versions import data_versions
 from app.services.exceptions import EntityNotFoundError
-from app.services.school_filters import build_schools_short_query
+from app.services.live_tile_cache import (
+    LIVE_TILE_DOMAINS,
+    filters_cache_key,
+    live_tile_cache,
+)
+from app.services.school_filters import LiveQuery, live_query
+
+schools_live_adapter = TypeAdapter(list[SzkolaPublicShort])
+
+# map views of the live endpoint repeat for every visitor with the same filters,
+# entries hold the serialized list and its compressed variants; every panned
+# viewport is a new key, so the total size is bounded as well
+schools_live_cache = CoalescingCache[PrecompressedBody](
+    "schools_live",
+    ttl_seconds=600,
+    stale_seconds=3600,
+    max_entries=2_000,
+    max_bytes=64 * 1024 * 1024,
+    size=lambda body: body.stored_bytes,
+)
+
+
+def _short_row(row: RowMapping) -> SzkolaShortRow:
+    return SzkolaShortRow(
+        id=row["id"],
+        nazwa=row["nazwa"],
+        wynik=row["wynik"],
+        typ=row["typ"],
+        status=row["status"],
+        latitude=row["latitude"],
+        longitude=row["longitude"],
+        miejscowosc=row["miejscowosc"],
+    )
 
 
 class SchoolService(BaseService[Szkola]):
@@ -19,6 +62,12 @@ class SchoolService(BaseService[Szkola]):
     def get_school(self, school_id: int) -> Szkola:
         return self._get_entity(school_id)
 
+    def get_school_updated_at(self, school_id: int) -> datetime | None:
+        """Primary-key lookup of the school's modification time, None if it does not exist."""
+        return self.session.exec(
+            select(Szkola.updated_at).where(Szkola.id == school_id)
+        ).one_or_none()
+
     def get_school_with_relations(self, school_id: int) -> Szkola:
         stmt = (
             select(Szkola)
@@ -53,11 +102,90 @@ class SchoolService(BaseService[Szkola]):
     def get_schools(self) -> list[Szkola]:
         return self._get_entities()
 
+    def get_schools_live_rows(
+        self, filters: SchoolFilterParams
+    ) -> list[SzkolaShortRow]:
+        rows = self._execute_live(live_query(filters))
+
+        # the query's labels are the response's field names and its column types
+        # match, validating tens of thousands of rows would only copy them
+        return [_short_row(row) for row in rows]
+
     def get_schools_live(self, filters: SchoolFilterParams) -> list[SzkolaPublicShort]:
-        stmt = build_schools_short_query(filters)
+        return schools_live_adapter.validate_python(self.get_schools_live_rows(filters))
 
-        rows = (
-            self.session.connection().execute(stmt).mappings().all()
-        )  # use execute from sqlalchemy Session to get mappings
+    @coalesced(schools_live_cache, *LIVE_TILE_DOMAINS)
+    def get_schools_live_body(self, filters: SchoolFilterParams) -> PrecompressedBody:
+        """JSON of `get_schools_live_rows`, compressed once per cache entry."""
+        return PrecompressedBody(
+            to_json(self.get_schools_live_rows(filters)),
+            min_size=settings.COMPRESSION_MIN_SIZE,
+        )
 
-        return [SzkolaPublicShort.model_validate(row) for row in rows]
+    def get_schools_live_tiles(self, params: SchoolTileParams) -> bytes:
+        """
+        JSON of the SchoolTilesResponse with the schools of the grid tiles the
+        client does not have yet, one list per tile. Tiles are cached per filter
+        combination and data version, so panning queries only the tiles that
+        were never requested with the same filters.
+        """
+        versions = data_versions.get(self.session)
+        filters_key = (
+            *filters_cache_key(params),
+            ("data_version", versions.token(*LIVE_TILE_DOMAINS)),
+        )
+        missing = params.missing_tiles()
+
+        tiles: dict[TileKey, list[SzkolaShortRow]] = {}
+        uncached: list[TileKey] = []
+        for key in missing:
+            cached = live_tile_cache.get(filters_key, key)
+            if cached is None:
+                uncached.append(key)
+            else:
+                tiles[key] = cached
+
+        if uncached:
+            fetched = self._get_schools_by_tile(params, uncached)
+            for key in uncached:
+                tiles[key] = fetched.get(key, [])
+                live_tile_cache.put(filters_key, key, tiles[key])
+
+        # serialized directly, keys are the aliases of SchoolTilesResponse and SchoolTile
+        return to_json(
+            {
+                "tileSize": LIVE_TILE_GRID.size,
+                "tiles": [
+                    {"key": LIVE_TILE_GRID.format_key(key), "schools": tiles[key]}
+                    for key in missing
+                ],
+            }
+        )
+
+    def _get_schools_by_tile(
+        self, filters: SchoolFilterParams, keys: list[TileKey]
+    ) -> dict[TileKey, list[SzkolaShortRow]]:
+        requested = set(keys)
+        rows = self._execute_live(
+            live_query(filters, [LIVE_TILE_GRID.bounds(key) for key in keys])
+        )
+
+        by_tile: dict[TileKey, list[SzkolaShortRow]] = {}
+        for row in rows:
+            school = _short_row(row)
+            # tile bounds are inclusive, a point on a shared edge belongs to one tile
+            key = LIVE_TILE_GRID.key_of(school["longitude"], school["latitude"])
+            if key in requested:
+                by_tile.setdefault(key, []).append(school)
+        return by_tile
+
+    def _execute_live(self, query: LiveQuery) -> list[RowMapping]:
+        # use the Session's connection to get mappings
+        connection = self.session.connection()
+        if settings.PREPARED_STATEMENTS_ENABLED:
+            result = prepared_statements.execute(
+                connection, query.statement, query.params
+            )
+        else:
+            result = connection.execute(query.statement, query.params)
+        return list(result.mappings())
@@ -0,0 +1,161 @@
+"""
+Benchmark of response compression for the /schools/live payload: bytes on the
+wire and server CPU per request for every available encoding, compressing on
+the fly in CompressionMiddleware against a cache hit of a PrecompressedBody.
+
+Requests are sent straight to the ASGI app, so the numbers contain no client or
+socket work. The payload is synthetic by default, or the real unfiltered list
+read from the database.
+
+Usage:
+    uv run python -m benchmarks.compression --schools 30000 --requests 50
+    uv run python -m benchmarks.compression --from-db
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request, Response
+from pydantic import TypeAdapter
+from sqlmodel import Session
+from starlette.types import ASGIApp, Message
+
+from app.core.compression import (
+    AVAILABLE_ENCODINGS,
+    CompressionMiddleware,
+    PrecompressedBody,
+    PrecompressedResponse,
+)
+from app.core.database import engine, settings
+from app.schemas.school_filters import SchoolFilterParams
+from app.schemas.schools import SzkolaPublicShort
+from app.services.school_service import SchoolService
+from benchmarks.utils import percentiles_ms, synthetic_school_rows
+
+schools_adapter = TypeAdapter(list[SzkolaPublicShort])
+
+
+def database_schools() -> list[SzkolaPublicShort]:
+    with Session(engine) as session:
+        return SchoolService(session).get_schools_live(
+            SchoolFilterParams.model_validate({})
+        )
+
+
+# path of each way of serving the payload
+MODES = {"on the fly": "/on-the-fly", "precompressed": "/precompressed"}
+
+
+def build_app(schools: list[SzkolaPublicShort]) -> ASGIApp:
+    """The same payload served by serializing per request and from a warm cache entry."""
+    body = PrecompressedBody(
+        schools_adapter.dump_json(schools, by_alias=True),
+        min_size=settings.COMPRESSION_MIN_SIZE,
+    )
+    app = FastAPI()
+
+    @app.get("/on-the-fly")
+    async def on_the_fly() -> list[SzkolaPublicShort]:  # pyright: ignore[reportUnusedFunction]
+        return schools
+
+    @app.get("/precompressed")
+    async def precompressed(request: Request) -> Response:  # pyright: ignore[reportUnusedFunction]
+        return PrecompressedResponse(request, body)
+
+    return CompressionMiddleware(app, settings.COMPRESSION_MIN_SIZE)
+
+
+async def request_once(app: ASGIApp, path: str, accept_encoding: str) -> int:
+    """Send one GET to the ASGI app and return the size of the response body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000),
+    }
+    size = 0
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def measure(
+    app: ASGIApp, path: str, accept_encoding: str, requests: int
+) -> tuple[int, float, list[float]]:
+    # the first request fills the precompressed variant, it is not a cache hit
+    size = await request_once(app, path, accept_encoding)
+    wall: list[float] = []
+    cpu_start = time.process_time()
+    for _ in range(requests):
+        start = time.perf_counter()
+        _ = await request_once(app, path, accept_encoding)
+        wall.append(time.perf_counter() - start)
+    cpu_ms = (time.process_time() - cpu_start) / requests * 1000
+    return size, cpu_ms, wall
+
+
+async def run(schools: list[SzkolaPublicShort], requests: int) -> None:
+    app = build_app(schools)
+    print(
+        f"{len(schools)} schools, {requests} requests per row, compression above {settings.COMPRESSION_MIN_SIZE} bytes"
+    )
+    print(
+        f"{'mode':<14} {'encoding':<9} {'KB on wire':>11} {'ratio':>7} {'CPU ms/req':>11} {'p50 ms':>8} {'p90 ms':>8}"
+    )
+    identity_size = 0
+    for mode, path in MODES.items():
+        for encoding in ("identity", *AVAILABLE_ENCODINGS):
+            size, cpu_ms, wall = await measure(app, path, encoding, requests)
+            if encoding == "identity":
+                identity_size = size
+            p50, p90 = percentiles_ms(wall, (50, 90))
+            print(
+                f"{mode:<14} {encoding:<9} {size / 1024:>11.1f} {identity_size / size:>7.1f} {cpu_ms:>11.2f} {p50:>8.2f} {p90:>8.2f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark on-the-fly vs precompressed /schools/live responses"
+    )
+    _ = parser.add_argument("--schools", type=int, default=30_000)
+    _ = parser.add_argument("--requests", type=int, default=50)
+    _ = parser.add_argument(
+        "--from-db",
+        action="store_true",
+        help="use the unfiltered /schools/live list from the database",
+    )
+    _ = parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    schools_count: int = args.schools  # pyright: ignore[reportAny]
+    requests: int = args.requests  # pyright: ignore[reportAny]
+    from_db: bool = args.from_db  # pyright: ignore[reportAny]
+    seed: int = args.seed  # pyright: ignore[reportAny]
+
+    schools = (
+        database_schools()
+        if from_db
+        else schools_adapter.validate_python(synthetic_school_rows(schools_count, seed))
+    )
+    asyncio.run(run(schools, requests))
+
+
+if __name__ == "__main__":
+    main()
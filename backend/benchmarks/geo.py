@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of per-point geometry construction and decoding used by the
+import pipeline: scalar helpers (one shapely call per school) against the
+vectorized batch helpers.
+
+Usage:
+    uv run python -m benchmarks.geo --points 50000 --repeat 5
+"""
+
+import argparse
+
+import numpy as np
+
+from app.data_import.utils.geo import (
+    create_geom_point,
+    create_geom_points,
+    get_coordinates_from_geom,
+    get_coordinates_from_geoms,
+)
+from benchmarks.utils import best_of, per_item_us
+
+# bounding box of Poland, points are spread the same way as real schools would be
+LON_RANGE = (14.12, 24.15)
+LAT_RANGE = (49.0, 54.84)
+
+
+def _random_coordinates(points: int, seed: int):
+    rng = np.random.default_rng(seed)
+    lons = rng.uniform(*LON_RANGE, size=points)
+    lats = rng.uniform(*LAT_RANGE, size=points)
+    return lons, lats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark scalar vs batch geometry helpers"
+    )
+    _ = parser.add_argument("--points", type=int, default=50_000)
+    _ = parser.add_argument("--repeat", type=int, default=5)
+    _ = parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    points: int = args.points  # pyright: ignore[reportAny]
+    repeat: int = args.repeat  # pyright: ignore[reportAny]
+    seed: int = args.seed  # pyright: ignore[reportAny]
+
+    lons, lats = _random_coordinates(points, seed)
+    lon_list: list[float] = lons.tolist()
+    lat_list: list[float] = lats.tolist()
+    geoms = create_geom_points(lons, lats)
+
+    results = {
+        "encode scalar": best_of(
+            lambda: [
+                create_geom_point(lon, lat)
+                for lon, lat in zip(lon_list, lat_list, strict=True)
+            ],
+            repeat,
+        ),
+        "encode batch": best_of(lambda: create_geom_points(lons, lats), repeat),
+        "decode scalar": best_of(
+            lambda: [get_coordinates_from_geom(geom) for geom in geoms], repeat
+        ),
+        "decode batch": best_of(lambda: get_coordinates_from_geoms(geoms), repeat),
+    }
+
+    print(f"{points} points, best of {repeat} runs")
+    for name, seconds in results.items():
+        print(
+            f"{name:<14} {seconds * 1000:>9.2f} ms total {per_item_us(seconds, points):>7.2f} µs/point"
+        )
+    for operation in ("encode", "decode"):
+        speedup = results[f"{operation} scalar"] / results[f"{operation} batch"]
+        print(f"{operation} speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
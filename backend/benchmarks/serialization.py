@@ -0,0 +1,116 @@
+"""
+Per-row serialization cost of a country-wide /schools/live response.
+
+Compares the path through pydantic models (validated in the service, then
+validated again and dumped against the declared response model, as FastAPI
+does for a returned model list) with the trusted-row path serving the query
+rows straight to JSON bytes.
+
+Usage:
+    uv run python -m benchmarks.serialization --schools 50000 --repeat 5
+    uv run python -m benchmarks.serialization --from-db
+"""
+
+import argparse
+from collections.abc import Callable
+
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.schemas.school_filters import SchoolFilterParams
+from app.schemas.schools import SzkolaPublicShort, SzkolaShortRow
+from app.services.school_service import SchoolService
+from benchmarks.utils import best_of, per_item_us, synthetic_school_rows
+
+schools_adapter = TypeAdapter(list[SzkolaPublicShort])
+
+
+def database_rows() -> list[SzkolaShortRow]:
+    with Session(engine) as session:
+        return SchoolService(session).get_schools_live_rows(
+            SchoolFilterParams.model_validate({})
+        )
+
+
+def double_validation(rows: list[SzkolaShortRow]) -> bytes:
+    # service: one model per row; FastAPI: dump to dicts, validate against the
+    # response model and serialize
+    schools = [SzkolaPublicShort.model_validate(row) for row in rows]
+    content = [school.model_dump(by_alias=True) for school in schools]
+    return schools_adapter.dump_json(
+        schools_adapter.validate_python(content), by_alias=True
+    )
+
+
+def validated_models(rows: list[SzkolaShortRow]) -> bytes:
+    return schools_adapter.dump_json(
+        schools_adapter.validate_python(rows), by_alias=True
+    )
+
+
+def constructed_models(rows: list[SzkolaShortRow]) -> bytes:
+    schools = [SzkolaPublicShort.model_construct(**row) for row in rows]
+    return schools_adapter.dump_json(schools, by_alias=True)
+
+
+def trusted_rows(rows: list[SzkolaShortRow]) -> bytes:
+    # the copy stands for the RowMapping -> dict conversion of the service
+    return to_json([dict(row) for row in rows])
+
+
+def strategies() -> dict[str, Callable[[list[SzkolaShortRow]], bytes]]:
+    result: dict[str, Callable[[list[SzkolaShortRow]], bytes]] = {
+        "double validation (before)": double_validation,
+        "validated models": validated_models,
+        "model_construct": constructed_models,
+        "trusted rows to_json (now)": trusted_rows,
+    }
+    try:
+        import orjson  # pyright: ignore[reportMissingImports]
+
+        def orjson_rows(rows: list[SzkolaShortRow]) -> bytes:
+            return orjson.dumps([dict(row) for row in rows])  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+
+        result["trusted rows orjson"] = orjson_rows
+    except ImportError:
+        pass
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark per-row serialization of the /schools/live response"
+    )
+    _ = parser.add_argument("--schools", type=int, default=50_000)
+    _ = parser.add_argument("--repeat", type=int, default=5)
+    _ = parser.add_argument(
+        "--from-db",
+        action="store_true",
+        help="use the unfiltered /schools/live rows from the database",
+    )
+    _ = parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    schools: int = args.schools  # pyright: ignore[reportAny]
+    repeat: int = args.repeat  # pyright: ignore[reportAny]
+    from_db: bool = args.from_db  # pyright: ignore[reportAny]
+    seed: int = args.seed  # pyright: ignore[reportAny]
+
+    rows = database_rows() if from_db else synthetic_school_rows(schools, seed)
+    reference = trusted_rows(rows)
+    print(f"{len(rows)} rows, {len(reference) / 1024:.0f} KB of JSON")
+    print(f"{'strategy':<28} {'total ms':>9} {'us/row':>8} {'vs now':>7}")
+
+    results: dict[str, float] = {}
+    for name, serialize in strategies().items():
+        results[name] = best_of(lambda serialize=serialize: serialize(rows), repeat)
+    now = results["trusted rows to_json (now)"]
+    for name, seconds in results.items():
+        print(
+            f"{name:<28} {seconds * 1000:>9.1f} {per_item_us(seconds, len(rows)):>8.2f} {seconds / now:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Per-request statement overhead of the /schools/live query.
+
+In Python: building a new SQLAlchemy statement for every request (as before),
+generating its cache key and compiling it, against the statement cached per
+query shape. With a database: the Postgres planning time of the query sent
+with literal values, as psycopg2 does, against EXECUTE of a prepared statement,
+and the wall time of both ways of running it.
+
+Usage:
+    uv run python -m benchmarks.statements --executions 200
+    uv run python -m benchmarks.statements --no-db
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from typing import cast
+
+from sqlalchemy import Connection
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.core.prepared_statements import CUSTOM_PLANS_SQL, PreparedStatements
+from app.schemas.school_filters import SchoolFilterParams
+from app.services.school_filters import (
+    LiveQuery,
+    _live_statement,  # pyright: ignore[reportPrivateUsage]
+    live_query,
+)
+from benchmarks.utils import best_of, per_item_us, percentiles_ms
+
+VIEWPORT = {"min_lng": 19.0, "min_lat": 51.0, "max_lng": 20.5, "max_lat": 52.5}
+
+SCENARIOS: dict[str, SchoolFilterParams] = {
+    "country": SchoolFilterParams.model_validate({}),
+    "viewport": SchoolFilterParams.model_validate(VIEWPORT),
+    "viewport + types": SchoolFilterParams.model_validate(
+        {**VIEWPORT, "type_id": [1, 2, 3, 4, 5]}
+    ),
+    "outside + exclude": SchoolFilterParams.model_validate(
+        {**VIEWPORT, "bbox_mode": "outside", "exclude": ["18.0,50.0,19.5,51.5"]}
+    ),
+    "suggestions": SchoolFilterParams.model_validate({"q": "liceum", "limit": 10}),
+    "all filters": SchoolFilterParams.model_validate(
+        {
+            **VIEWPORT,
+            "type_id": [1, 2],
+            "status_id": [1],
+            "voivodeship_id": [7],
+            "min_score": 40,
+            "max_score": 90,
+            "q": "szko",
+        }
+    ),
+}
+
+dialect = postgresql.dialect()
+
+
+def per_call_us(func: Callable[[], object], calls: int) -> float:
+    def loop() -> None:
+        for _ in range(calls):
+            _ = func()
+
+    return per_item_us(best_of(loop, 3), calls)
+
+
+def python_overhead(filters: SchoolFilterParams, calls: int) -> list[float]:
+    """us per call to build, key, compile and look up the statement of `filters`."""
+    query = live_query(filters)
+    build = _live_statement.__wrapped__  # the builder without the per-shape cache
+    return [
+        per_call_us(lambda: build(query.shape), calls),
+        per_call_us(query.statement._generate_cache_key, calls),  # pyright: ignore[reportPrivateUsage]
+        per_call_us(lambda: query.statement.compile(dialect=dialect), calls),
+        per_call_us(lambda: live_query(filters), calls),
+    ]
+
+
+def planning_ms(
+    connection: Connection, sql: str, arguments: tuple[object, ...]
+) -> float:
+    explain = cast(
+        list[dict[str, float]],
+        connection.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", arguments
+        ).scalar_one(),
+    )
+    return explain[0]["Planning Time"]
+
+
+def database_overhead(
+    connection: Connection,
+    prepared: PreparedStatements,
+    query: LiveQuery,
+    executions: int,
+) -> list[float]:
+    """Median planning ms and p50/p90 wall ms, literal SQL and then prepared."""
+    literal_sql = str(
+        query.bound().compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    ).replace("%", "%%")
+    # planned per execution like the API runs them, the saving is parse and rewrite
+    _ = connection.exec_driver_sql(CUSTOM_PLANS_SQL)
+    _ = prepared.execute(connection, query.statement, query.params).all()
+    execute_sql, arguments = prepared.compile(connection, query.statement).execute_sql(
+        query.params
+    )
+
+    literal_planning = [planning_ms(connection, literal_sql, ()) for _ in range(20)]
+    prepared_planning = [
+        planning_ms(connection, execute_sql, arguments) for _ in range(20)
+    ]
+
+    def wall(execute: Callable[[], object]) -> list[float]:
+        times: list[float] = []
+        for _ in range(executions):
+            start = time.perf_counter()
+            _ = execute()
+            times.append(time.perf_counter() - start)
+        return percentiles_ms(times, (50, 90))
+
+    regular = wall(lambda: connection.execute(query.statement, query.params).all())
+    prepared_wall = wall(
+        lambda: prepared.execute(connection, query.statement, query.params).all()
+    )
+    return [
+        statistics.median(literal_planning),
+        statistics.median(prepared_planning),
+        *regular,
+        *prepared_wall,
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark statement build, compile and planning overhead of /schools/live"
+    )
+    _ = parser.add_argument("--calls", type=int, default=2_000)
+    _ = parser.add_argument("--executions", type=int, default=100)
+    _ = parser.add_argument(
+        "--no-db", action="store_true", help="only measure the Python side"
+    )
+    args = parser.parse_args()
+    calls: int = args.calls  # pyright: ignore[reportAny]
+    executions: int = args.executions  # pyright: ignore[reportAny]
+    no_db: bool = args.no_db  # pyright: ignore[reportAny]
+
+    print("Python, us per request")
+    print(
+        f"{'scenario':<18} {'build':>8} {'cache key':>10} {'compile':>9} {'cached query':>13}"
+    )
+    for name, filters in SCENARIOS.items():
+        build, cache_key, compile_us, cached = python_overhead(filters, calls)
+        print(
+            f"{name:<18} {build:>8.1f} {cache_key:>10.1f} {compile_us:>9.1f} {cached:>13.1f}"
+        )
+    if no_db:
+        return
+
+    print()
+    print("Postgres, planning ms (median) and wall ms per execution")
+    print(
+        f"{'scenario':<18} {'plan literal':>13} {'plan prepared':>14} {'p50 regular':>12} {'p90 regular':>12} {'p50 prepared':>13} {'p90 prepared':>13}"
+    )
+    prepared = PreparedStatements()
+    with Session(engine) as session:
+        connection = session.connection()
+        for name, filters in SCENARIOS.items():
+            values = database_overhead(
+                connection, prepared, live_query(filters), executions
+            )
+            print(
+                f"{name:<18} {values[0]:>13.3f} {values[1]:>14.3f} {values[2]:>12.2f} {values[3]:>12.2f} {values[4]:>13.2f} {values[5]:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
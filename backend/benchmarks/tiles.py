@@ -0,0 +1,425 @@
+"""
+Benchmark of the `szkola_clustered` tile function served by Martin.
+
+Tiles covering Poland are enumerated for every requested zoom, a sample of them
+is rendered by calling the function directly with a mix of query_params and
+the report shows per-zoom latency percentiles, tile sizes and
+EXPLAIN (ANALYZE, BUFFERS) summaries of the slowest tiles.
+
+Usage:
+    uv run python -m benchmarks.tiles
+    uv run python -m benchmarks.tiles --zooms 5-15 --tiles-per-zoom 50 --scenarios none,career
+    # measure a changed function before writing a migration for it,
+    # the file is installed inside the benchmark transaction and rolled back
+    uv run python -m benchmarks.tiles --function-sql alembic/versions/sql/szkola_clustered_v3.sql
+"""
+
+import argparse
+import json
+import logging
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import cast
+
+import numpy as np
+from sqlalchemy import Connection, text
+
+from app.core.database import engine
+from benchmarks.utils import percentiles_ms
+
+logger = logging.getLogger(__name__)
+
+# min_lon, min_lat, max_lon, max_lat
+POLAND_BOUNDS = (14.07, 49.0, 24.15, 54.84)
+DEFAULT_SEARCH = "liceum"
+SCENARIO_NAMES = ("none", "type", "career", "search", "closed")
+
+TILE_QUERY = text(
+    "SELECT public.szkola_clustered(:z, :x, :y, CAST(:query_params AS json))"
+)
+EXPLAIN_QUERY = text(
+    "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+    + "SELECT public.szkola_clustered(:z, :x, :y, CAST(:query_params AS json))"
+)
+MOST_COMMON_TYPE_QUERY = text(
+    """
+    SELECT typ_id
+    FROM public.szkola
+    WHERE aktualna = true AND zlikwidowana = false
+    GROUP BY typ_id
+    ORDER BY COUNT(*) DESC
+    LIMIT 1
+    """
+)
+MOST_COMMON_CAREER_QUERY = text(
+    """
+    SELECT ksztalcenie_zawodowe_id
+    FROM public.szkolaksztalceniezawodowelink
+    GROUP BY ksztalcenie_zawodowe_id
+    ORDER BY COUNT(*) DESC
+    LIMIT 1
+    """
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    name: str
+    query_params: dict[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class TileMeasurement:
+    z: int
+    x: int
+    y: int
+    seconds: float
+    size: int
+
+
+@dataclass(slots=True)
+class ZoomSummary:
+    scenario: str
+    zoom: int
+    tiles: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    avg_bytes: float
+    max_bytes: int
+    empty_tiles: int
+
+
+@dataclass(slots=True)
+class ExplainSummary:
+    execution_ms: float
+    planning_ms: float
+    shared_hit_blocks: int
+    shared_read_blocks: int
+    temp_read_blocks: int
+    temp_written_blocks: int
+    nested_plans: list[str] = field(default_factory=list)
+
+
+def _lon_to_tile_x(lon: float, z: int) -> int:
+    n = 2**z
+    return min(n - 1, int((lon + 180.0) / 360.0 * n))
+
+
+def _lat_to_tile_y(lat: float, z: int) -> int:
+    n = 2**z
+    lat_rad = math.radians(lat)
+    return min(n - 1, int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n))
+
+
+def poland_tile_range(z: int) -> tuple[range, range]:
+    """XYZ tile column and row ranges covering the bounding box of Poland."""
+    min_lon, min_lat, max_lon, max_lat = POLAND_BOUNDS
+    xs = range(_lon_to_tile_x(min_lon, z), _lon_to_tile_x(max_lon, z) + 1)
+    # tile rows grow southwards
+    ys = range(_lat_to_tile_y(max_lat, z), _lat_to_tile_y(min_lat, z) + 1)
+    return xs, ys
+
+
+def sample_tiles(
+    z: int, limit: int, rng: np.random.Generator
+) -> list[tuple[int, int, int]]:
+    """
+    Pick up to `limit` distinct tiles of Poland at zoom z.
+    High zooms have hundreds of thousands of tiles, so they are sampled by index
+    instead of being materialized.
+    """
+    xs, ys = poland_tile_range(z)
+    total = len(xs) * len(ys)
+    if total <= limit:
+        indexes = range(total)
+    else:
+        indexes = sorted(
+            cast(list[int], rng.choice(total, size=limit, replace=False).tolist())
+        )
+    return [(z, xs[index // len(ys)], ys[index % len(ys)]) for index in indexes]
+
+
+def parse_zooms(value: str) -> list[int]:
+    """Parse "5-15" or "5,8,12" into a list of zoom levels."""
+    if "-" in value:
+        start, end = value.split("-", 1)
+        return list(range(int(start), int(end) + 1))
+    return [int(zoom) for zoom in value.split(",")]
+
+
+def build_scenarios(
+    conn: Connection,
+    names: list[str],
+    type_ids: str | None,
+    career_ids: str | None,
+    search: str,
+) -> list[Scenario]:
+    scenarios: list[Scenario] = []
+    for name in names:
+        match name:
+            case "none":
+                scenarios.append(Scenario(name, {}))
+            case "type":
+                type_ids = type_ids or str(
+                    conn.execute(MOST_COMMON_TYPE_QUERY).scalar_one()
+                )
+                scenarios.append(Scenario(name, {"type": type_ids}))
+            case "career":
+                career_ids = career_ids or str(
+                    conn.execute(MOST_COMMON_CAREER_QUERY).scalar_one()
+                )
+                scenarios.append(Scenario(name, {"career": career_ids}))
+            case "search":
+                scenarios.append(Scenario(name, {"q": search}))
+            case "closed":
+                scenarios.append(Scenario(name, {"closed": "true"}))
+            case _:
+                raise ValueError(
+                    f"Unknown scenario '{name}', expected one of {SCENARIO_NAMES}"
+                )
+    return scenarios
+
+
+def _tile_params(z: int, x: int, y: int, scenario: Scenario) -> dict[str, object]:
+    return {"z": z, "x": x, "y": y, "query_params": json.dumps(scenario.query_params)}
+
+
+def measure_tile(
+    conn: Connection, z: int, x: int, y: int, scenario: Scenario, repeat: int
+) -> TileMeasurement:
+    """Render one tile `repeat` times and keep the fastest run."""
+    params = _tile_params(z, x, y, scenario)
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tile = cast(
+            bytes | memoryview | None, conn.execute(TILE_QUERY, params).scalar()
+        )
+        best = min(best, time.perf_counter() - start)
+        size = len(tile) if tile is not None else 0
+    return TileMeasurement(z=z, x=x, y=y, seconds=best, size=size)
+
+
+def summarize_zoom(
+    scenario: Scenario, zoom: int, measurements: list[TileMeasurement]
+) -> ZoomSummary:
+    p50, p90, p99 = percentiles_ms([m.seconds for m in measurements])
+    sizes = [m.size for m in measurements]
+    return ZoomSummary(
+        scenario=scenario.name,
+        zoom=zoom,
+        tiles=len(measurements),
+        p50_ms=p50,
+        p90_ms=p90,
+        p99_ms=p99,
+        max_ms=max(m.seconds for m in measurements) * 1000,
+        avg_bytes=sum(sizes) / len(sizes),
+        max_bytes=max(sizes),
+        empty_tiles=sum(1 for size in sizes if size == 0),
+    )
+
+
+def enable_nested_explain(conn: Connection) -> bool:
+    """
+    Load auto_explain so that plans of the statements inside the function are
+    reported too. Needs a role that is allowed to LOAD it, otherwise only the
+    top-level EXPLAIN summary is available.
+    """
+    savepoint = conn.begin_nested()
+    try:
+        _ = conn.exec_driver_sql("LOAD 'auto_explain'")
+    except Exception as e:
+        savepoint.rollback()
+        logger.warning(f"⚠️ auto_explain unavailable, nested plans skipped: {e}")
+        return False
+    savepoint.commit()
+
+    for setting in (
+        "auto_explain.log_min_duration = 0",
+        "auto_explain.log_analyze = on",
+        "auto_explain.log_buffers = on",
+        "auto_explain.log_nested_statements = on",
+    ):
+        _ = conn.exec_driver_sql(f"SET LOCAL {setting}")
+    return True
+
+
+def explain_tile(
+    conn: Connection,
+    measurement: TileMeasurement,
+    scenario: Scenario,
+    nested: bool,
+) -> ExplainSummary:
+    params = _tile_params(measurement.z, measurement.x, measurement.y, scenario)
+    dbapi_connection = conn.connection.dbapi_connection
+    notices = cast(list[str], getattr(dbapi_connection, "notices", []))
+
+    if nested:
+        # auto_explain reports at LOG level, send those messages to this client
+        _ = conn.exec_driver_sql("SET LOCAL client_min_messages = log")
+        notices.clear()
+    try:
+        plan_json = conn.execute(EXPLAIN_QUERY, params).scalar_one()
+    finally:
+        if nested:
+            _ = conn.exec_driver_sql("SET LOCAL client_min_messages = notice")
+
+    if isinstance(plan_json, str):
+        plan_json = json.loads(plan_json)
+    explain = cast(list[dict[str, object]], plan_json)[0]
+    plan = cast(dict[str, object], explain["Plan"])
+
+    def blocks(key: str) -> int:
+        return cast(int, plan.get(key, 0))
+
+    return ExplainSummary(
+        execution_ms=cast(float, explain["Execution Time"]),
+        planning_ms=cast(float, explain["Planning Time"]),
+        shared_hit_blocks=blocks("Shared Hit Blocks"),
+        shared_read_blocks=blocks("Shared Read Blocks"),
+        temp_read_blocks=blocks("Temp Read Blocks"),
+        temp_written_blocks=blocks("Temp Written Blocks"),
+        nested_plans=[notice.strip() for notice in notices] if nested else [],
+    )
+
+
+def print_zoom_table(summaries: list[ZoomSummary]) -> None:
+    print(
+        f"{'zoom':>4} {'tiles':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'avg KB':>8} {'max KB':>8} {'empty':>6}"
+    )
+    for s in summaries:
+        print(
+            f"{s.zoom:>4} {s.tiles:>6} {s.p50_ms:>9.2f} {s.p90_ms:>9.2f} {s.p99_ms:>9.2f} {s.max_ms:>9.2f} {s.avg_bytes / 1024:>8.1f} {s.max_bytes / 1024:>8.1f} {s.empty_tiles:>6}"
+        )
+
+
+def print_explain(
+    measurement: TileMeasurement, summary: ExplainSummary, plan_lines: int
+) -> None:
+    print(
+        f"  {measurement.z}/{measurement.x}/{measurement.y}: "
+        + f"{measurement.seconds * 1000:.2f} ms measured, "
+        + f"execution {summary.execution_ms:.2f} ms, planning {summary.planning_ms:.2f} ms, "
+        + f"shared hit/read {summary.shared_hit_blocks}/{summary.shared_read_blocks}, "
+        + f"temp read/written {summary.temp_read_blocks}/{summary.temp_written_blocks}, "
+        + f"{measurement.size} bytes"
+    )
+    for nested_plan in summary.nested_plans:
+        lines = nested_plan.splitlines()
+        for line in lines[:plan_lines]:
+            print(f"    {line}")
+        if len(lines) > plan_lines:
+            print(f"    ... ({len(lines) - plan_lines} more lines)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the szkola_clustered tile function on tiles covering Poland"
+    )
+    _ = parser.add_argument(
+        "--zooms", type=str, default="5-15", help='e.g. "5-15" or "5,8,12"'
+    )
+    _ = parser.add_argument("--tiles-per-zoom", type=int, default=50)
+    _ = parser.add_argument(
+        "--scenarios",
+        type=str,
+        default=",".join(SCENARIO_NAMES),
+        help=f"comma separated subset of {', '.join(SCENARIO_NAMES)}",
+    )
+    _ = parser.add_argument(
+        "--type-ids", type=str, default=None, help="defaults to the most common type"
+    )
+    _ = parser.add_argument(
+        "--career-ids",
+        type=str,
+        default=None,
+        help="defaults to the most common vocational training",
+    )
+    _ = parser.add_argument("--search", type=str, default=DEFAULT_SEARCH)
+    _ = parser.add_argument(
+        "--repeat", type=int, default=1, help="runs per tile, the fastest is kept"
+    )
+    _ = parser.add_argument(
+        "--explain-top",
+        type=int,
+        default=3,
+        help="slowest tiles per scenario to EXPLAIN",
+    )
+    _ = parser.add_argument("--explain-plan-lines", type=int, default=25)
+    _ = parser.add_argument(
+        "--function-sql",
+        type=Path,
+        default=None,
+        help="SQL file replacing szkola_clustered for this run only",
+    )
+    _ = parser.add_argument("--seed", type=int, default=42)
+    _ = parser.add_argument(
+        "--output", type=Path, default=None, help="write per-zoom results as JSON"
+    )
+    args = parser.parse_args()
+
+    zooms = parse_zooms(cast(str, args.zooms))
+    tiles_per_zoom = cast(int, args.tiles_per_zoom)
+    repeat = cast(int, args.repeat)
+    explain_top = cast(int, args.explain_top)
+    plan_lines = cast(int, args.explain_plan_lines)
+    function_sql = cast(Path | None, args.function_sql)
+    output = cast(Path | None, args.output)
+    rng = np.random.default_rng(cast(int, args.seed))
+
+    tiles_by_zoom = {zoom: sample_tiles(zoom, tiles_per_zoom, rng) for zoom in zooms}
+    all_summaries: list[ZoomSummary] = []
+
+    with engine.connect() as conn:
+        if function_sql is not None:
+            # executed as a plain string, the SQL file contains literal '%'
+            _ = conn.exec_driver_sql(function_sql.read_text())
+            print(f"Using szkola_clustered from {function_sql} (rolled back at exit)")
+
+        scenarios = build_scenarios(
+            conn,
+            [name.strip() for name in cast(str, args.scenarios).split(",")],
+            type_ids=cast(str | None, args.type_ids),
+            career_ids=cast(str | None, args.career_ids),
+            search=cast(str, args.search),
+        )
+        nested_explain = explain_top > 0 and enable_nested_explain(conn)
+
+        for scenario in scenarios:
+            print(f"\nscenario={scenario.name} query_params={scenario.query_params}")
+            measurements: list[TileMeasurement] = []
+            summaries: list[ZoomSummary] = []
+            for zoom, tiles in tiles_by_zoom.items():
+                zoom_measurements = [
+                    measure_tile(conn, z, x, y, scenario, repeat) for z, x, y in tiles
+                ]
+                measurements.extend(zoom_measurements)
+                summaries.append(summarize_zoom(scenario, zoom, zoom_measurements))
+            print_zoom_table(summaries)
+            all_summaries.extend(summaries)
+
+            if explain_top <= 0:
+                continue
+            print(f"slowest {explain_top} tiles:")
+            slowest = sorted(measurements, key=lambda m: m.seconds, reverse=True)
+            for measurement in slowest[:explain_top]:
+                summary = explain_tile(conn, measurement, scenario, nested_explain)
+                print_explain(measurement, summary, plan_lines)
+
+        # nothing the benchmark did (replaced function, settings) is kept
+        conn.rollback()
+
+    if output is not None:
+        _ = output.write_text(
+            json.dumps([asdict(summary) for summary in all_summaries], indent=2)
+        )
+        print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from app.schemas.schools import SzkolaShortRow
+
+# bounding box of Poland
+SCHOOL_LON_RANGE = (14.12, 24.15)
+SCHOOL_LAT_RANGE = (49.0, 54.84)
+SCHOOL_TYPES = (
+    "Liceum ogólnokształcące",
+    "Technikum",
+    "Szkoła podstawowa",
+    "Przedszkole",
+)
+SCHOOL_STATUSES = ("publiczna", "niepubliczna o uprawnieniach szkoły publicznej")
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    """Run func `repeat` times and return the fastest wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _ = func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def per_item_us(seconds: float, items: int) -> float:
+    return seconds / items * 1_000_000
+
+
+def percentiles_ms(
+    seconds: list[float], quantiles: tuple[int, ...] = (50, 90, 99)
+) -> list[float]:
+    """Percentiles of wall times given in seconds, returned in milliseconds."""
+    values = np.percentile(np.array(seconds) * 1000, quantiles)
+    return [float(value) for value in values]
+
+
+def synthetic_school_rows(count: int, seed: int) -> list[SzkolaShortRow]:
+    """Rows shaped like the /schools/live query, spread over Poland."""
+    rng = np.random.default_rng(seed)
+    lons: list[float] = rng.uniform(*SCHOOL_LON_RANGE, size=count).round(6).tolist()
+    lats: list[float] = rng.uniform(*SCHOOL_LAT_RANGE, size=count).round(6).tolist()
+    scores: list[float] = rng.uniform(0, 100, size=count).round(2).tolist()
+    return [
+        {
+            "id": index + 1,
+            "nazwa": f"Szkoła nr {index % 400 + 1} im. Jana Kochanowskiego",
+            "wynik": score if index % 5 else None,
+            "typ": SCHOOL_TYPES[index % len(SCHOOL_TYPES)],
+            "status": SCHOOL_STATUSES[index % len(SCHOOL_STATUSES)],
+            "latitude": lat,
+            "longitude": lon,
+            "miejscowosc": f"Miejscowość {index % 2500}",
+        }
+        for index, (lon, lat, score) in enumerate(zip(lons, lats, scores, strict=True))
+    ]
@@ -0,0 +1,36 @@
+"""Query-count guard and empty response caches for every endpoint test."""
+
+from collections.abc import Generator
+
+import pytest
+
+from app.services.data_versions import data_versions
+from app.services.ranking_service import ranking_filters_cache, rankings_page_cache
+from app.services.school_service import schools_live_cache
+from tests.conftest import QueryLog
+
+# per request, including the periodic data_version read;
+# raise it for a single test with @pytest.mark.max_queries(n)
+DEFAULT_MAX_QUERIES_PER_REQUEST = 5
+
+
+@pytest.fixture(autouse=True)
+def empty_caches() -> None:
+    """Every test starts cold, so query counts do not depend on test order."""
+    data_versions.invalidate()
+    for cache in (ranking_filters_cache, rankings_page_cache, schools_live_cache):
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def query_guard(
+    request: pytest.FixtureRequest, query_log: QueryLog
+) -> Generator[QueryLog]:
+    yield query_log
+
+    marker = request.node.get_closest_marker("max_queries")
+    max_queries = (
+        int(marker.args[0]) if marker is not None else DEFAULT_MAX_QUERIES_PER_REQUEST
+    )
+    query_log.assert_no_queries_during_serialization()
+    query_log.assert_at_most_per_request(max_queries)
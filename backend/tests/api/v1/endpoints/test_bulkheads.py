@@ -0,0 +1,64 @@
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.exception_handlers import register_exception_handlers
+from app.core.bulkheads import Bulkhead
+
+
+@contextmanager
+def _one_slot_app(
+    max_queue: int, queue_timeout: float
+) -> Iterator[tuple[TestClient, threading.Event, threading.Event]]:
+    """Client of an app whose /slow route holds the only slot until released."""
+    bulkhead = Bulkhead("heavy", 1, max_queue=max_queue, queue_timeout=queue_timeout)
+    started = threading.Event()
+    release = threading.Event()
+    app = FastAPI()
+    register_exception_handlers(app)
+
+    @app.get("/slow", dependencies=[Depends(bulkhead.hold)])
+    def slow() -> dict[str, bool]:  # pyright: ignore[reportUnusedFunction]
+        started.set()
+        return {"released": release.wait(5)}
+
+    with TestClient(app) as client:
+        yield client, started, release
+
+
+def test_full_bulkhead_rejects_with_retry_after() -> None:
+    with (
+        _one_slot_app(max_queue=0, queue_timeout=5) as (client, started, release),
+        ThreadPoolExecutor(1) as executor,
+    ):
+        first = executor.submit(client.get, "/slow")
+        assert started.wait(5)
+
+        rejected = client.get("/slow")
+        release.set()
+
+        assert first.result().status_code == 200
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+
+
+def test_queued_request_runs_when_slot_frees() -> None:
+    with (
+        _one_slot_app(max_queue=1, queue_timeout=5) as (client, started, release),
+        ThreadPoolExecutor(2) as executor,
+    ):
+        first = executor.submit(client.get, "/slow")
+        assert started.wait(5)
+        started.clear()
+
+        queued = executor.submit(client.get, "/slow")
+        # the queued request cannot start before the first one leaves
+        assert not started.wait(0.2)
+        release.set()
+
+        assert first.result().status_code == 200
+        assert queued.result().status_code == 200
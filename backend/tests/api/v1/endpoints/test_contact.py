@@ -1,3 +1,4 @@
+import pytest
 from fastapi.testclient import TestClient
 
 from app.api.v1.endpoints.contact import get_turnstile_service
@@ -21,6 +22,8 @@ class FailingTurnstileService:
         raise TurnstileVerificationFailedError(error_codes=["invalid-input-response"])
 
 
+# INSERT, savepoint release/restart of the test transaction and the refresh
+@pytest.mark.max_queries(6)
 def test_submit_contact_returns_success(client: TestClient) -> None:
     fake = FakeTurnstileService()
     app.dependency_overrides[get_turnstile_service] = lambda: fake
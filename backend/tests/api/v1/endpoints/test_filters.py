@@ -13,3 +13,16 @@ def test_read_filters_returns_seeded_data(seeded_client: TestClient) -> None:
     assert len(data.public_statuses) > 0
     assert len(data.student_categories) > 0
     assert len(data.vocational_training) > 0
+
+
+def test_read_filters_returns_304_for_matching_etag(seeded_client: TestClient) -> None:
+    response = seeded_client.get("/api/v1/filters/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    cached = seeded_client.get("/api/v1/filters/", headers={"If-None-Match": etag})
+
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
@@ -55,3 +55,86 @@ def test_read_rankings_returns_422_for_missing_voivodeship_id_when_scope_is_woje
         },
     )
     assert response.status_code == 422
+
+
+def test_read_rankings_for_voivodeship_are_ordered_by_regional_position(
+    seeded_client: TestClient,
+) -> None:
+    filters_response = seeded_client.get("/api/v1/rankings/filters")
+    assert filters_response.status_code == 200
+    filters_data = RankingsFiltersResponse.model_validate(filters_response.json())
+
+    response = seeded_client.get(
+        "/api/v1/rankings/",
+        params={
+            "year": filters_data.years[0],
+            "type": "E8",
+            "scope": "WOJEWODZTWO",
+            "voivodeshipId": filters_data.voivodeships[0].id,
+            "direction": "BEST",
+        },
+    )
+    assert response.status_code == 200
+
+    data = RankingsResponse.model_validate(response.json())
+    positions = [ranking.miejsce_wojewodztwo for ranking in data.rankings]
+    assert positions == sorted(positions)
+    if positions:
+        assert positions[0] == 1
+        assert data.total == data.rankings[0].liczba_szkol_wojewodztwo
+
+
+def test_read_rankings_etag_depends_on_query(seeded_client: TestClient) -> None:
+    filters_response = seeded_client.get("/api/v1/rankings/filters")
+    year = RankingsFiltersResponse.model_validate(filters_response.json()).years[0]
+    params = {"year": year, "type": "E8", "page": 1}
+
+    response = seeded_client.get("/api/v1/rankings/", params=params)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    cached = seeded_client.get(
+        "/api/v1/rankings/", params=params, headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+
+    next_page = seeded_client.get(
+        "/api/v1/rankings/",
+        params={**params, "page": 2},
+        headers={"If-None-Match": etag},
+    )
+    assert next_page.status_code == 200
+    assert next_page.headers["etag"] != etag
+
+
+def test_read_rankings_is_compressed_with_a_weak_etag(
+    seeded_client: TestClient,
+) -> None:
+    filters_response = seeded_client.get("/api/v1/rankings/filters")
+    year = RankingsFiltersResponse.model_validate(filters_response.json()).years[0]
+    params = {"year": year, "type": "E8", "scope": "KRAJ", "direction": "BEST"}
+
+    identity = seeded_client.get(
+        "/api/v1/rankings/", params=params, headers={"Accept-Encoding": "identity"}
+    )
+    assert identity.status_code == 200
+    assert "content-encoding" not in identity.headers
+
+    compressed = seeded_client.get(
+        "/api/v1/rankings/", params=params, headers={"Accept-Encoding": "gzip"}
+    )
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == identity.json()
+    # one validator for both encodings, so it may not be strong
+    assert compressed.headers["etag"] == f"W/{identity.headers['etag']}"
+
+    cached = seeded_client.get(
+        "/api/v1/rankings/",
+        params=params,
+        headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": compressed.headers["etag"],
+        },
+    )
+    assert cached.status_code == 304
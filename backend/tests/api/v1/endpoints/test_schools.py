@@ -1,14 +1,24 @@
 import pytest
 from fastapi.testclient import TestClient
 from pydantic import TypeAdapter
+from sqlmodel import Session, col, select
 
+from app.core.database import settings
+from app.models.schools import Szkola, SzkolaKsztalcenieZawodoweLink
+from app.schemas.school_filters import SchoolTilesResponse
 from app.schemas.schools import SzkolaPublicShort, SzkolaPublicWithRelations
+from tests.conftest import QueryLog
 from tests.constants import MISSING_INT_ID
 
 pytestmark = pytest.mark.seeded
 
+# updated_at lookup, data_version read, the detail query and one selectin load
+# per collection
+SCHOOL_DETAIL_MAX_QUERIES = 8
+
 school_short_list_adapter = TypeAdapter(list[SzkolaPublicShort])
 SCHOOLS_LIVE_TEST_LIMIT = 10
+LIVE_TILES_TEST_BBOX = {"minLng": 19.0, "minLat": 51.0, "maxLng": 20.4, "maxLat": 52.4}
 
 
 def test_read_schools_live_returns_seeded_data(seeded_client: TestClient) -> None:
@@ -22,6 +32,22 @@ def test_read_schools_live_returns_seeded_data(seeded_client: TestClient) -> Non
     assert 0 < len(data) <= SCHOOLS_LIVE_TEST_LIMIT
 
 
+def test_read_schools_live_rows_serialize_like_the_response_model(
+    seeded_client: TestClient,
+) -> None:
+    # rows are serialized without validation, the JSON must not differ from
+    # what the response model would produce
+    response = seeded_client.get(
+        "/api/v1/schools/live", params={"limit": SCHOOLS_LIVE_TEST_LIMIT}
+    )
+    assert response.status_code == 200
+
+    schools = school_short_list_adapter.validate_python(response.json())
+    assert response.json() == school_short_list_adapter.dump_python(
+        schools, mode="json", by_alias=True
+    )
+
+
 def test_read_schools_live_returns_422_for_invalid_query(
     seeded_client: TestClient,
 ) -> None:
@@ -29,6 +55,7 @@ def test_read_schools_live_returns_422_for_invalid_query(
     assert response.status_code == 422
 
 
+@pytest.mark.max_queries(SCHOOL_DETAIL_MAX_QUERIES)
 def test_read_school_returns_response_model(seeded_client: TestClient) -> None:
     schools_response = seeded_client.get(
         "/api/v1/schools/live",
@@ -46,6 +73,222 @@ def test_read_school_returns_response_model(seeded_client: TestClient) -> None:
     assert data.id == school_id
 
 
+@pytest.mark.max_queries(SCHOOL_DETAIL_MAX_QUERIES)
+def test_read_school_returns_304_without_loading_the_school(
+    seeded_client: TestClient, query_log: QueryLog
+) -> None:
+    schools_response = seeded_client.get("/api/v1/schools/live", params={"limit": 1})
+    school_id = school_short_list_adapter.validate_python(schools_response.json())[0].id
+    response = seeded_client.get(f"/api/v1/schools/{school_id}")
+    assert response.status_code == 200
+    assert "last-modified" in response.headers
+
+    query_log.queries.clear()
+    cached = seeded_client.get(
+        f"/api/v1/schools/{school_id}",
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+
+    assert cached.status_code == 304
+    # the updated_at lookup and at most the data_version read
+    assert len(query_log.queries) <= 2
+
+
 def test_read_school_returns_404_for_missing_id(seeded_client: TestClient) -> None:
     response = seeded_client.get(f"/api/v1/schools/{MISSING_INT_ID}")
     assert response.status_code == 404
+
+
+@pytest.mark.max_queries(SCHOOL_DETAIL_MAX_QUERIES)
+def test_read_schools_live_filters_by_career(
+    seeded_client: TestClient, seeded_session: Session
+) -> None:
+    career_id = seeded_session.exec(
+        select(SzkolaKsztalcenieZawodoweLink.ksztalcenie_zawodowe_id)
+        .join(Szkola, col(Szkola.id) == col(SzkolaKsztalcenieZawodoweLink.szkola_id))
+        .where(col(Szkola.geom) != None, ~col(Szkola.zlikwidowana))  # noqa: E711
+        .limit(1)
+    ).first()
+    assert career_id is not None
+
+    response = seeded_client.get(
+        "/api/v1/schools/live",
+        params={"career": career_id, "limit": SCHOOLS_LIVE_TEST_LIMIT},
+    )
+    assert response.status_code == 200
+    schools = school_short_list_adapter.validate_python(response.json())
+    assert len(schools) > 0
+
+    for school in schools:
+        detail_response = seeded_client.get(f"/api/v1/schools/{school.id}")
+        assert detail_response.status_code == 200
+        detail = SzkolaPublicWithRelations.model_validate(detail_response.json())
+        assert career_id in {career.id for career in detail.ksztalcenie_zawodowe}
+
+
+def test_read_schools_live_tiles_cover_viewport(seeded_client: TestClient) -> None:
+    live_response = seeded_client.get(
+        "/api/v1/schools/live", params=LIVE_TILES_TEST_BBOX
+    )
+    assert live_response.status_code == 200
+    live_ids = {
+        school.id
+        for school in school_short_list_adapter.validate_python(live_response.json())
+    }
+
+    response = seeded_client.get(
+        "/api/v1/schools/live/tiles", params=LIVE_TILES_TEST_BBOX
+    )
+    assert response.status_code == 200
+    data = SchoolTilesResponse.model_validate(response.json())
+    tile_ids = [school.id for tile in data.tiles for school in tile.schools]
+
+    assert len(tile_ids) == len(set(tile_ids))
+    assert live_ids <= set(tile_ids)
+
+
+def test_read_schools_live_tiles_returns_only_new_tiles(
+    seeded_client: TestClient,
+) -> None:
+    first = SchoolTilesResponse.model_validate(
+        seeded_client.get(
+            "/api/v1/schools/live/tiles", params=LIVE_TILES_TEST_BBOX
+        ).json()
+    )
+    loaded = [tile.key for tile in first.tiles[:3]]
+
+    panned = seeded_client.get(
+        "/api/v1/schools/live/tiles",
+        params={**LIVE_TILES_TEST_BBOX, "loaded": loaded},
+    )
+    assert panned.status_code == 200
+    keys = {
+        tile.key for tile in SchoolTilesResponse.model_validate(panned.json()).tiles
+    }
+    assert keys == {tile.key for tile in first.tiles} - set(loaded)
+
+    previous = ",".join(str(value) for value in LIVE_TILES_TEST_BBOX.values())
+    unchanged = seeded_client.get(
+        "/api/v1/schools/live/tiles",
+        params={**LIVE_TILES_TEST_BBOX, "previous": previous},
+    )
+    assert unchanged.status_code == 200
+    assert SchoolTilesResponse.model_validate(unchanged.json()).tiles == []
+
+
+def test_read_schools_live_tiles_requires_bbox(seeded_client: TestClient) -> None:
+    response = seeded_client.get("/api/v1/schools/live/tiles")
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "params", [{"bboxMode": "outside"}, {"exclude": "19,51,19.5,51.5"}, {"limit": 5}]
+)
+def test_read_schools_live_tiles_rejects_area_params(
+    seeded_client: TestClient, params: dict[str, str | int]
+) -> None:
+    response = seeded_client.get(
+        "/api/v1/schools/live/tiles", params={**LIVE_TILES_TEST_BBOX, **params}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.max_queries(SCHOOL_DETAIL_MAX_QUERIES)
+def test_read_schools_live_filters_by_county(seeded_client: TestClient) -> None:
+    schools_response = seeded_client.get("/api/v1/schools/live", params={"limit": 1})
+    assert schools_response.status_code == 200
+    school_id = school_short_list_adapter.validate_python(schools_response.json())[0].id
+    detail = SzkolaPublicWithRelations.model_validate(
+        seeded_client.get(f"/api/v1/schools/{school_id}").json()
+    )
+    county = detail.miejscowosc.gmina.powiat
+
+    response = seeded_client.get(
+        "/api/v1/schools/live",
+        params={
+            "county": county.id,
+            "voivodeship": county.wojewodztwo.id,
+            "limit": SCHOOLS_LIVE_TEST_LIMIT,
+        },
+    )
+    assert response.status_code == 200
+    schools = school_short_list_adapter.validate_python(response.json())
+    assert len(schools) > 0
+
+    for school in schools:
+        detail_response = seeded_client.get(f"/api/v1/schools/{school.id}")
+        assert detail_response.status_code == 200
+        detail = SzkolaPublicWithRelations.model_validate(detail_response.json())
+        assert detail.miejscowosc.gmina.powiat.id == county.id
+
+
+def test_read_schools_live_reports_server_timing(
+    seeded_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "REQUEST_TIMING_ENABLED", True)
+    monkeypatch.setattr(settings, "REQUEST_TIMING_SAMPLE_RATE", 1.0)
+
+    response = seeded_client.get(
+        "/api/v1/schools/live", params={"limit": SCHOOLS_LIVE_TEST_LIMIT}
+    )
+    assert response.status_code == 200
+
+    metrics = {
+        entry.split(";")[0].strip(): entry
+        for entry in response.headers["Server-Timing"].split(",")
+    }
+    assert set(metrics) == {"db", "deps", "app", "serialize", "total"}
+    # data_version read and the schools query
+    assert 'desc="2 queries"' in metrics["db"]
+
+
+def test_read_schools_live_is_compressed_and_cached(
+    seeded_client: TestClient, query_log: QueryLog
+) -> None:
+    identity = seeded_client.get(
+        "/api/v1/schools/live", headers={"Accept-Encoding": "identity"}
+    )
+    assert identity.status_code == 200
+    assert "content-encoding" not in identity.headers
+
+    query_log.queries.clear()
+    compressed = seeded_client.get(
+        "/api/v1/schools/live", headers={"Accept-Encoding": "gzip"}
+    )
+    assert compressed.status_code == 200
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.json() == identity.json()
+    # served from the cache entry of the first request
+    assert not [q for q in query_log.queries if "szkola" in q.statement]
+
+
+def test_small_responses_vary_on_accept_encoding(seeded_client: TestClient) -> None:
+    # too small to compress, a shared cache must still key it on the encoding
+    response = seeded_client.get(
+        f"/api/v1/schools/{MISSING_INT_ID}", headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 404
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_read_schools_live_is_counted_in_metrics(seeded_client: TestClient) -> None:
+    response = seeded_client.get(
+        "/api/v1/schools/live", params={"limit": SCHOOLS_LIVE_TEST_LIMIT}
+    )
+    assert response.status_code == 200
+    missing = seeded_client.get(f"/api/v1/schools/{MISSING_INT_ID}")
+    assert missing.status_code == 404
+
+    metrics = seeded_client.get("/metrics")
+    assert metrics.status_code == 200
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/schools/live",status="200"}'
+        in metrics.text
+    )
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/schools/{school_id}",status="404"}'
+        in metrics.text
+    )
+    assert "db_pool_checkout_wait_seconds_bucket" in metrics.text
@@ -1,6 +1,7 @@
 """Shared backend test fixtures."""
 
 from collections.abc import Generator
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import pytest
@@ -9,11 +10,13 @@ from fastapi.testclient import TestClient
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from sqlalchemy import Connection, Transaction, event
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, ExecutionContext
 from sqlmodel import Session, create_engine
 
 from alembic import command
-from app.core.database import get_session
+from app.core.database import get_session, settings
+from app.core.prepared_statements import source_statement
+from app.core.request_timing import RequestTiming, current_request_timing
 from app.main import app
 
 BACKEND_DIR = Path(__file__).resolve().parents[1]
@@ -105,3 +108,75 @@ def session(engine: Engine) -> Generator[Session]:
 @pytest.fixture
 def client(session: Session) -> Generator[TestClient]:
     yield from _test_client_for_session(session)
+
+
+@dataclass
+class RecordedQuery:
+    statement: str
+    # None for queries issued by the test itself, outside of a request
+    request: RequestTiming | None
+    during_serialization: bool
+
+
+@dataclass
+class QueryLog:
+    """Statements executed through the test engine, grouped by the request that issued them."""
+
+    queries: list[RecordedQuery] = field(default_factory=list)
+
+    def per_request(self) -> list[list[RecordedQuery]]:
+        requests: dict[int, list[RecordedQuery]] = {}
+        for query in self.queries:
+            if query.request is not None:
+                # the recorded queries keep every RequestTiming alive, so ids are unique
+                requests.setdefault(id(query.request), []).append(query)
+        return list(requests.values())
+
+    def assert_at_most_per_request(self, max_queries: int) -> None:
+        for queries in self.per_request():
+            statements = "\n\n".join(query.statement for query in queries)
+            assert len(queries) <= max_queries, (
+                f"request issued {len(queries)} queries, expected at most {max_queries}:\n{statements}"
+            )
+
+    def assert_no_queries_during_serialization(self) -> None:
+        lazy_loads = [
+            query.statement for query in self.queries if query.during_serialization
+        ]
+        assert not lazy_loads, (
+            "queries issued while serializing the response (lazy loads):\n"
+            + "\n\n".join(lazy_loads)
+        )
+
+
+@pytest.fixture
+def query_log(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> Generator[QueryLog]:
+    # request timing tells queries of the endpoint and its dependencies apart from
+    # those of serialization
+    monkeypatch.setattr(settings, "REQUEST_TIMING_ENABLED", True)
+    monkeypatch.setattr(settings, "REQUEST_TIMING_SAMPLE_RATE", 1.0)
+    log = QueryLog()
+
+    def record(
+        _conn: Connection,
+        _cursor: object,
+        statement: str,
+        parameters: object,
+        context: ExecutionContext | None,
+        _executemany: bool,
+    ) -> None:
+        timing = current_request_timing()
+        log.queries.append(
+            RecordedQuery(
+                statement=source_statement(context, statement, parameters)[0],
+                request=timing,
+                # dependencies (e.g. conditional GET checks) run before the endpoint
+                during_serialization=timing is not None and timing.endpoint_done,
+            )
+        )
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,164 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.core.stale_response import REVALIDATION_FAILED_WARNING, StaleResponseMiddleware
+from app.schemas.school_filters import SchoolFilterParams
+from app.services.coalescing_cache import CoalescingCache, params_cache_key
+
+
+def make_cache(
+    ttl_seconds: float = 60, stale_seconds: float = 60
+) -> CoalescingCache[int]:
+    return CoalescingCache[int](
+        "test", ttl_seconds=ttl_seconds, stale_seconds=stale_seconds, max_entries=10
+    )
+
+
+def test_params_cache_key_ignores_id_order_and_duplicates() -> None:
+    def key(query: dict[str, object]) -> object:
+        return params_cache_key(SchoolFilterParams.model_validate(query))
+
+    assert key({"type": [3, 1, 3], "q": "liceum"}) == key(
+        {"q": "liceum", "type": [1, 3]}
+    )
+    assert key({"type": [1]}) != key({"type": [2]})
+
+
+def test_concurrent_misses_share_one_load() -> None:
+    cache = make_cache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = 0
+
+    def load() -> int:
+        nonlocal calls
+        calls += 1
+        started.set()
+        _ = release.wait(5)
+        return 42
+
+    results: list[int] = []
+    leader = threading.Thread(
+        target=lambda: results.append(cache.get(("k",), load, load))
+    )
+    leader.start()
+    _ = started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(cache.get(("k",), load, load)))
+        for _ in range(3)
+    ]
+    for follower in followers:
+        follower.start()
+    release.set()
+    for thread in (leader, *followers):
+        thread.join(5)
+
+    assert results == [42, 42, 42, 42]
+    assert calls == 1
+
+
+def test_expired_entry_is_served_while_one_refresh_runs() -> None:
+    cache = make_cache(ttl_seconds=0)
+    _ = cache.get(("k",), lambda: 1, lambda: 1)
+    refreshed = threading.Event()
+    refreshes = 0
+
+    def refresh() -> int:
+        nonlocal refreshes
+        refreshes += 1
+        time.sleep(0.05)
+        refreshed.set()
+        return 2
+
+    def unexpected_load() -> int:
+        raise AssertionError("stale entries are served without loading")
+
+    assert cache.get(("k",), unexpected_load, refresh) == 1
+    assert cache.get(("k",), unexpected_load, refresh) == 1
+    assert refreshed.wait(5)
+    time.sleep(0.05)
+
+    assert refreshes == 1
+    assert cache.get(("k",), unexpected_load, lambda: 3) in (2, 3)
+
+
+def test_last_good_value_is_served_with_warning_when_database_is_down() -> None:
+    cache = make_cache(ttl_seconds=0, stale_seconds=0)
+    _ = cache.get(("k",), lambda: 1, lambda: 1)
+
+    def unavailable() -> int:
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    app = FastAPI()
+    app.add_middleware(StaleResponseMiddleware)
+
+    @app.get("/{key}")
+    async def read(key: str) -> int:  # pyright: ignore[reportUnusedFunction]
+        return cache.get((key,), unavailable, unavailable)
+
+    client = TestClient(app, raise_server_exceptions=False)
+    response = client.get("/k")
+    assert response.json() == 1
+    assert response.headers["warning"] == REVALIDATION_FAILED_WARNING
+
+    with pytest.raises(OperationalError):
+        _ = cache.get(("other",), unavailable, unavailable)
+
+
+def test_followers_of_a_stale_load_are_served_with_warning() -> None:
+    cache = make_cache(ttl_seconds=0, stale_seconds=0)
+    _ = cache.get(("k",), lambda: 1, lambda: 1)
+    release = threading.Event()
+
+    def unavailable() -> int:
+        _ = release.wait(5)
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    app = FastAPI()
+    app.add_middleware(StaleResponseMiddleware)
+
+    @app.get("/{key}")
+    def read(key: str) -> int:  # pyright: ignore[reportUnusedFunction]
+        return cache.get((key,), unavailable, unavailable)
+
+    client = TestClient(app, raise_server_exceptions=False)
+    warnings: list[str | None] = []
+    requests = [
+        threading.Thread(
+            target=lambda: warnings.append(client.get("/k").headers.get("warning"))
+        )
+        for _ in range(3)
+    ]
+    for request in requests:
+        request.start()
+    # leave the followers time to wait on the leader's load
+    time.sleep(0.1)
+    release.set()
+    for request in requests:
+        request.join(5)
+
+    assert warnings == [REVALIDATION_FAILED_WARNING] * 3
+
+
+def test_entries_are_evicted_by_size() -> None:
+    cache = CoalescingCache[bytes](
+        "test",
+        ttl_seconds=60,
+        stale_seconds=60,
+        max_entries=10,
+        max_bytes=10,
+        size=len,
+    )
+    _ = cache.get(("a",), lambda: b"aaaa", lambda: b"aaaa")
+    _ = cache.get(("b",), lambda: b"bbbb", lambda: b"bbbb")
+    # "a" is the most recently used entry when "c" pushes the total over the limit
+    _ = cache.get(("a",), lambda: b"", lambda: b"")
+    _ = cache.get(("c",), lambda: b"cccc", lambda: b"cccc")
+
+    assert cache.get(("a",), lambda: b"new", lambda: b"new") == b"aaaa"
+    assert cache.get(("b",), lambda: b"new", lambda: b"new") == b"new"
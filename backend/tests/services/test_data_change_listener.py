@@ -0,0 +1,23 @@
+from app.core.database import engine
+from app.models.data_version import DataDomain
+from app.services.data_change_listener import DataChangeListener, parse_domains
+
+
+def test_parse_domains_skips_unknown_names() -> None:
+    assert parse_domains("schools, geometry,unknown") == {
+        DataDomain.SCHOOLS,
+        DataDomain.GEOMETRY,
+    }
+
+
+def test_dispatch_runs_only_callbacks_of_changed_domains() -> None:
+    listener = DataChangeListener(engine)
+    invalidated: list[str] = []
+    listener.subscribe(
+        [DataDomain.SCHOOLS, DataDomain.GEOMETRY], lambda: invalidated.append("tiles")
+    )
+    listener.subscribe([DataDomain.RANKINGS], lambda: invalidated.append("rankings"))
+
+    listener.dispatch({DataDomain.GEOMETRY})
+
+    assert invalidated == ["tiles"]
@@ -0,0 +1,33 @@
+import pytest
+from sqlmodel import Session
+
+from app.data_import.utils.db.data_version import bump_data_versions
+from app.models.data_version import DataDomain
+from app.services.data_versions import DataVersionRegistry
+
+pytestmark = pytest.mark.db_write
+
+
+def test_bump_data_versions_changes_only_bumped_domains(session: Session) -> None:
+    before = DataVersionRegistry(poll_seconds=60).get(session)
+
+    bump_data_versions(session, DataDomain.SCORES, DataDomain.RANKINGS)
+    after = DataVersionRegistry(poll_seconds=60).get(session)
+
+    assert after.version(DataDomain.SCORES) == before.version(DataDomain.SCORES) + 1
+    assert after.version(DataDomain.RANKINGS) == before.version(DataDomain.RANKINGS) + 1
+    assert after.token(DataDomain.SCHOOLS) == before.token(DataDomain.SCHOOLS)
+    assert after.token(DataDomain.SCORES) != before.token(DataDomain.SCORES)
+
+
+def test_registry_reuses_versions_until_invalidated(session: Session) -> None:
+    registry = DataVersionRegistry(poll_seconds=60)
+    cached = registry.get(session)
+
+    bump_data_versions(session, DataDomain.SCHOOLS)
+    assert registry.get(session) is cached
+
+    registry.invalidate()
+    assert registry.get(session).version(DataDomain.SCHOOLS) == (
+        cached.version(DataDomain.SCHOOLS) + 1
+    )
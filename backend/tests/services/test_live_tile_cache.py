@@ -0,0 +1,66 @@
+import sys
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from app.schemas.schools import SzkolaShortRow
+from app.services.live_tile_cache import FiltersKey, LiveTileCache
+
+FILTERS_KEY: FiltersKey = (("closed", False),)
+
+
+@pytest.fixture
+def frequent_thread_switches() -> Iterator[None]:
+    # switch threads as often as possible so unguarded updates would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        yield
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def _schools(count: int) -> list[SzkolaShortRow]:
+    return [
+        SzkolaShortRow(
+            id=index,
+            nazwa="Szkoła",
+            wynik=None,
+            typ="Liceum",
+            status="publiczna",
+            latitude=52.0,
+            longitude=21.0,
+            miejscowosc="Warszawa",
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.mark.usefixtures("frequent_thread_switches")
+def test_concurrent_get_put_and_clear_keep_the_cache_consistent() -> None:
+    cache = LiveTileCache("test", max_tiles=50, max_bytes=20_000, ttl_seconds=60)
+    errors: list[BaseException] = []
+
+    def worker(seed: int) -> None:
+        try:
+            for index in range(2_000):
+                tile = ((seed * index) % 80, index % 3)
+                if cache.get(FILTERS_KEY, tile) is None:
+                    cache.put(FILTERS_KEY, tile, _schools(index % 7))
+                if seed == 0 and index % 100 == 0:
+                    cache.clear()
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert errors == []
+    entries = cache._entries  # pyright: ignore[reportPrivateUsage]
+    assert len(entries) <= 50
+    assert cache._bytes == sum(entry.size for entry in entries.values())  # pyright: ignore[reportPrivateUsage]
+    assert cache._bytes <= 20_000  # pyright: ignore[reportPrivateUsage]
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from starlette.types import Message
+
+from app.core.query_cancellation import (
+    ClientDisconnectedError,
+    QueryCancellationMiddleware,
+    StatementTimeoutError,
+    install_query_cancellation,
+    request_queries,
+    set_statement_timeout,
+)
+
+
+@pytest.fixture(autouse=True)
+def query_cancellation() -> None:
+    install_query_cancellation()
+
+
+def test_statement_timeout_stops_long_query(engine: Engine) -> None:
+    with request_queries() as queries, engine.connect() as connection:
+        set_statement_timeout(50)
+        with pytest.raises(StatementTimeoutError):
+            _ = connection.execute(text("SELECT pg_sleep(5)"))
+
+    assert 0.04 < queries.db_seconds < 2
+
+
+def test_cancel_stops_running_query_and_refuses_new_ones(engine: Engine) -> None:
+    with request_queries() as queries, engine.connect() as connection:
+        # the client "disconnects" while the query runs
+        timer = threading.Timer(0.2, queries.cancel)
+        timer.start()
+        with pytest.raises(ClientDisconnectedError):
+            _ = connection.execute(text("SELECT pg_sleep(5)"))
+        timer.join()
+        connection.rollback()
+
+        with pytest.raises(ClientDisconnectedError):
+            _ = connection.execute(text("SELECT 1"))
+
+    assert queries.disconnected
+    assert queries.db_seconds < 2
+
+
+def _request_leaving_early(app: FastAPI, path: str) -> float:
+    """Seconds spent handling `path` when the client disconnects after 0.2 s."""
+    middleware = QueryCancellationMiddleware(app)
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    received = 0
+
+    async def receive() -> Message:
+        nonlocal received
+        received += 1
+        if received == 1:
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if received == 2:
+            await asyncio.sleep(0.2)
+            return {"type": "http.disconnect"}
+        _ = await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
+    async def send(_message: Message) -> None:
+        pass
+
+    async def run() -> None:
+        try:
+            await middleware(scope, receive, send)
+        except ClientDisconnectedError:
+            pass
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return time.perf_counter() - start
+
+
+def test_disconnect_cancels_only_queries_off_the_event_loop(engine: Engine) -> None:
+    app = FastAPI()
+
+    # like the heavy routes, runs in the threadpool
+    @app.get("/sync")
+    def read_sync() -> None:  # pyright: ignore[reportUnusedFunction]
+        with engine.connect() as connection:
+            _ = connection.execute(text("SELECT pg_sleep(5)"))
+
+    # like the light routes, queries on the event loop
+    @app.get("/async")
+    async def read_async() -> None:  # pyright: ignore[reportUnusedFunction]
+        with engine.connect() as connection:
+            _ = connection.execute(text("SELECT pg_sleep(1)"))
+
+    assert _request_leaving_early(app, "/sync") < 2
+    assert _request_leaving_early(app, "/async") >= 1
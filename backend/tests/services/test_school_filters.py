@@ -0,0 +1,178 @@
+from collections.abc import Iterator
+from typing import cast
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session
+
+from app.core.bbox import BboxSelection, BoundingBox
+from app.core.prepared_statements import PreparedStatements
+from app.schemas.school_filters import SchoolFilterParams
+from app.services.school_filters import build_schools_short_query, live_query
+
+type PlanNode = dict[str, object]
+
+# central Poland, a typical map viewport
+BBOX = {"min_lng": 19.0, "min_lat": 51.0, "max_lng": 20.5, "max_lat": 52.5}
+
+
+def _plan_nodes(node: PlanNode) -> Iterator[PlanNode]:
+    yield node
+    for child in cast(list[PlanNode], node.get("Plans", [])):
+        yield from _plan_nodes(child)
+
+
+def _explain_live_query(
+    session: Session, filters: SchoolFilterParams, bitmap_scans: bool = False
+) -> list[PlanNode]:
+    statement = build_schools_short_query(filters)
+    sql = str(
+        statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    connection = session.connection()
+    # the seeded database is small enough for sequential scans to win,
+    # plan it the way it is planned on the full dataset
+    _ = connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    if not bitmap_scans:
+        _ = connection.exec_driver_sql("SET LOCAL enable_bitmapscan = off")
+    explain = cast(
+        list[dict[str, PlanNode]],
+        connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar_one(),
+    )
+    return list(_plan_nodes(explain[0]["Plan"]))
+
+
+def _scans_on_szkola(nodes: list[PlanNode]) -> list[PlanNode]:
+    return [node for node in nodes if node.get("Relation Name") == "szkola"]
+
+
+@pytest.mark.seeded
+def test_bbox_query_uses_index_only_scan(seeded_session: Session) -> None:
+    nodes = _explain_live_query(seeded_session, SchoolFilterParams.model_validate(BBOX))
+
+    scans = _scans_on_szkola(nodes)
+    assert len(scans) == 1
+    assert scans[0]["Node Type"] == "Index Only Scan"
+    assert scans[0]["Index Name"] == "idx_szkola_coordinates_not_zlikwidowana"
+
+
+@pytest.mark.seeded
+def test_bbox_query_with_closed_schools_uses_geom_index(
+    seeded_session: Session,
+) -> None:
+    nodes = _explain_live_query(
+        seeded_session, SchoolFilterParams.model_validate({**BBOX, "closed": True})
+    )
+
+    scans = _scans_on_szkola(nodes)
+    assert len(scans) == 1
+    assert scans[0]["Index Name"] == "idx_szkola_geom_any_zlikwidowana"
+
+
+@pytest.mark.seeded
+def test_outside_bbox_query_uses_index(seeded_session: Session) -> None:
+    # the complement rectangles are OR-ed, which is served by a BitmapOr
+    nodes = _explain_live_query(
+        seeded_session,
+        SchoolFilterParams.model_validate({**BBOX, "bbox_mode": "outside"}),
+        True,
+    )
+
+    assert all(node["Node Type"] != "Seq Scan" for node in _scans_on_szkola(nodes))
+    index_names = {node.get("Index Name") for node in nodes}
+    assert "idx_szkola_coordinates_not_zlikwidowana" in index_names
+
+
+def test_live_query_reuses_statement_per_shape() -> None:
+    first = live_query(
+        SchoolFilterParams.model_validate({**BBOX, "type_id": [1], "min_score": 40})
+    )
+    second = live_query(
+        SchoolFilterParams.model_validate(
+            {
+                "min_lng": 14.0,
+                "min_lat": 49.0,
+                "max_lng": 15.0,
+                "max_lat": 50.0,
+                "type_id": [2, 3, 4],
+                "min_score": 75,
+            }
+        )
+    )
+    other_shape = live_query(
+        SchoolFilterParams.model_validate({**BBOX, "type_id": [1]})
+    )
+
+    assert first.statement is second.statement
+    assert first.statement is not other_shape.statement
+    assert second.params["type_ids"] == [2, 3, 4]
+    assert second.params["region0_min_lng"] == 14.0
+
+
+def test_live_query_shares_statement_across_rectangle_counts() -> None:
+    filters = SchoolFilterParams.model_validate({})
+    boxes = [BoundingBox(19.0 + index, 51.0, 19.5 + index, 51.5) for index in range(5)]
+    three, four, five = (live_query(filters, boxes[:count]) for count in (3, 4, 5))
+
+    assert three.statement is four.statement
+    assert five.statement is not four.statement
+    # unused slots are filled with a rectangle no school lies in
+    assert three.params["region3_min_lng"] == 1000
+    assert five.params["region7_max_lat"] == 1000
+
+
+@pytest.mark.seeded
+def test_prepared_live_query_returns_same_rows(seeded_session: Session) -> None:
+    query = live_query(
+        SchoolFilterParams.model_validate({**BBOX, "type_id": [1, 2, 3], "q": "szko"})
+    )
+    connection = seeded_session.connection()
+    expected = connection.execute(query.statement, query.params).mappings().all()
+
+    prepared = PreparedStatements()
+    # the first execution prepares the statement, the second only executes it
+    for _ in range(2):
+        rows = prepared.execute(connection, query.statement, query.params)
+        assert [dict(row) for row in rows.mappings()] == [dict(row) for row in expected]
+
+
+def test_outside_selection_is_complement_of_viewport() -> None:
+    viewport = BoundingBox(**BBOX)
+    selection = BboxSelection.build(viewport, "outside", [])
+
+    assert 1 <= len(selection.regions) <= 4
+    for lng in range(-180, 180, 5):
+        for lat in range(-90, 90, 5):
+            inside = viewport.contains(lng + 0.25, lat + 0.25)
+            assert selection.contains(lng + 0.25, lat + 0.25) is not inside
+
+
+def test_selection_leaves_out_excluded_rectangles() -> None:
+    filters = SchoolFilterParams.model_validate(
+        {**BBOX, "exclude": ["18.0,50.0,19.5,51.5", "20.0,52.0,21.0,53.0"]}
+    )
+    selection = filters.bbox_selection()
+    assert selection is not None
+
+    assert selection.contains(20.0, 51.2)
+    assert not selection.contains(19.2, 51.2)
+    assert not selection.contains(20.2, 52.2)
+    # points on the edge of an excluded rectangle were already loaded with it
+    assert not selection.contains(19.5, 51.3)
+
+
+def test_selection_fully_excluded_is_empty() -> None:
+    filters = SchoolFilterParams.model_validate(
+        {**BBOX, "exclude": ["18.0,50.0,21.0,53.0"]}
+    )
+    selection = filters.bbox_selection()
+
+    assert selection is not None
+    assert selection.is_empty
+
+
+def test_exclude_rejects_malformed_rectangles() -> None:
+    with pytest.raises(ValueError):
+        _ = SchoolFilterParams.model_validate({"exclude": ["19.0,51.0,18.0"]})
@@ -0,0 +1,183 @@
+import json
+import struct
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+from typing import cast
+
+import pytest
+from sqlmodel import Session
+
+from tests.conftest import BACKEND_DIR
+
+SQL_DIR = BACKEND_DIR / "alembic" / "versions" / "sql"
+ZOOMS = (6, 9, 11, 13, 15)
+SAMPLE_SCHOOLS = 10
+
+# (type, geometry commands, properties), in a tile-order independent form
+type Feature = tuple[int, tuple[int, ...], frozenset[tuple[str, object]]]
+
+
+def _varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def _fields(data: bytes) -> Iterator[tuple[int, int | bytes]]:
+    """(field number, value) pairs of one protobuf message."""
+    pos = 0
+    while pos < len(data):
+        key, pos = _varint(data, pos)
+        match key & 7:
+            case 0:
+                value, pos = _varint(data, pos)
+                yield key >> 3, value
+            case 1:
+                yield key >> 3, data[pos : pos + 8]
+                pos += 8
+            case 2:
+                length, pos = _varint(data, pos)
+                yield key >> 3, data[pos : pos + length]
+                pos += length
+            case 5:
+                yield key >> 3, data[pos : pos + 4]
+                pos += 4
+            case wire_type:
+                raise ValueError(f"Unexpected wire type {wire_type}")
+
+
+def _packed(data: bytes) -> list[int]:
+    values: list[int] = []
+    pos = 0
+    while pos < len(data):
+        value, pos = _varint(data, pos)
+        values.append(value)
+    return values
+
+
+def _tile_value(data: bytes) -> object:
+    for number, value in _fields(data):
+        match number:
+            case 1:
+                return cast(bytes, value).decode()
+            # sums of scores may differ in the last bits with the summation order
+            case 2:
+                return round(cast(float, struct.unpack("<f", cast(bytes, value))[0]), 4)
+            case 3:
+                return round(cast(float, struct.unpack("<d", cast(bytes, value))[0]), 6)
+            case 4 | 5:
+                return value
+            case 6:
+                number = cast(int, value)
+                return (number >> 1) ^ -(number & 1)
+            case 7:
+                return bool(value)
+    return None
+
+
+def _decode_features(tile: bytes) -> Counter[Feature]:
+    """Features of every layer of a Mapbox Vector Tile."""
+    features: Counter[Feature] = Counter()
+    for number, layer in _fields(tile):
+        if number != 3:
+            continue
+        keys: list[str] = []
+        values: list[object] = []
+        raw_features: list[bytes] = []
+        for layer_field, value in _fields(cast(bytes, layer)):
+            match layer_field:
+                case 2:
+                    raw_features.append(cast(bytes, value))
+                case 3:
+                    keys.append(cast(bytes, value).decode())
+                case 4:
+                    values.append(_tile_value(cast(bytes, value)))
+        for raw_feature in raw_features:
+            fields = dict(_fields(raw_feature))
+            tags = _packed(cast(bytes, fields.get(2, b"")))
+            properties = frozenset(
+                (keys[key], values[value])
+                for key, value in zip(tags[::2], tags[1::2], strict=True)
+            )
+            geometry = tuple(_packed(cast(bytes, fields.get(4, b""))))
+            features[(cast(int, fields.get(3, 0)), geometry, properties)] += 1
+    return features
+
+
+def _install_as(session: Session, sql_file: Path, name: str) -> None:
+    """Create the function of an older SQL file next to the current one."""
+    sql = sql_file.read_text().replace(
+        "CREATE OR REPLACE FUNCTION public.szkola_clustered(",
+        f"CREATE FUNCTION pg_temp.{name}(",
+    )
+    # executed as a plain string, the SQL file contains literal '%'
+    _ = session.connection().exec_driver_sql(sql)
+
+
+def _seeded_tiles(session: Session) -> list[tuple[int, int, int]]:
+    """Tiles of every tested zoom around a sample of seeded schools."""
+    rows = session.connection().exec_driver_sql(
+        f"""
+        SELECT DISTINCT
+            z,
+            FLOOR((ST_X(s.geom_3857) + 20037508.342789244) / (40075016.68557849 / 2 ^ z))::integer,
+            FLOOR((20037508.342789244 - ST_Y(s.geom_3857)) / (40075016.68557849 / 2 ^ z))::integer
+        FROM (
+            SELECT geom_3857
+            FROM public.szkola
+            WHERE geom_3857 IS NOT NULL AND aktualna = true
+            ORDER BY id
+            LIMIT {SAMPLE_SCHOOLS}
+        ) AS s
+        CROSS JOIN unnest(ARRAY{list(ZOOMS)}) AS z
+        """
+    )
+    return [cast(tuple[int, int, int], tuple(row)) for row in rows]
+
+
+@pytest.mark.seeded
+@pytest.mark.parametrize(
+    "query_params",
+    [
+        {},
+        {"closed": "true"},
+        {"minScore": "40"},
+        {"q": "szkoła"},
+        {"status": "1,2", "maxScore": "90"},
+    ],
+)
+def test_clustered_tiles_match_v2_function(
+    seeded_session: Session, query_params: dict[str, str]
+) -> None:
+    # the rewritten filtered path may only change the order of features in a tile
+    _install_as(
+        seeded_session, SQL_DIR / "szkola_clustered_v2.sql", "szkola_clustered_v2"
+    )
+    tiles = _seeded_tiles(seeded_session)
+    assert tiles
+
+    params = json.dumps(query_params)
+    for z, x, y in tiles:
+        current, v2 = cast(
+            tuple[memoryview | None, memoryview | None],
+            tuple(
+                seeded_session.connection()
+                .exec_driver_sql(
+                    "SELECT public.szkola_clustered(%(z)s, %(x)s, %(y)s, %(params)s::json), "
+                    + "pg_temp.szkola_clustered_v2(%(z)s, %(x)s, %(y)s, %(params)s::json)",
+                    {"z": z, "x": x, "y": y, "params": params},
+                )
+                .one()
+            ),
+        )
+        assert _decode_features(bytes(current or b"")) == _decode_features(
+            bytes(v2 or b"")
+        ), f"tile {z}/{x}/{y}"
+
+    seeded_session.rollback()